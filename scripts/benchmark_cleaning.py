@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""
+Benchmark de las funciones de limpieza usadas por los scripts de importación
+
+Incluye un microbenchmark por kernel (precio, porcentaje, booleano, fecha)
+y del plan de limpieza completo frente a la limpieza columna a columna.
+"""
+
+import sys
+import math
+import time
+import logging
+from pathlib import Path
+from typing import Callable
+
+import bson
+import numpy as np
+import pandas as pd
+
+# Agregar src al path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.cleaning import (
+    DATE_COLUMNS, BOOLEAN_COLUMNS, PERCENTAGE_COLUMNS, LISTING_COLUMNS, DEFAULT_FILLS,
+    CleaningPlan, add_location_column, clean_boolean, clean_date, clean_percentage,
+    clean_price, dataframe_to_documents
+)
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+logging.getLogger('src.cleaning').setLevel(logging.ERROR)
+
+
+def synthetic_listings(rows: int, seed: int = 42) -> pd.DataFrame:
+    """
+    Genera un DataFrame con la forma de listings.csv de Inside Airbnb
+
+    Args:
+        rows: Número de registros
+        seed: Semilla aleatoria
+
+    Returns:
+        pd.DataFrame: Datos sintéticos (≈1% de coordenadas nulas)
+    """
+    rng = np.random.default_rng(seed)
+    latitude = 40.35 + rng.random(rows) * 0.15
+    latitude[rng.random(rows) < 0.01] = np.nan
+
+    price = rng.random(rows) * 300
+    price[rng.random(rows) < 0.05] = np.nan
+    last_review = pd.Series(pd.to_datetime('2024-09-12') - pd.to_timedelta(
+        rng.integers(0, 2000, rows), unit='D'))
+    last_review[rng.random(rows) < 0.2] = pd.NaT
+
+    return pd.DataFrame({
+        'id': np.arange(rows),
+        'name': [f"Piso {i}" for i in range(rows)],
+        'latitude': latitude,
+        'longitude': -3.80 + rng.random(rows) * 0.20,
+        'room_type': rng.choice(['Entire home/apt', 'Private room'], rows),
+        'price': price,
+        'number_of_reviews': rng.integers(0, 500, rows),
+        'reviews_per_month': np.where(rng.random(rows) < 0.2, np.nan, rng.random(rows)),
+        'last_review': last_review,
+    })
+
+
+def synthetic_raw_listings(rows: int, seed: int = 42) -> pd.DataFrame:
+    """
+    Genera columnas de texto tal como llegan en listings.csv (sin convertir)
+
+    Args:
+        rows: Número de registros
+        seed: Semilla aleatoria
+
+    Returns:
+        pd.DataFrame: Precios '$1,234.00', porcentajes '95%', 't'/'f' y fechas
+    """
+    rng = np.random.default_rng(seed)
+
+    def with_nulls(values, fraction):
+        values = pd.Series(values, dtype=object)
+        values[rng.random(rows) < fraction] = None
+        return values
+
+    prices = rng.integers(10, 2500, rows)
+    days = pd.to_datetime('2024-09-12') - pd.to_timedelta(rng.integers(0, 4000, rows), unit='D')
+
+    df = synthetic_listings(rows, seed)
+    df['price'] = with_nulls([f"${p:,}.00" for p in prices.tolist()], 0.05)
+    df['host_name'] = with_nulls([f"Host {i % 500}" for i in range(rows)], 0.01)
+    for col in PERCENTAGE_COLUMNS:
+        df[col] = with_nulls([f"{p}%" for p in rng.integers(0, 101, rows).tolist()], 0.15)
+    for col in BOOLEAN_COLUMNS:
+        df[col] = with_nulls(rng.choice(['t', 'f'], rows), 0.02)
+    for col in DATE_COLUMNS:
+        if col == 'calendar_updated':
+            df[col] = None
+        else:
+            df[col] = with_nulls(days.strftime('%Y-%m-%d').tolist(), 0.2)
+    return df
+
+
+def price_regex(series: pd.Series) -> pd.Series:
+    """Implementación anterior: regex por fila + to_numeric"""
+    return pd.to_numeric(series.replace(r'[\$,]', '', regex=True), errors='coerce').fillna(0)
+
+
+def percentage_regex(series: pd.Series) -> pd.Series:
+    """Implementación anterior: regex por fila + to_numeric"""
+    return pd.to_numeric(series.replace('%', '', regex=True), errors='coerce') / 100
+
+
+def boolean_map(series: pd.Series) -> pd.Series:
+    """Implementación anterior: map con diccionario"""
+    return series.map({'t': True, 'f': False})
+
+
+def date_inferred(series: pd.Series) -> pd.Series:
+    """Implementación anterior: formato inferido"""
+    return pd.to_datetime(series, errors='coerce')
+
+
+def clean_per_column(df: pd.DataFrame) -> pd.DataFrame:
+    """Implementación anterior de clean_custom_dataframe (columna a columna)"""
+    df = df[[col for col in LISTING_COLUMNS if col in df.columns]].copy()
+    df['price'] = price_regex(df['price'])
+    for col in DATE_COLUMNS:
+        if col in df.columns:
+            df[col] = date_inferred(df[col])
+    for col in BOOLEAN_COLUMNS:
+        if col in df.columns:
+            df[col] = boolean_map(df[col])
+    for col in PERCENTAGE_COLUMNS:
+        if col in df.columns:
+            df[col] = percentage_regex(df[col])
+    for col, value in DEFAULT_FILLS.items():
+        if col in df.columns:
+            df[col] = df[col].fillna(value)
+    return add_location_column(df)
+
+
+def as_values(series: pd.Series) -> list:
+    """Valores de una columna con los nulos como None (para comparar)"""
+    values = series.to_numpy(dtype=object, copy=True)
+    values[series.isna().to_numpy()] = None
+    return values.tolist()
+
+
+def time_kernel(func: Callable, series: pd.Series, repeat: int) -> float:
+    """Mejor tiempo de un kernel sobre una columna"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(series)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def benchmark_kernels(df: pd.DataFrame, repeat: int) -> None:
+    """
+    Microbenchmark de cada kernel frente a su implementación anterior
+
+    Args:
+        df: DataFrame crudo (synthetic_raw_listings o un listings.csv leído como texto)
+        repeat: Número de repeticiones
+    """
+    kernels = [
+        ('price', 'price', price_regex, lambda s: clean_price(s, fill_value=0)),
+        ('porcentaje', PERCENTAGE_COLUMNS[0], percentage_regex, clean_percentage),
+        ('booleano', BOOLEAN_COLUMNS[0], boolean_map, clean_boolean),
+        ('fecha', 'last_review', date_inferred, clean_date),
+    ]
+    for name, col, baseline, kernel in kernels:
+        if col not in df.columns:
+            continue
+        assert as_values(baseline(df[col])) == as_values(kernel(df[col])), \
+            f"El kernel '{name}' difiere de la implementación anterior"
+        report(
+            f"kernel {name} ({col})",
+            time_kernel(baseline, df[col], repeat),
+            time_kernel(kernel, df[col], repeat)
+        )
+
+    plan = CleaningPlan(select=LISTING_COLUMNS, price_fill=0, fills=DEFAULT_FILLS)
+    assert dataframe_to_documents(clean_per_column(df.copy())) == \
+        dataframe_to_documents(plan.apply(df.copy())), "El plan de limpieza difiere"
+    report(
+        "plan de limpieza completo",
+        time_function(clean_per_column, df, repeat),
+        time_function(plan.apply, df, repeat)
+    )
+
+
+def location_apply(df: pd.DataFrame) -> pd.DataFrame:
+    """Implementación anterior basada en df.apply(axis=1)"""
+    df['location'] = df.apply(
+        lambda row: {
+            "type": "Point",
+            "coordinates": [float(row['longitude']), float(row['latitude'])]
+        } if pd.notna(row['latitude']) and pd.notna(row['longitude']) else None,
+        axis=1
+    )
+    return df[df['location'].notna()]
+
+
+def clean_document(doc):
+    """Implementación anterior de import_fixed (limpieza por celda)"""
+    cleaned = {}
+    for key, value in doc.items():
+        if pd.isna(value):
+            cleaned[key] = None
+        elif isinstance(value, float) and (math.isnan(value) or math.isinf(value)):
+            cleaned[key] = None
+        elif hasattr(value, '__class__') and 'NaTType' in str(value.__class__):
+            cleaned[key] = None
+        else:
+            cleaned[key] = value
+    return cleaned
+
+
+def documents_per_cell(df: pd.DataFrame) -> list:
+    """Implementación anterior: to_dict('records') + clean_document"""
+    return [clean_document(doc) for doc in df.to_dict('records')]
+
+
+def time_function(func: Callable, df: pd.DataFrame, repeat: int) -> float:
+    """
+    Mide el mejor tiempo de varias ejecuciones sobre copias del DataFrame
+
+    Args:
+        func: Función a medir
+        df: DataFrame de entrada
+        repeat: Número de repeticiones
+
+    Returns:
+        float: Mejor tiempo en segundos
+    """
+    best = float('inf')
+    for _ in range(repeat):
+        data = df.copy()
+        start = time.perf_counter()
+        func(data)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def report(name: str, baseline: float, candidate: float) -> None:
+    """Muestra la comparación entre dos implementaciones"""
+    logger.info(f"🏁 {name}")
+    logger.info(f"  - Anterior:    {baseline * 1000:10.1f} ms")
+    logger.info(f"  - Vectorizado: {candidate * 1000:10.1f} ms")
+    logger.info(f"  - Aceleración: {baseline / candidate:10.1f}x")
+
+
+def main():
+    """Función principal"""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description='Benchmark de las funciones de limpieza'
+    )
+    parser.add_argument(
+        '--csv',
+        help='CSV de Inside Airbnb a usar (por defecto, datos sintéticos)'
+    )
+    parser.add_argument(
+        '--rows',
+        type=int,
+        default=20000,
+        help='Registros sintéticos a generar (default: 20000)'
+    )
+    parser.add_argument(
+        '--repeat',
+        type=int,
+        default=3,
+        help='Repeticiones por medición (default: 3)'
+    )
+
+    args = parser.parse_args()
+
+    if args.csv:
+        raw = pd.read_csv(args.csv, dtype=str)
+        df = pd.read_csv(args.csv, low_memory=False)
+    else:
+        raw = synthetic_raw_listings(args.rows)
+        df = synthetic_listings(args.rows)
+    logger.info(f"📊 Registros: {len(df):,}")
+
+    benchmark_kernels(raw, args.repeat)
+
+    # Ambas implementaciones deben producir los mismos documentos
+    expected = location_apply(df.copy())['location'].tolist()
+    actual = add_location_column(df.copy())['location'].tolist()
+    assert expected == actual, "Las implementaciones de 'location' difieren"
+
+    report(
+        "location (GeoJSON Point)",
+        time_function(location_apply, df, args.repeat),
+        time_function(add_location_column, df, args.repeat)
+    )
+
+    documents = dataframe_to_documents(df)
+    bson.encode(documents[0])
+    assert documents == documents_per_cell(df), "Los documentos difieren"
+
+    report(
+        "NaN/NaT -> None (documentos)",
+        time_function(documents_per_cell, df, args.repeat),
+        time_function(dataframe_to_documents, df, args.repeat)
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Benchmark de ingesta: motor pandas frente a motor Arrow (CSV -> BSON)
+"""
+
+import sys
+import time
+import logging
+from datetime import datetime
+from pathlib import Path
+from typing import Callable
+
+import bson
+import pandas as pd
+
+# Agregar src al path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from src.arrow_ingest import ARROW_AVAILABLE, iter_bson_batches
+from src.cleaning import dataframe_to_documents
+from src.streaming import peak_memory_mb
+from import_custom_data import clean_custom_dataframe
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+for name in ('src.cleaning', 'import_custom_data'):
+    logging.getLogger(name).setLevel(logging.ERROR)
+
+METADATA = {'imported_at': datetime(2024, 9, 12), 'source': 'custom_import'}
+
+
+def pandas_engine(csv_path: Path) -> int:
+    """
+    Ruta actual: read_csv -> limpieza pandas -> dicts -> BSON
+
+    La codificación BSON por documento es la que haría PyMongo en insert_many.
+
+    Returns:
+        int: Bytes BSON generados
+    """
+    df = clean_custom_dataframe(pd.read_csv(csv_path, low_memory=False), verbose=False)
+    documents = dataframe_to_documents(df)
+    size = 0
+    for doc in documents:
+        doc.update(METADATA)
+        size += len(bson.encode(doc))
+    return size
+
+
+def arrow_engine(csv_path: Path) -> int:
+    """
+    Ruta Arrow: CSV tipado -> kernels de Arrow -> BSON columnar
+
+    Returns:
+        int: Bytes BSON generados
+    """
+    size = 0
+    for documents in iter_bson_batches(csv_path, metadata=METADATA):
+        size += sum(len(doc.raw) for doc in documents)
+    return size
+
+
+def time_engine(func: Callable, csv_path: Path, repeat: int) -> float:
+    """
+    Mide el mejor tiempo de varias ejecuciones
+
+    Args:
+        func: Motor a medir
+        csv_path: CSV de entrada
+        repeat: Número de repeticiones
+
+    Returns:
+        float: Mejor tiempo en segundos
+    """
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(csv_path)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    """Función principal"""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description='Benchmark de ingesta CSV -> BSON (pandas vs Arrow)'
+    )
+    parser.add_argument(
+        'csv_file',
+        help='CSV de Inside Airbnb (listings.csv o listings.csv.gz)'
+    )
+    parser.add_argument(
+        '--engine',
+        choices=['both', 'pandas', 'arrow'],
+        default='both',
+        help='Motor a medir; uno solo para medir también su pico de memoria'
+    )
+    parser.add_argument(
+        '--repeat',
+        type=int,
+        default=3,
+        help='Repeticiones por medición (default: 3)'
+    )
+
+    args = parser.parse_args()
+    csv_path = Path(args.csv_file)
+
+    if args.engine != 'pandas' and not ARROW_AVAILABLE:
+        logger.error("❌ El motor Arrow requiere pyarrow (pip install pyarrow)")
+        sys.exit(1)
+
+    engines = {'pandas': pandas_engine, 'arrow': arrow_engine}
+    if args.engine != 'both':
+        engines = {args.engine: engines[args.engine]}
+
+    timings = {}
+    for name, func in engines.items():
+        size = func(csv_path)
+        timings[name] = time_engine(func, csv_path, args.repeat)
+        logger.info(
+            f"🏁 {name:<6}: {timings[name] * 1000:10.1f} ms "
+            f"({size / 1024 / 1024:.1f} MB de BSON)")
+
+    if len(timings) == 2:
+        logger.info(f"  - Aceleración: {timings['pandas'] / timings['arrow']:10.1f}x")
+    else:
+        peak = peak_memory_mb()
+        if peak is not None:
+            logger.info(f"🧠 Pico de memoria: {peak:,.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Benchmark de lectura de listings.csv: tipos inferidos frente al esquema tipado
+
+Mide tiempo de parseo, tiempo de limpieza, memoria del DataFrame y pico de
+memoria asignada durante el parseo con cada estrategia.
+"""
+
+import sys
+import time
+import logging
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict
+
+import pandas as pd
+
+# Agregar src al path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from src.cleaning import LISTING_COLUMNS
+from src.config import RAW_DATA_DIR
+from src.schema import read_listings_csv
+from src.streaming import find_csv_source, read_csv_source
+from import_custom_data import clean_custom_dataframe
+from import_data import IMPORT_COLUMNS
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+def read_inferred(csv_path: Path) -> pd.DataFrame:
+    """Lectura anterior: todas las columnas con tipos inferidos"""
+    return read_csv_source(csv_path, low_memory=False)
+
+
+def read_typed(csv_path: Path) -> pd.DataFrame:
+    """Lectura con usecols, dtypes, categóricos y formato de fecha"""
+    return read_listings_csv(csv_path, LISTING_COLUMNS, low_memory=False)
+
+
+def read_typed_import(csv_path: Path) -> pd.DataFrame:
+    """Lectura tipada de las columnas que usa import_data"""
+    return read_listings_csv(csv_path, IMPORT_COLUMNS, low_memory=False)
+
+
+def measure(name: str, reader: Callable[[Path], pd.DataFrame], csv_path: Path, repeat: int) -> Dict[str, float]:
+    """
+    Mide una estrategia de lectura
+
+    Returns:
+        Dict: Segundos de parseo y limpieza, MB del DataFrame y pico en MB
+    """
+    parse = clean = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        df = reader(csv_path)
+        parse = min(parse, time.perf_counter() - start)
+
+        frame_mb = df.memory_usage(deep=True).sum() / 1024 / 1024
+        columns = len(df.columns)
+
+        start = time.perf_counter()
+        clean_custom_dataframe(df, verbose=False)
+        clean = min(clean, time.perf_counter() - start)
+        del df
+
+    # Pico de memoria en una pasada aparte (tracemalloc ralentiza el parseo)
+    tracemalloc.start()
+    df = reader(csv_path)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del df
+
+    result = {
+        'parse': parse,
+        'clean': clean,
+        'frame_mb': frame_mb,
+        'peak_mb': peak / 1024 / 1024,
+    }
+    logger.info(
+        f"🏁 {name:<10} parseo {parse:7.2f}s  limpieza {clean:6.2f}s  "
+        f"DataFrame {frame_mb:8.1f} MB  pico {result['peak_mb']:8.1f} MB  ({columns} columnas)")
+    return result
+
+
+def main():
+    """Función principal"""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description='Benchmark de lectura con tipos inferidos vs esquema tipado'
+    )
+    parser.add_argument(
+        '--csv',
+        help='listings.csv de Inside Airbnb (default: madrid_listings.csv* en RAW_DATA_DIR)'
+    )
+    parser.add_argument(
+        '--repeat',
+        type=int,
+        default=3,
+        help='Repeticiones por medición (default: 3)'
+    )
+    args = parser.parse_args()
+
+    csv_path = Path(args.csv) if args.csv else find_csv_source(RAW_DATA_DIR, "madrid_listings")
+    if csv_path is None or not csv_path.exists():
+        logger.error("❌ No se encontró listings.csv")
+        logger.info("💡 Ejecuta 'python scripts/download_dataset.py --artifacts listings' primero")
+        sys.exit(1)
+
+    logger.info(f"📄 Archivo: {csv_path} ({csv_path.stat().st_size / 1024 / 1024:,.1f} MB)")
+
+    before = measure("inferido", read_inferred, csv_path, args.repeat)
+    results = {
+        "tipado": measure("tipado", read_typed, csv_path, args.repeat),
+        "import_data": measure("import_data", read_typed_import, csv_path, args.repeat),
+    }
+
+    for name, after in results.items():
+        logger.info(f"\n📊 {name} frente a inferido:")
+        logger.info(f"  - Parseo:            {before['parse'] / after['parse']:6.2f}x más rápido")
+        logger.info(f"  - Parseo + limpieza: "
+                    f"{(before['parse'] + before['clean']) / (after['parse'] + after['clean']):6.2f}x")
+        logger.info(f"  - DataFrame:         {before['frame_mb'] / after['frame_mb']:6.2f}x menos memoria")
+        logger.info(f"  - Pico:              {before['peak_mb'] / after['peak_mb']:6.2f}x menos memoria")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+Benchmark de almacenamiento: nulos explícitos, documentos dispersos y claves compactas
+
+Sin servidor mide el tamaño BSON de los documentos de cada variante; con un
+MongoDB accesible (MONGODB_URI) los importa en colecciones temporales y
+compara get_collection_stats y los contadores de caché de WiredTiger durante
+recorridos completos de cada colección.
+"""
+
+import sys
+import time
+import logging
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import bson
+import pandas as pd
+
+# Agregar src al path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from src.cleaning import LISTING_COLUMNS
+from src.config import RAW_DATA_DIR
+from src.database import MongoDBConnection
+from src.field_codec import LISTING_CODEC
+from src.schema import read_listings_csv
+from src.streaming import find_csv_source
+from src.validation import listing_documents, split_valid_listings
+from benchmark_cleaning import synthetic_raw_listings
+from import_custom_data import clean_custom_dataframe
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+for name in ('src.cleaning', 'import_custom_data'):
+    logging.getLogger(name).setLevel(logging.WARNING)
+
+BENCHMARK_COLLECTION = 'benchmark_storage'
+
+
+def dense_documents(df: pd.DataFrame) -> List[Dict[str, Any]]:
+    """Documentos actuales: cada nulo se guarda como campo None"""
+    return listing_documents(df)
+
+
+def sparse_documents(df: pd.DataFrame) -> List[Dict[str, Any]]:
+    """Documentos dispersos: los campos nulos se omiten"""
+    return listing_documents(df, sparse=True)
+
+
+def compact_documents(df: pd.DataFrame) -> List[Dict[str, Any]]:
+    """Documentos con claves compactas (FieldCodec)"""
+    return listing_documents(df, codec=LISTING_CODEC)
+
+
+def sparse_compact_documents(df: pd.DataFrame) -> List[Dict[str, Any]]:
+    """Documentos dispersos y con claves compactas"""
+    return listing_documents(df, sparse=True, codec=LISTING_CODEC)
+
+
+# Variante -> constructor de documentos (la primera es la referencia)
+VARIANTS: Dict[str, Callable[[pd.DataFrame], List[Dict[str, Any]]]] = {
+    'nulos': dense_documents,
+    'dispersos': sparse_documents,
+    'compactos': compact_documents,
+    'dispersos+compactos': sparse_compact_documents,
+}
+
+
+def load_listings(csv_path: Optional[Path], rows: int, keep_all: bool) -> pd.DataFrame:
+    """
+    Lee y limpia listings.csv (o genera datos sintéticos) y descarta los inválidos
+
+    Returns:
+        pd.DataFrame: Registros limpios que cumplen el esquema
+    """
+    if csv_path is not None:
+        df = read_listings_csv(csv_path, None if keep_all else LISTING_COLUMNS, low_memory=False)
+    else:
+        df = synthetic_raw_listings(rows)
+    df = clean_custom_dataframe(df, keep_all_columns=keep_all, verbose=False)
+    valid, _ = split_valid_listings(df)
+    return valid
+
+
+def bson_sizes(documents: List[Dict[str, Any]]) -> Dict[str, float]:
+    """
+    Tamaño BSON de los documentos
+
+    Returns:
+        Dict: Bytes totales, bytes medios y campos medios por documento
+    """
+    total = sum(len(bson.encode(doc)) for doc in documents)
+    fields = sum(len(doc) for doc in documents)
+    return {
+        'bytes': total,
+        'avg_bytes': total / max(len(documents), 1),
+        'avg_fields': fields / max(len(documents), 1),
+    }
+
+
+def scan(collection, repeat: int) -> float:
+    """Recorre la colección completa `repeat` veces y retorna el mejor tiempo"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in collection.find({}, batch_size=10000):
+            pass
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def measure_server(
+    conn: MongoDBConnection,
+    name: str,
+    documents: List[Dict[str, Any]],
+    repeat: int
+) -> Dict[str, float]:
+    """
+    Importa una variante y mide almacenamiento y caché durante los recorridos
+
+    Returns:
+        Dict: Estadísticas de la colección y de la caché
+    """
+    collection_name = f"{BENCHMARK_COLLECTION}_{name}"
+    db = conn.get_database()
+    db.drop_collection(collection_name)
+    collection = db[collection_name]
+    for i in range(0, len(documents), 1000):
+        collection.insert_many(documents[i:i+1000], ordered=False)
+
+    stats = conn.get_collection_stats(collection_name)
+    before = conn.get_cache_stats(collection_name)
+    stats['scan'] = scan(collection, repeat)
+    after = conn.get_cache_stats(collection_name)
+
+    requested = after['pages_requested'] - before['pages_requested']
+    read = after['pages_read'] - before['pages_read']
+    stats['hit_ratio'] = 1 - read / requested if requested else float('nan')
+    stats['cache_read_mb'] = (after['bytes_read'] - before['bytes_read']) / 1024 / 1024
+    stats['cache_mb'] = after['bytes_in_cache'] / 1024 / 1024
+
+    logger.info(
+        f"🗄️ {name:<20} size {stats['size'] / 1024 / 1024:8.2f} MB  "
+        f"storage {stats['storageSize'] / 1024 / 1024:8.2f} MB  "
+        f"avgObjSize {stats['avgObjSize']:7,.0f} B  "
+        f"en caché {stats['cache_mb']:7.1f} MB  leído a caché {stats['cache_read_mb']:7.1f} MB  "
+        f"aciertos {stats['hit_ratio'] * 100:5.1f}%  recorrido {stats['scan'] * 1000:8.1f} ms")
+    return stats
+
+
+def set_cache_size(conn: MongoDBConnection, cache_mb: float) -> Optional[int]:
+    """
+    Ajusta el tamaño de la caché de WiredTiger (requiere permisos de admin)
+
+    Returns:
+        int o None: Tamaño anterior en bytes para restaurarlo
+    """
+    admin = conn.get_database('admin')
+    previous = admin.command('serverStatus')['wiredTiger']['cache']['maximum bytes configured']
+    admin.command({'setParameter': 1,
+                   'wiredTigerEngineRuntimeConfig': f"cache_size={int(cache_mb)}M"})
+    logger.info(f"🧊 Caché de WiredTiger: {previous / 1024 / 1024:,.0f} MB -> {cache_mb:,.0f} MB")
+    return previous
+
+
+def main():
+    """Función principal"""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description='Benchmark de almacenamiento: nulos explícitos, documentos '
+                    'dispersos y claves compactas'
+    )
+    parser.add_argument(
+        '--csv',
+        help='listings.csv de Inside Airbnb (default: madrid_listings.csv* en '
+             'RAW_DATA_DIR o, si no existe, datos sintéticos)'
+    )
+    parser.add_argument(
+        '--rows',
+        type=int,
+        default=50000,
+        help='Registros sintéticos a generar sin CSV (default: 50000)'
+    )
+    parser.add_argument(
+        '--keep-all',
+        action='store_true',
+        help='Mantener TODAS las columnas del CSV'
+    )
+    parser.add_argument(
+        '--offline',
+        action='store_true',
+        help='Medir solo el tamaño BSON, sin MongoDB'
+    )
+    parser.add_argument(
+        '--cache-mb',
+        type=float,
+        help='Reducir la caché de WiredTiger durante la medición (requiere admin)'
+    )
+    parser.add_argument(
+        '--repeat',
+        type=int,
+        default=3,
+        help='Recorridos completos por colección (default: 3)'
+    )
+    args = parser.parse_args()
+
+    csv_path = Path(args.csv) if args.csv else find_csv_source(RAW_DATA_DIR, "madrid_listings")
+    df = load_listings(csv_path, args.rows, args.keep_all)
+    logger.info(
+        f"📊 {len(df):,} registros, {len(df.columns)} columnas "
+        f"({csv_path if csv_path is not None else 'sintéticos'})")
+
+    documents = {}
+    sizes = {}
+    for name, build in VARIANTS.items():
+        documents[name] = build(df)
+        sizes[name] = bson_sizes(documents[name])
+        logger.info(
+            f"📦 {name:<20} BSON {sizes[name]['bytes'] / 1024 / 1024:8.2f} MB  "
+            f"{sizes[name]['avg_bytes']:7,.0f} B/doc  {sizes[name]['avg_fields']:5.1f} campos/doc")
+
+    baseline = next(iter(VARIANTS))
+    for name in list(VARIANTS)[1:]:
+        logger.info(
+            f"  - {name} / {baseline}: "
+            f"{sizes[name]['bytes'] / sizes[baseline]['bytes'] * 100:5.1f}% del tamaño, "
+            f"{sizes[baseline]['avg_bytes'] / sizes[name]['avg_bytes']:5.2f}x documentos "
+            f"por MB de caché")
+
+    if args.offline:
+        return
+
+    conn = MongoDBConnection()
+    previous_cache = set_cache_size(conn, args.cache_mb) if args.cache_mb else None
+    try:
+        stats = {name: measure_server(conn, name, docs, args.repeat)
+                 for name, docs in documents.items()}
+        for name in list(VARIANTS)[1:]:
+            logger.info(
+                f"  - {name} / {baseline}: size "
+                f"{stats[name]['size'] / stats[baseline]['size'] * 100:5.1f}%, storageSize "
+                f"{stats[name]['storageSize'] / stats[baseline]['storageSize'] * 100:5.1f}%, "
+                f"aciertos de caché {stats[baseline]['hit_ratio'] * 100:5.1f}% -> "
+                f"{stats[name]['hit_ratio'] * 100:5.1f}%")
+    finally:
+        if previous_cache is not None:
+            conn.get_database('admin').command({
+                'setParameter': 1,
+                'wiredTigerEngineRuntimeConfig': f"cache_size={previous_cache // 1024 // 1024}M"})
+        for name in VARIANTS:
+            conn.get_database().drop_collection(f"{BENCHMARK_COLLECTION}_{name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -13,7 +13,10 @@ from tqdm import tqdm
 # Agregar src al path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from src.config import RAW_DATA_DIR, AIRBNB_DATA_URL
+from src.config import (
+    RAW_DATA_DIR, AIRBNB_DATA_URL, AIRBNB_SNAPSHOT_URL, AIRBNB_ARTIFACTS, DOWNLOAD_WORKERS
+)
+from src.dataset_cache import Artifact, DatasetCache, fetch_artifacts
 
 logging.basicConfig(
     level=logging.INFO,
@@ -65,12 +68,13 @@ def download_file(url: str, destination: Path, chunk_size: int = 8192) -> bool:
         return False
 
 
-def decompress_gzip(gzip_file: Path) -> Path:
+def decompress_gzip(gzip_file: Path, keep_archive: bool = False) -> Path:
     """
     Descomprime un archivo .gz
     
     Args:
         gzip_file: Ruta del archivo .gz
+        keep_archive: Si True, conserva el .gz (p. ej. para la caché)
         
     Returns:
         Path: Ruta del archivo descomprimido
@@ -90,8 +94,9 @@ def decompress_gzip(gzip_file: Path) -> Path:
         logger.info(f"✅ Archivo descomprimido: {output_file}")
         
         # Eliminar archivo .gz
-        gzip_file.unlink()
-        logger.info(f"🗑️ Archivo .gz eliminado")
+        if not keep_archive:
+            gzip_file.unlink()
+            logger.info(f"🗑️ Archivo .gz eliminado")
         
         return output_file
         
@@ -100,51 +105,145 @@ def decompress_gzip(gzip_file: Path) -> Path:
         raise
 
 
+def build_artifacts(names, listings_url: str, snapshot_url: str, sha256: str = None):
+    """
+    Construye la lista de artefactos del snapshot a descargar
+    
+    Args:
+        names: Nombres de artefactos (claves de AIRBNB_ARTIFACTS)
+        listings_url: URL de los listings (permite sobreescribirla con --url)
+        snapshot_url: Raíz del snapshot de la que cuelgan el resto
+        sha256: Checksum esperado de los listings (opcional)
+        
+    Returns:
+        List[Artifact]: Artefactos con su URL y destino en RAW_DATA_DIR
+    """
+    artifacts = []
+    for name in names:
+        path, filename = AIRBNB_ARTIFACTS[name]
+        if name == 'listings':
+            artifacts.append(Artifact(name, listings_url, RAW_DATA_DIR / filename, sha256))
+        else:
+            artifacts.append(Artifact(name, f"{snapshot_url.rstrip('/')}/{path}",
+                                      RAW_DATA_DIR / filename))
+    return artifacts
+
+
 def main():
     """Función principal"""
+    import time
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description='Descargar el dataset de Airbnb Madrid'
+    )
+    parser.add_argument(
+        '--artifacts',
+        nargs='+',
+        choices=list(AIRBNB_ARTIFACTS),
+        default=list(AIRBNB_ARTIFACTS),
+        help='Artefactos del snapshot a descargar (default: todos)'
+    )
+    parser.add_argument(
+        '--url',
+        default=AIRBNB_DATA_URL,
+        help='URL de los listings (default: AIRBNB_DATA_URL)'
+    )
+    parser.add_argument(
+        '--snapshot-url',
+        default=AIRBNB_SNAPSHOT_URL,
+        help='Raíz del snapshot para el resto de artefactos (default: AIRBNB_SNAPSHOT_URL)'
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=DOWNLOAD_WORKERS,
+        help=f'Descargas simultáneas (default: {DOWNLOAD_WORKERS})'
+    )
+    parser.add_argument(
+        '--retries',
+        type=int,
+        default=3,
+        help='Reintentos por artefacto con backoff exponencial (default: 3)'
+    )
+    parser.add_argument(
+        '--force',
+        action='store_true',
+        help='Descargar aunque la versión en caché esté al día'
+    )
+    parser.add_argument(
+        '--sha256',
+        help='Checksum esperado del archivo de listings'
+    )
+    parser.add_argument(
+        '--verify',
+        action='store_true',
+        help='Recalcular el sha256 de los archivos en caché antes de aceptarlos'
+    )
+    parser.add_argument(
+        '--decompress',
+        action='store_true',
+        help='Descomprimir a madrid_listings.csv (los importadores leen el .gz directamente)'
+    )
+    args = parser.parse_args()
     
     print("\n" + "="*60)
     print("📥 DESCARGA DE DATASET DE AIRBNB MADRID")
     print("="*60 + "\n")
     
-    # Crear directorio si no existe
-    RAW_DATA_DIR.mkdir(parents=True, exist_ok=True)
+    # La caché guarda ETag/Last-Modified y sha256 por URL
+    cache = DatasetCache(RAW_DATA_DIR)
+    artifacts = build_artifacts(args.artifacts, args.url, args.snapshot_url, args.sha256)
+    for artifact in artifacts:
+        logger.info(f"🔗 {artifact.name}: {artifact.url}")
     
-    # Archivo de destino
-    filename = "madrid_listings.csv.gz"
-    destination = RAW_DATA_DIR / filename
+    started = time.perf_counter()
+    with tqdm(desc=f"{len(artifacts)} artefactos", unit='iB', unit_scale=True,
+              unit_divisor=1024) as progress_bar:
+        results = fetch_artifacts(cache, artifacts, max_workers=args.workers,
+                                  retries=args.retries, force=args.force,
+                                  verify=args.verify, progress=progress_bar.update)
+    elapsed = time.perf_counter() - started
     
-    # Verificar si ya existe
-    csv_file = RAW_DATA_DIR / "madrid_listings.csv"
-    if csv_file.exists():
-        logger.warning(f"⚠️ El archivo ya existe: {csv_file}")
-        response = input("¿Deseas descargarlo nuevamente? (s/n): ")
-        if response.lower() != 's':
-            logger.info("Descarga cancelada")
-            return
-        csv_file.unlink()
+    failed = [name for name, result in results.items() if isinstance(result, Exception)]
+    fetched = {name: result for name, result in results.items() if name not in failed}
     
-    # Descargar archivo
-    success = download_file(AIRBNB_DATA_URL, destination)
+    for artifact in artifacts:
+        result = fetched.get(artifact.name)
+        if result is None:
+            continue
+        logger.info(
+            f"📄 {result.path.name}: {result.size / (1024 * 1024):,.2f} MB, "
+            f"{result.bytes_transferred / (1024 * 1024):,.2f} MB transferidos "
+            f"({result.status}, {result.elapsed:.1f}s)")
+        logger.info(f"   🔐 sha256: {result.sha256}")
     
-    if not success:
-        logger.error("❌ No se pudo descargar el dataset")
-        sys.exit(1)
+    # Throughput agregado y comparación con la suma de descargas secuenciales
+    transferred = sum(result.bytes_transferred for result in fetched.values())
+    sequential = sum(result.elapsed for result in fetched.values())
+    logger.info(
+        f"\n📡 Transferido: {transferred / (1024 * 1024):,.2f} MB en {elapsed:.1f}s "
+        f"({transferred / (1024 * 1024) / max(elapsed, 1e-9):,.2f} MB/s)")
+    if len(fetched) > 1:
+        logger.info(f"⏱️ Suma de tiempos por artefacto: {sequential:.1f}s "
+                    f"(paralelo: {elapsed:.1f}s)")
     
-    # Descomprimir
-    logger.info("\n📦 Descomprimiendo archivo...")
-    csv_file = decompress_gzip(destination)
+    if failed:
+        logger.error(f"❌ No se pudieron descargar: {', '.join(sorted(failed))}")
+        sys.exit(1)
     
-    # Verificar archivo
-    file_size_mb = csv_file.stat().st_size / (1024 * 1024)
-    logger.info(f"\n✅ Dataset descargado exitosamente!")
-    logger.info(f"📄 Archivo: {csv_file.name}")
-    logger.info(f"📊 Tamaño: {file_size_mb:.2f} MB")
+    # Los importadores descomprimen en streaming: solo se infla a disco si se pide
+    listings = fetched.get('listings')
+    if args.decompress and listings is not None:
+        csv_file = listings.path.with_suffix('')
+        if listings.changed or not csv_file.exists():
+            logger.info("\n📦 Descomprimiendo archivo...")
+            decompress_gzip(listings.path, keep_archive=True)
     
     print("\n" + "="*60)
     print("🎉 ¡DESCARGA COMPLETADA!")
     print("="*60)
-    print(f"\n📍 Ubicación: {csv_file}")
+    print(f"\n📍 Ubicación: {RAW_DATA_DIR}")
     print("\n💡 Siguiente paso: Ejecuta 'python scripts/import_data.py' para importar a MongoDB\n")
 
 
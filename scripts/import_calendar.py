@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Script para importar calendar.csv a una colección time-series de MongoDB
+
+El archivo tiene una fila por listing y día (millones de filas), así que se
+lee por chunks con un techo de memoria y se inserta en lotes sin pasar por
+un DataFrame completo.
+"""
+
+import sys
+import time
+import logging
+from pathlib import Path
+from typing import Optional
+from tqdm import tqdm
+
+# Agregar src al path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.database import MongoDBConnection
+from src.bulk_writer import create_insert_engine
+from src.streaming import find_csv_source, iter_csv_chunks, peak_memory_mb
+from src.availability import AvailabilityIndexBuilder
+from src.calendar_data import (
+    CALENDAR_COLUMNS, CalendarCRUD, calendar_documents, clean_calendar_chunk,
+    ensure_calendar_collection
+)
+from src.config import (
+    RAW_DATA_DIR, CALENDAR_COLLECTION_NAME, AVAILABILITY_COLLECTION_NAME,
+    IMPORT_BATCH_SIZE, IMPORT_WORKERS
+)
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+def import_calendar(
+    csv_path: Path,
+    collection_name: str = CALENDAR_COLLECTION_NAME,
+    batch_size: int = 5000,
+    clear_existing: bool = True,
+    workers: int = 0,
+    pre_encode: bool = False,
+    chunk_rows: Optional[int] = None,
+    max_memory_mb: float = 512,
+    build_availability: bool = True
+) -> int:
+    """
+    Importa calendar.csv a la colección time-series del calendario
+
+    calendar.csv viene ordenado por listing_id, de modo que cada lote
+    contiene días consecutivos de pocos listings y llena buckets completos.
+
+    Args:
+        csv_path: Ruta del calendar.csv (.csv, .csv.gz o .csv.zst)
+        collection_name: Nombre de la colección time-series
+        batch_size: Documentos por lote de inserción
+        clear_existing: Si True, elimina y recrea la colección
+        workers: Lotes concurrentes en vuelo (0 = inserción secuencial)
+        pre_encode: Si True, pre-codifica los lotes a BSON (requiere workers)
+        chunk_rows: Filas por chunk del parser (opcional, por defecto se estima)
+        max_memory_mb: Techo de memoria del proceso en MB
+        build_availability: Si True, construye también los bitmaps de
+            disponibilidad por listing (AVAILABILITY_COLLECTION_NAME)
+
+    Returns:
+        int: Total de documentos insertados
+    """
+    logger.info("🔌 Conectando a MongoDB...")
+    conn = MongoDBConnection()
+    db = conn.get_database()
+
+    if clear_existing and collection_name in db.list_collection_names():
+        logger.info(f"🗑️ Eliminando colección '{collection_name}'...")
+        db.drop_collection(collection_name)
+
+    collection = ensure_calendar_collection(db, collection_name)
+
+    logger.info(f"📖 Leyendo archivo: {csv_path}")
+    started = time.perf_counter()
+    rows = 0
+    total_inserted = 0
+
+    builder = AvailabilityIndexBuilder() if build_availability else None
+
+    engine = None
+    progress = tqdm(desc="Importando", unit=" días")
+    if workers > 0:
+        # Sin created_at/updated_at: los documentos de medida se mantienen mínimos
+        engine = create_insert_engine(collection, batch_size, workers, pre_encode=pre_encode,
+                                      timestamps=False, progress=progress.update)
+
+    try:
+        chunks = iter_csv_chunks(
+            csv_path, max_memory_mb, chunk_rows,
+            usecols=lambda col: col in CALENDAR_COLUMNS, dtype=str)
+        for chunk in chunks:
+            rows += len(chunk)
+            chunk = clean_calendar_chunk(chunk)
+            if builder is not None:
+                builder.add(chunk)
+            documents = calendar_documents(chunk)
+            if engine is not None:
+                engine.insert(documents)
+                continue
+            for i in range(0, len(documents), batch_size):
+                result = collection.insert_many(documents[i:i+batch_size], ordered=False)
+                total_inserted += len(result.inserted_ids)
+                progress.update(len(result.inserted_ids))
+    finally:
+        if engine is not None:
+            engine.close()
+        progress.close()
+
+    if engine is not None:
+        engine.log_summary()
+        total_inserted = engine.inserted
+
+    elapsed = time.perf_counter() - started
+    logger.info(
+        f"✅ Importación completada: {total_inserted:,} de {rows:,} filas "
+        f"en {elapsed:.1f}s ({total_inserted / max(elapsed, 1e-9):,.0f} docs/s)")
+
+    # Bitmaps de disponibilidad para búsquedas por rango de fechas
+    if builder is not None:
+        index = builder.build()
+        logger.info(
+            f"🗓️ Bitmaps de disponibilidad: {len(index):,} listings desde {index.start}")
+        index.save(db[AVAILABILITY_COLLECTION_NAME])
+
+    # Estadísticas de los buckets
+    buckets = CalendarCRUD(collection_name).get_bucket_stats()
+    if buckets:
+        logger.info("\n📊 Buckets time-series:")
+        logger.info(f"  - Buckets: {buckets.get('bucketCount', 0):,}")
+        logger.info(f"  - Tamaño medio por bucket: {buckets.get('avgBucketSize', 0) / 1024:,.1f} KB")
+        logger.info(f"  - Medidas por commit: {buckets.get('avgNumMeasurementsPerCommit', 0):,}")
+
+    peak = peak_memory_mb()
+    if peak is not None:
+        logger.info(f"🧠 Pico de memoria: {peak:,.1f} MB")
+    return total_inserted
+
+
+def main():
+    """Función principal"""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description='Importar calendar.csv a una colección time-series'
+    )
+    parser.add_argument(
+        '--file',
+        help='Ruta del calendar.csv (default: madrid_calendar.csv* en RAW_DATA_DIR)'
+    )
+    parser.add_argument(
+        '--collection',
+        default=CALENDAR_COLLECTION_NAME,
+        help=f'Nombre de la colección (default: {CALENDAR_COLLECTION_NAME})'
+    )
+    parser.add_argument(
+        '--no-clear',
+        action='store_true',
+        help='NO eliminar la colección antes de importar'
+    )
+    parser.add_argument(
+        '--batch-size',
+        type=int,
+        default=max(IMPORT_BATCH_SIZE, 5000),
+        help='Documentos por lote de inserción (default: max(IMPORT_BATCH_SIZE, 5000))'
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=IMPORT_WORKERS,
+        help='Lotes insert_many(ordered=False) concurrentes (0 = secuencial)'
+    )
+    parser.add_argument(
+        '--pre-encode',
+        action='store_true',
+        help='Pre-codificar a BSON en hilos y cortar lotes por bytes (requiere --workers)'
+    )
+    parser.add_argument(
+        '--chunk-rows',
+        type=int,
+        help='Filas por chunk del parser (por defecto se estima con --max-memory)'
+    )
+    parser.add_argument(
+        '--max-memory',
+        type=float,
+        default=512,
+        help='Techo de memoria del proceso en MB (default: 512)'
+    )
+    parser.add_argument(
+        '--no-availability-index',
+        action='store_true',
+        help='NO construir los bitmaps de disponibilidad por listing'
+    )
+
+    args = parser.parse_args()
+
+    if args.pre_encode and args.workers <= 0:
+        logger.error("❌ --pre-encode requiere --workers > 0")
+        sys.exit(1)
+
+    csv_file = Path(args.file) if args.file else find_csv_source(RAW_DATA_DIR, "madrid_calendar")
+    if csv_file is None or not csv_file.exists():
+        logger.error(f"❌ No se encontró el archivo: {csv_file or RAW_DATA_DIR / 'madrid_calendar.csv.gz'}")
+        logger.info("💡 Ejecuta 'python scripts/download_dataset.py --artifacts calendar' primero")
+        sys.exit(1)
+
+    print("\n" + "="*70)
+    print("📅 IMPORTACIÓN DEL CALENDARIO (TIME-SERIES)")
+    print("="*70 + "\n")
+
+    import_calendar(
+        csv_file,
+        collection_name=args.collection,
+        batch_size=args.batch_size,
+        clear_existing=not args.no_clear,
+        workers=args.workers,
+        pre_encode=args.pre_encode,
+        chunk_rows=args.chunk_rows,
+        max_memory_mb=args.max_memory,
+        build_availability=not args.no_availability_index
+    )
+
+    print("\n" + "="*70)
+    print("🎉 ¡IMPORTACIÓN COMPLETADA!")
+    print("="*70 + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,13 +4,33 @@ Script para importar TU PROPIO dataset de Airbnb
 Soporta CSV con cualquier número de columnas
 """
 
-from src.crud_operations import AirbnbCRUD
+from src.crud_operations import AirbnbCRUD, assign_listing_ids
 from src.database import MongoDBConnection
+from src.cleaning import (
+    LISTING_COLUMNS, DEFAULT_FILLS, CleaningPlan
+)
+from src.streaming import iter_csv_chunks, peak_memory_mb
+from src.schema import listing_read_csv_kwargs, read_listings_csv, sample_listings_csv
+from src.bulk_writer import BulkInsertEngine, create_insert_engine
+from src.pipeline import ParallelImportPipeline
+from src.delta import DeltaImporter
+from src.arrow_ingest import ARROW_AVAILABLE, iter_bson_batches
+from src.checkpoints import STATE_COLLECTION, ImportCheckpoint, discard_partial_batch
+from src.validation import RejectedListings, rejected_collection_name
+from src.field_codec import get_codec
+from src.config import (
+    IMPORT_BATCH_SIZE, IMPORT_WORKERS, IMPORT_ADAPTIVE, SAMPLE_SEED, SAMPLE_STRATIFY,
+    LISTING_ID_AS_KEY, CLUSTERED_LISTINGS, SPARSE_DOCUMENTS, COMPACT_FIELDS
+)
 import os
 import sys
+import time
 import logging
 import pandas as pd
 from pathlib import Path
+from contextlib import nullcontext
+from functools import partial
+from typing import List, Optional
 from tqdm import tqdm
 from datetime import datetime
 
@@ -24,6 +44,10 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Planes de limpieza (se compilan una vez por cabecera y se reutilizan por chunk)
+CUSTOM_CLEANING_PLAN = CleaningPlan(select=LISTING_COLUMNS, price_fill=0, fills=DEFAULT_FILLS)
+FULL_CLEANING_PLAN = CleaningPlan(price_fill=0, fills=DEFAULT_FILLS)
+
 
 def analyze_columns(df: pd.DataFrame) -> dict:
     """
@@ -47,140 +71,43 @@ def analyze_columns(df: pd.DataFrame) -> dict:
     return info
 
 
-def clean_custom_dataframe(df: pd.DataFrame, keep_all_columns: bool = False) -> pd.DataFrame:
+def clean_custom_dataframe(
+    df: pd.DataFrame,
+    keep_all_columns: bool = False,
+    verbose: bool = True
+) -> pd.DataFrame:
     """
     Limpia y prepara TU DataFrame personalizado
 
     Args:
         df: DataFrame original
         keep_all_columns: Si True, mantiene TODAS las columnas del CSV original
+        verbose: Si False, el detalle por columna se registra en nivel DEBUG
 
     Returns:
         pd.DataFrame: DataFrame limpio
     """
-    import pandas as pd
-    logger.info("🧹 Limpiando datos personalizados...")
+    log = logger.info if verbose else logger.debug
+    log("🧹 Limpiando datos personalizados...")
 
     # Si keep_all_columns es True, usar todas las columnas
+    plan = FULL_CLEANING_PLAN if keep_all_columns else CUSTOM_CLEANING_PLAN
     if keep_all_columns:
-        logger.info(
+        log(
             f"📊 Manteniendo TODAS las columnas: {len(df.columns)} columnas")
     else:
-        # Columnas importantes estándar de Airbnb
-        important_cols = [
-            'id', 'listing_url', 'scrape_id', 'last_scraped',
-            'name', 'description', 'neighborhood_overview', 'picture_url',
-            'host_id', 'host_url', 'host_name', 'host_since', 'host_location',
-            'host_about', 'host_response_time', 'host_response_rate',
-            'host_acceptance_rate', 'host_is_superhost', 'host_thumbnail_url',
-            'host_picture_url', 'host_neighbourhood', 'host_listings_count',
-            'host_total_listings_count', 'host_verifications',
-            'host_has_profile_pic', 'host_identity_verified',
-            'neighbourhood', 'neighbourhood_cleansed', 'neighbourhood_group_cleansed',
-            'latitude', 'longitude', 'property_type', 'room_type',
-            'accommodates', 'bathrooms', 'bathrooms_text', 'bedrooms', 'beds',
-            'amenities', 'price', 'minimum_nights', 'maximum_nights',
-            'minimum_minimum_nights', 'maximum_minimum_nights',
-            'minimum_maximum_nights', 'maximum_maximum_nights',
-            'minimum_nights_avg_ntm', 'maximum_nights_avg_ntm',
-            'calendar_updated', 'has_availability', 'availability_30',
-            'availability_60', 'availability_90', 'availability_365',
-            'calendar_last_scraped', 'number_of_reviews', 'number_of_reviews_ltm',
-            'number_of_reviews_l30d', 'first_review', 'last_review',
-            'review_scores_rating', 'review_scores_accuracy',
-            'review_scores_cleanliness', 'review_scores_checkin',
-            'review_scores_communication', 'review_scores_location',
-            'review_scores_value', 'license', 'instant_bookable',
-            'calculated_host_listings_count', 'calculated_host_listings_count_entire_homes',
-            'calculated_host_listings_count_private_rooms',
-            'calculated_host_listings_count_shared_rooms',
-            'reviews_per_month'
-        ]
-
-        # Seleccionar solo columnas que existen
-        available_cols = [col for col in important_cols if col in df.columns]
-        df = df[available_cols].copy()
-        logger.info(
-            f"📊 Columnas seleccionadas: {len(available_cols)} de {len(important_cols)} estándar")
-
-    # LIMPIEZA UNIVERSAL (aplica a cualquier dataset)
-
-    # 1. Limpiar precios (remover $ y convertir a float)
-    if 'price' in df.columns:
-        logger.info("💰 Limpiando campo 'price'...")
-        # FIX: Agregar r antes del string
-        df['price'] = df['price'].replace(r'[\$,]', '', regex=True)
-        df['price'] = pd.to_numeric(df['price'], errors='coerce')
-        df['price'] = df['price'].fillna(0)
-
-    # 2. Convertir fechas
-    date_columns = ['last_scraped', 'host_since', 'calendar_updated',
-                    'first_review', 'last_review', 'calendar_last_scraped']
-    for col in date_columns:
-        if col in df.columns:
-            logger.info(f"📅 Convirtiendo fecha: {col}")
-            df[col] = pd.to_datetime(df[col], errors='coerce')
-
-    # 3. Convertir booleanos
-    boolean_columns = ['host_is_superhost', 'host_has_profile_pic',
-                       'host_identity_verified', 'has_availability', 'instant_bookable']
-    for col in boolean_columns:
-        if col in df.columns:
-            logger.info(f"✓ Convirtiendo booleano: {col}")
-            df[col] = df[col].map({'t': True, 'f': False})
-
-    # 4. Convertir porcentajes a float
-    percentage_columns = ['host_response_rate', 'host_acceptance_rate']
-    for col in percentage_columns:
-        if col in df.columns:
-            logger.info(f"% Convirtiendo porcentaje: {col}")
-            df[col] = df[col].replace('%', '', regex=True)
-            df[col] = pd.to_numeric(df[col], errors='coerce') / 100
-
-    # 5. Rellenar valores nulos comunes
-    if 'reviews_per_month' in df.columns:
-        df['reviews_per_month'] = df['reviews_per_month'].fillna(0)
-
-    if 'name' in df.columns:
-        df['name'] = df['name'].fillna('Sin nombre')
-
-    if 'host_name' in df.columns:
-        df['host_name'] = df['host_name'].fillna('Sin nombre')
-
-    # 6. Crear campo de ubicación geoespacial (GeoJSON)
-    if 'latitude' in df.columns and 'longitude' in df.columns:
-        logger.info("🗺️ Creando campo geoespacial 'location'...")
-        df['location'] = df.apply(
-            lambda row: {
-                "type": "Point",
-                "coordinates": [float(row['longitude']), float(row['latitude'])]
-            } if pd.notna(row['latitude']) and pd.notna(row['longitude']) else None,
-            axis=1
-        )
-        # Filtrar registros sin coordenadas válidas
-        original_count = len(df)
-        df = df[df['location'].notna()]
-        removed = original_count - len(df)
-        if removed > 0:
-            logger.warning(
-                f"⚠️ Removidos {removed} registros sin coordenadas válidas")
-
-    # 7. CRÍTICO: Convertir NaT/NaN a None para MongoDB
-    logger.info("🔧 Convirtiendo valores NaT/NaN a None para MongoDB...")
+        selected, _ = plan.compile(df.columns)
+        log(
+            f"📊 Columnas seleccionadas: {len(selected)} de {len(LISTING_COLUMNS)} estándar")
 
-    # Convertir fechas NaT a None
-    date_columns = ['last_scraped', 'host_since', 'calendar_updated',
-                    'first_review', 'last_review', 'calendar_last_scraped']
-    for col in date_columns:
-        if col in df.columns:
-            # Reemplazar NaT con None
-            df[col] = df[col].apply(lambda x: None if pd.isna(x) else x)
+    # LIMPIEZA UNIVERSAL (aplica a cualquier dataset): precios, fechas,
+    # booleanos, porcentajes, nulos comunes y campo GeoJSON 'location'.
+    # Los NaT/NaN se convierten a None al generar los documentos
+    # (ver dataframe_to_documents)
+    log(f"⚙️ Plan de limpieza: {plan.describe(df.columns)}")
+    df = plan.apply(df)
 
-    # Convertir NaN numéricos a None
-    for col in df.select_dtypes(include=['float64', 'int64']).columns:
-        df[col] = df[col].apply(lambda x: None if pd.isna(x) else x)
-
-    logger.info(
+    log(
         f"✅ Datos limpios: {len(df)} registros, {len(df.columns)} columnas")
 
     return df
@@ -192,7 +119,19 @@ def import_custom_data(
     sample_size: int = 0,
     batch_size: int = 1000,
     keep_all_columns: bool = False,
-    clear_existing: bool = True
+    clear_existing: bool = True,
+    workers: int = 0,
+    pre_encode: bool = False,
+    adaptive: bool = False,
+    delta: bool = False,
+    delta_removed: str = 'flag',
+    sample_seed: int = SAMPLE_SEED,
+    sample_stratify: Optional[str] = SAMPLE_STRATIFY,
+    id_as_key: bool = LISTING_ID_AS_KEY,
+    clustered: bool = CLUSTERED_LISTINGS,
+    sparse: bool = SPARSE_DOCUMENTS,
+    compact: bool = COMPACT_FIELDS,
+    build_indexes: bool = True
 ) -> None:
     """
     Importa TU dataset personalizado de Airbnb a MongoDB
@@ -204,13 +143,38 @@ def import_custom_data(
         batch_size: Tamaño del lote para inserción
         keep_all_columns: Si True, mantiene todas las columnas del CSV
         clear_existing: Si True, elimina datos existentes antes de importar
+        workers: Lotes concurrentes en vuelo (0 = inserción secuencial)
+        pre_encode: Si True, los lotes se pre-codifican a BSON en hilos
+            y se cortan al tamaño máximo de mensaje del servidor
+        adaptive: Si True, lotes por bytes y latencia con reintentos y
+            bisección (AdaptiveBulkWriter); implica al menos un lote en vuelo
+        delta: Si True, solo escribe listings nuevos o modificados (por 'id')
+        delta_removed: 'flag' o 'delete' para listings que desaparecen
+        sample_seed: Semilla del muestreo (misma semilla = misma muestra)
+        sample_stratify: Columna para muestreo estratificado (opcional)
+        id_as_key: Si True, el id de Inside Airbnb se guarda como _id
+        clustered: Si True, la colección se crea clustered por _id
+        sparse: Si True, los campos nulos se omiten en los documentos
+        compact: Si True, los documentos se guardan con claves compactas (FieldCodec)
+        build_indexes: Si False, no crea los índices al terminar (carga
+            masiva: los reconstruye deferred_indexes al salir)
     """
+    if adaptive:
+        workers = max(workers, 1)
+
     try:
         logger.info(f"📖 Leyendo archivo: {csv_path}")
 
-        # Leer CSV
-        df = pd.read_csv(csv_path, low_memory=False)
-        logger.info(f"✅ Archivo cargado: {len(df):,} registros")
+        # Leer CSV tipado (sin --keep-all, solo las columnas estándar); con
+        # muestra se lee en streaming y solo se conserva el reservorio
+        columns = None if keep_all_columns else LISTING_COLUMNS
+        if sample_size > 0:
+            df = sample_listings_csv(csv_path, sample_size, columns,
+                                     seed=sample_seed, stratify=sample_stratify)
+            logger.info(f"📊 Usando muestra de {len(df):,} registros")
+        else:
+            df = read_listings_csv(csv_path, columns, low_memory=False)
+            logger.info(f"✅ Archivo cargado: {len(df):,} registros")
 
         # Analizar columnas
         info = analyze_columns(df)
@@ -227,61 +191,75 @@ def import_custom_data(
         # Mostrar primeras columnas
         logger.info(f"\n📋 Primeras 10 columnas: {info['columns'][:10]}")
 
-        # Aplicar sample si se especifica
-        if sample_size > 0:
-            df = df.sample(n=min(sample_size, len(df)), random_state=42)
-            logger.info(f"📊 Usando muestra de {len(df):,} registros")
-
         # Limpiar datos
         df = clean_custom_dataframe(df, keep_all_columns=keep_all_columns)
 
         # Conectar a MongoDB
         logger.info("🔌 Conectando a MongoDB...")
         conn = MongoDBConnection()
-        crud = AirbnbCRUD(collection_name=collection_name)
+        # Los documentos salen ya codificados de la validación: el CRUD escribe tal cual
+        crud = AirbnbCRUD(collection_name=collection_name, id_as_key=id_as_key,
+                          sparse=sparse, codec=None)
+        codec = get_codec(compact)
 
         # Verificar si la colección ya tiene datos
-        existing_count = crud.get_total_listings()
-        if existing_count > 0:
-            logger.warning(
-                f"⚠️ La colección '{collection_name}' ya tiene {existing_count:,} documentos")
-            if clear_existing:
-                logger.info("🗑️ Eliminando datos existentes...")
-                crud.collection.delete_many({})
-                logger.info("✅ Datos existentes eliminados")
-            else:
-                logger.info("⏭️ Agregando datos sin eliminar existentes")
+        if not delta:
+            _prepare_collection(crud, collection_name, clear_existing)
+        if clustered:
+            conn.ensure_clustered(collection_name)
 
-        # Convertir a documentos
-        documents = df.to_dict('records')
+        # Validar contra el esquema y convertir a documentos (rechazos a cuarentena)
+        quarantine = RejectedListings(
+            conn.get_collection(rejected_collection_name(collection_name)),
+            source=str(csv_path), clear=clear_existing and not delta)
+        documents = quarantine.filter(df, sparse=sparse, codec=codec)
+        quarantine.log_summary()
+        if id_as_key:
+            assign_listing_ids(documents)
 
         # Importar en lotes
         logger.info(f"📥 Importando {len(documents):,} documentos...")
 
-        total_inserted = 0
-        for i in tqdm(range(0, len(documents), batch_size), desc="Importando"):
-            batch = documents[i:i+batch_size]
+        if delta:
+            _add_metadata(documents)
+            started = time.perf_counter()
+            importer = DeltaImporter(
+                crud.collection, key=_delta_key(id_as_key),
+                removed=delta_removed, batch_size=batch_size)
+            importer.apply(tqdm(documents, desc="Delta"))
+            importer.finish()
+            importer.log_summary(time.perf_counter() - started)
+            total_inserted = importer.counts['inserted'] + importer.counts['updated']
+        elif workers > 0:
+            _add_metadata(documents)
+            with tqdm(total=len(documents), desc="Importando") as progress, \
+                    create_insert_engine(crud.collection, batch_size, workers,
+                                         pre_encode=pre_encode, adaptive=adaptive,
+                                         on_reject=quarantine.write,
+                                         progress=progress.update) as engine:
+                engine.insert(documents)
+            engine.log_summary()
+            total_inserted = engine.inserted
+        else:
+            total_inserted = 0
+            for i in tqdm(range(0, len(documents), batch_size), desc="Importando"):
+                batch = documents[i:i+batch_size]
 
-            # Agregar metadata
-            for doc in batch:
-                doc['imported_at'] = datetime.now()
-                doc['source'] = 'custom_import'
+                # Agregar metadata
+                _add_metadata(batch)
 
-            result = crud.create_many_listings(batch)
-            total_inserted += len(result.inserted_ids)
+                result = crud.create_many_listings(batch)
+                total_inserted += len(result.inserted_ids)
 
         logger.info(f"✅ Importación completada: {total_inserted:,} documentos")
 
-        # Crear índices
-        logger.info("📑 Creando índices...")
-        conn.create_indexes(collection_name)
+        # Crear índices (en carga masiva los reconstruye deferred_indexes)
+        if build_indexes:
+            logger.info("📑 Creando índices...")
+            conn.create_indexes(collection_name)
 
         # Mostrar estadísticas
-        stats = conn.get_collection_stats(collection_name)
-        logger.info(f"\n📊 ESTADÍSTICAS DE LA COLECCIÓN '{collection_name}':")
-        logger.info(f"  - Documentos: {stats['count']:,}")
-        logger.info(f"  - Tamaño: {stats['size'] / 1024 / 1024:.2f} MB")
-        logger.info(f"  - Índices: {stats['indexes']}")
+        _log_collection_stats(conn, collection_name)
 
         # Estadísticas de datos
         if 'price' in df.columns:
@@ -309,6 +287,7 @@ def import_custom_data(
         logger.info(f"📝 Colección: {collection_name}")
         logger.info(f"📊 Total documentos: {total_inserted:,}")
         logger.info(f"📁 Columnas: {len(df.columns)}")
+        _log_peak_memory()
 
     except FileNotFoundError:
         logger.error(f"❌ Archivo no encontrado: {csv_path}")
@@ -320,6 +299,516 @@ def import_custom_data(
         raise
 
 
+def _prepare_collection(
+    crud: AirbnbCRUD,
+    collection_name: str,
+    clear_existing: bool
+) -> None:
+    """Avisa si la colección tiene datos y los elimina si se indica"""
+    existing_count = crud.get_total_listings()
+    if existing_count > 0:
+        logger.warning(
+            f"⚠️ La colección '{collection_name}' ya tiene {existing_count:,} documentos")
+        if clear_existing:
+            logger.info("🗑️ Eliminando datos existentes...")
+            crud.collection.delete_many({})
+            logger.info("✅ Datos existentes eliminados")
+        else:
+            logger.info("⏭️ Agregando datos sin eliminar existentes")
+
+
+def _delta_key(id_as_key: bool) -> str:
+    """Campo por el que el delta identifica cada listing"""
+    return '_id' if id_as_key else 'id'
+
+
+def _log_collection_stats(conn: MongoDBConnection, collection_name: str) -> None:
+    """Registra las estadísticas de la colección"""
+    stats = conn.get_collection_stats(collection_name)
+    logger.info(f"\n📊 ESTADÍSTICAS DE LA COLECCIÓN '{collection_name}':")
+    logger.info(f"  - Documentos: {stats['count']:,}")
+    logger.info(f"  - Tamaño: {stats['size'] / 1024 / 1024:.2f} MB")
+    logger.info(f"  - Tamaño medio por documento: {stats['avgObjSize']:,.0f} bytes")
+    logger.info(f"  - Índices: {stats['indexes']}")
+
+
+def _add_metadata(documents: list) -> None:
+    """Agrega la metadata de importación a los documentos"""
+    now = datetime.now()
+    for doc in documents:
+        doc['imported_at'] = now
+        doc['source'] = 'custom_import'
+
+
+def _log_peak_memory() -> None:
+    """Registra el pico de memoria del proceso"""
+    peak = peak_memory_mb()
+    if peak is not None:
+        logger.info(f"🧠 Pico de memoria: {peak:,.1f} MB")
+
+
+def import_custom_data_streaming(
+    csv_path: Path,
+    collection_name: str = "listings",
+    batch_size: int = 1000,
+    keep_all_columns: bool = False,
+    clear_existing: bool = True,
+    max_memory_mb: float = 512,
+    chunk_rows: Optional[int] = None,
+    workers: int = 0,
+    pre_encode: bool = False,
+    adaptive: bool = False,
+    delta: bool = False,
+    delta_removed: str = 'flag',
+    resume: bool = False,
+    id_as_key: bool = LISTING_ID_AS_KEY,
+    clustered: bool = CLUSTERED_LISTINGS,
+    sparse: bool = SPARSE_DOCUMENTS,
+    compact: bool = COMPACT_FIELDS,
+    build_indexes: bool = True
+) -> int:
+    """
+    Importa el dataset en streaming: lee, limpia e inserta chunk a chunk
+
+    La memoria queda acotada por el tamaño del chunk en lugar del tamaño
+    del CSV, por lo que no se calculan estadísticas sobre el dataset completo.
+
+    Args:
+        csv_path: Ruta del archivo CSV
+        collection_name: Nombre de la colección en MongoDB
+        batch_size: Tamaño del lote para inserción
+        keep_all_columns: Si True, mantiene todas las columnas del CSV
+        clear_existing: Si True, elimina datos existentes antes de importar
+        max_memory_mb: Techo de memoria del proceso en MB
+        chunk_rows: Filas por chunk (opcional, por defecto se estima)
+        workers: Lotes concurrentes en vuelo (0 = inserción secuencial)
+        pre_encode: Si True, los lotes se pre-codifican a BSON en hilos
+            y se cortan al tamaño máximo de mensaje del servidor
+        adaptive: Si True, lotes por bytes y latencia con reintentos y
+            bisección (AdaptiveBulkWriter); implica al menos un lote en vuelo
+        delta: Si True, solo escribe listings nuevos o modificados (por 'id')
+        delta_removed: 'flag' o 'delete' para listings que desaparecen
+        resume: Si True, registra un checkpoint por chunk y reanuda desde
+            el último confirmado si el archivo no ha cambiado
+        id_as_key: Si True, el id de Inside Airbnb se guarda como _id
+        clustered: Si True, la colección se crea clustered por _id
+        sparse: Si True, los campos nulos se omiten en los documentos
+        compact: Si True, los documentos se guardan con claves compactas (FieldCodec)
+        build_indexes: Si False, no crea los índices al terminar (carga
+            masiva: los reconstruye deferred_indexes al salir)
+
+    Returns:
+        int: Total de documentos insertados
+    """
+    if adaptive:
+        workers = max(workers, 1)
+
+    try:
+        logger.info("🔌 Conectando a MongoDB...")
+        conn = MongoDBConnection()
+        # Los documentos salen ya codificados de la validación: el CRUD escribe tal cual
+        crud = AirbnbCRUD(collection_name=collection_name, id_as_key=id_as_key,
+                          sparse=sparse, codec=None)
+        codec = get_codec(compact)
+
+        checkpoint = None
+        offset = 0
+        if resume:
+            checkpoint = ImportCheckpoint(
+                conn.get_collection(STATE_COLLECTION), csv_path, collection_name)
+            offset = checkpoint.load()
+
+        if offset > 0:
+            logger.info(
+                f"⏩ Reanudando desde la fila {offset:,} "
+                f"({checkpoint.documents:,} documentos ya importados)")
+        elif not delta:
+            _prepare_collection(crud, collection_name, clear_existing)
+        if clustered:
+            conn.ensure_clustered(collection_name)
+
+        if checkpoint is not None:
+            checkpoint.start()
+
+        quarantine = RejectedListings(
+            conn.get_collection(rejected_collection_name(collection_name)),
+            source=str(csv_path), clear=clear_existing and not delta and offset == 0)
+
+        logger.info(f"📖 Leyendo en streaming: {csv_path}")
+
+        total_read = 0
+        total_inserted = 0
+        # Al reanudar, el primer chunk cubre exactamente las filas del chunk
+        # interrumpido (si el checkpoint las registró); sus documentos ya
+        # escritos se eliminan antes de volver a enviarlo
+        discard_pending = offset > 0 and checkpoint.interrupted_rows != 0
+        first_chunk_rows = checkpoint.interrupted_rows if discard_pending else None
+        chunks = iter_csv_chunks(
+            csv_path, max_memory_mb=max_memory_mb, chunk_rows=chunk_rows,
+            first_chunk_rows=first_chunk_rows,
+            **listing_read_csv_kwargs(csv_path, None if keep_all_columns else LISTING_COLUMNS),
+            **(checkpoint.read_csv_kwargs() if checkpoint is not None else {}))
+
+        started = time.perf_counter()
+        with tqdm(desc="Importando", unit=" docs") as progress:
+            engine = None
+            importer = None
+            if delta:
+                importer = DeltaImporter(
+                    crud.collection, key=_delta_key(id_as_key),
+                    removed=delta_removed, batch_size=batch_size)
+            elif workers > 0:
+                engine = create_insert_engine(
+                    crud.collection, batch_size, workers, pre_encode=pre_encode,
+                    adaptive=adaptive, on_reject=quarantine.write, progress=progress.update)
+
+            for chunk in chunks:
+                total_read += len(chunk)
+                if checkpoint is not None:
+                    checkpoint.begin(offset + total_read)
+                chunk = clean_custom_dataframe(
+                    chunk, keep_all_columns=keep_all_columns, verbose=False)
+                documents = quarantine.filter(chunk, sparse=sparse, codec=codec)
+                del chunk
+
+                # Un chunk interrumpido pudo quedar escrito a medias
+                if discard_pending:
+                    discard_partial_batch(
+                        crud.collection, (doc.get('id') for doc in documents),
+                        since=checkpoint.interrupted_since)
+                    discard_pending = False
+
+                _add_metadata(documents)
+                if id_as_key:
+                    assign_listing_ids(documents)
+                if engine is not None:
+                    inserted, aborted = engine.inserted, engine.aborted
+                else:
+                    inserted = total_inserted
+                if importer is not None:
+                    importer.apply(documents)
+                    progress.update(len(documents))
+                elif engine is not None:
+                    engine.insert(documents)
+                else:
+                    for i in range(0, len(documents), batch_size):
+                        result = crud.create_many_listings(documents[i:i+batch_size])
+                        total_inserted += len(result.inserted_ids)
+                        progress.update(len(result.inserted_ids))
+
+                if checkpoint is not None:
+                    if engine is not None:
+                        engine.drain()
+                        # Un lote fallido completo (red, servidor) no se
+                        # confirma: al reanudar se vuelve a enviar el chunk
+                        if engine.aborted > aborted:
+                            raise engine.last_error
+                        written = engine.inserted - inserted
+                    elif importer is not None:
+                        written = len(documents)
+                    else:
+                        written = total_inserted - inserted
+                    checkpoint.commit(offset + total_read, written)
+
+                del documents
+
+            if importer is not None:
+                importer.finish()
+                total_inserted = importer.counts['inserted'] + importer.counts['updated']
+            elif engine is not None:
+                engine.close()
+                total_inserted = engine.inserted
+
+        if checkpoint is not None:
+            checkpoint.complete()
+
+        if importer is not None:
+            importer.log_summary(time.perf_counter() - started)
+        elif engine is not None:
+            engine.log_summary()
+        quarantine.log_summary()
+
+        logger.info(
+            f"✅ Importación completada: {total_inserted:,} documentos "
+            f"de {total_read:,} registros leídos")
+
+        # Crear índices (en carga masiva los reconstruye deferred_indexes)
+        if build_indexes:
+            logger.info("📑 Creando índices...")
+            conn.create_indexes(collection_name)
+
+        _log_collection_stats(conn, collection_name)
+        _log_peak_memory()
+        return total_inserted
+
+    except FileNotFoundError:
+        logger.error(f"❌ Archivo no encontrado: {csv_path}")
+        sys.exit(1)
+    except Exception as e:
+        logger.error(f"❌ Error durante la importación: {e}")
+        import traceback
+        traceback.print_exc()
+        raise
+
+
+def import_custom_data_parallel(
+    csv_paths: List[Path],
+    collection_name: str = "listings",
+    batch_size: int = 1000,
+    keep_all_columns: bool = False,
+    clear_existing: bool = True,
+    processes: Optional[int] = None,
+    workers: int = 0,
+    pre_encode: bool = False,
+    adaptive: bool = False,
+    delta: bool = False,
+    delta_removed: str = 'flag',
+    id_as_key: bool = LISTING_ID_AS_KEY,
+    clustered: bool = CLUSTERED_LISTINGS,
+    sparse: bool = SPARSE_DOCUMENTS,
+    compact: bool = COMPACT_FIELDS,
+    build_indexes: bool = True
+) -> int:
+    """
+    Importa uno o varios CSV con workers multiproceso y un escritor único
+
+    Un pool de procesos parsea y limpia los chunks en paralelo (varias
+    snapshots se reparten entre todos los núcleos) y los lotes listos pasan
+    por una cola acotada al escritor, que aplica backpressure.
+
+    Args:
+        csv_paths: Rutas de los archivos CSV
+        collection_name: Nombre de la colección en MongoDB
+        batch_size: Tamaño del lote para inserción
+        keep_all_columns: Si True, mantiene todas las columnas del CSV
+        clear_existing: Si True, elimina datos existentes antes de importar
+        processes: Procesos de parseo/limpieza (por defecto, CPUs)
+        workers: Lotes concurrentes en vuelo del escritor (0 = secuencial)
+        pre_encode: Si True, los lotes se pre-codifican a BSON en hilos
+            y se cortan al tamaño máximo de mensaje del servidor
+        adaptive: Si True, lotes por bytes y latencia con reintentos y
+            bisección (AdaptiveBulkWriter); implica al menos un lote en vuelo
+        delta: Si True, solo escribe listings nuevos o modificados (por 'id')
+        delta_removed: 'flag' o 'delete' para listings que desaparecen
+        id_as_key: Si True, el id de Inside Airbnb se guarda como _id
+        clustered: Si True, la colección se crea clustered por _id
+        sparse: Si True, los campos nulos se omiten en los documentos
+        compact: Si True, los documentos se guardan con claves compactas (FieldCodec)
+        build_indexes: Si False, no crea los índices al terminar (carga
+            masiva: los reconstruye deferred_indexes al salir)
+
+    Returns:
+        int: Total de documentos insertados
+    """
+    if adaptive:
+        workers = max(workers, 1)
+
+    try:
+        logger.info("🔌 Conectando a MongoDB...")
+        conn = MongoDBConnection()
+        # Los documentos salen ya codificados de la validación: el CRUD escribe tal cual
+        crud = AirbnbCRUD(collection_name=collection_name, id_as_key=id_as_key,
+                          sparse=sparse, codec=None)
+        codec = get_codec(compact)
+
+        if not delta:
+            _prepare_collection(crud, collection_name, clear_existing)
+        if clustered:
+            conn.ensure_clustered(collection_name)
+
+        clean = partial(
+            clean_custom_dataframe, keep_all_columns=keep_all_columns, verbose=False)
+        metadata = {'imported_at': datetime.now(), 'source': 'custom_import'}
+        quarantine = RejectedListings(
+            conn.get_collection(rejected_collection_name(collection_name)),
+            source=', '.join(str(path) for path in csv_paths),
+            clear=clear_existing and not delta)
+
+        started = time.perf_counter()
+        with tqdm(desc="Importando", unit=" docs") as progress:
+            engine = None
+            importer = None
+            inserted = [0]
+
+            if delta:
+                importer = DeltaImporter(
+                    crud.collection, key=_delta_key(id_as_key),
+                    removed=delta_removed, batch_size=batch_size)
+
+                def write(documents):
+                    importer.apply(documents)
+                    progress.update(len(documents))
+            elif workers > 0:
+                engine = create_insert_engine(
+                    crud.collection, batch_size, workers, pre_encode=pre_encode,
+                    adaptive=adaptive, on_reject=quarantine.write, progress=progress.update)
+                write = engine.insert
+            else:
+                def write(documents):
+                    for i in range(0, len(documents), batch_size):
+                        result = crud.create_many_listings(documents[i:i+batch_size])
+                        inserted[0] += len(result.inserted_ids)
+                        progress.update(len(result.inserted_ids))
+
+            if id_as_key:
+                insert = write
+
+                def write(documents):
+                    assign_listing_ids(documents)
+                    insert(documents)
+
+            # Varios archivos pueden tener cabeceras distintas: tipos y columnas
+            # en el parseo, las fechas se convierten al limpiar
+            read_kwargs = listing_read_csv_kwargs(
+                columns=None if keep_all_columns else LISTING_COLUMNS)
+            pipeline = ParallelImportPipeline(clean, write, processes=processes,
+                                              metadata=metadata, read_csv_kwargs=read_kwargs,
+                                              reject_func=quarantine.write, sparse=sparse,
+                                              codec=codec)
+            logger.info(
+                f"⚙️ Pipeline: {pipeline.processes} procesos, "
+                f"{len(csv_paths)} archivo(s)")
+            try:
+                summary = pipeline.run(csv_paths)
+            finally:
+                if engine is not None:
+                    engine.close()
+
+            if importer is not None:
+                importer.finish()
+                total_inserted = importer.counts['inserted'] + importer.counts['updated']
+            elif engine is not None:
+                total_inserted = engine.inserted
+            else:
+                total_inserted = inserted[0]
+
+        if importer is not None:
+            importer.log_summary(time.perf_counter() - started)
+        elif engine is not None:
+            engine.log_summary()
+        quarantine.log_summary()
+
+        logger.info(
+            f"✅ Importación completada: {total_inserted:,} documentos "
+            f"({summary['chunks']:,} chunks)")
+
+        # Crear índices (en carga masiva los reconstruye deferred_indexes)
+        if build_indexes:
+            logger.info("📑 Creando índices...")
+            conn.create_indexes(collection_name)
+
+        _log_collection_stats(conn, collection_name)
+        _log_peak_memory()
+        return total_inserted
+
+    except Exception as e:
+        logger.error(f"❌ Error durante la importación: {e}")
+        import traceback
+        traceback.print_exc()
+        raise
+
+
+def import_custom_data_arrow(
+    csv_path: Path,
+    collection_name: str = "listings",
+    batch_size: int = 1000,
+    keep_all_columns: bool = False,
+    clear_existing: bool = True,
+    workers: int = 0,
+    build_indexes: bool = True
+) -> int:
+    """
+    Importa el dataset con el motor Arrow: CSV tipado -> kernels -> BSON
+
+    Lee el CSV por bloques como RecordBatch de Arrow, aplica la limpieza de
+    clean_custom_dataframe con kernels de Arrow y codifica cada bloque a
+    BSON directamente desde los buffers columnares, sin DataFrames de
+    pandas ni dicts por fila. Las filas que no cumplen el esquema van a la
+    colección de cuarentena, como en el resto de caminos.
+
+    Args:
+        csv_path: Ruta del archivo CSV
+        collection_name: Nombre de la colección en MongoDB
+        batch_size: Tamaño del lote para inserción
+        keep_all_columns: Si True, mantiene todas las columnas del CSV
+        clear_existing: Si True, elimina datos existentes antes de importar
+        workers: Lotes concurrentes en vuelo (0 = inserción secuencial)
+        build_indexes: Si False, no crea los índices al terminar (carga
+            masiva: los reconstruye deferred_indexes al salir)
+
+    Returns:
+        int: Total de documentos insertados
+    """
+    try:
+        logger.info("🔌 Conectando a MongoDB...")
+        conn = MongoDBConnection()
+        crud = AirbnbCRUD(collection_name=collection_name)
+        _prepare_collection(crud, collection_name, clear_existing)
+
+        quarantine = RejectedListings(
+            conn.get_collection(rejected_collection_name(collection_name)),
+            source=str(csv_path), clear=clear_existing)
+
+        # Los RawBSONDocument son inmutables: la metadata y los timestamps
+        # se codifican como sufijo constante de cada documento
+        now = datetime.now()
+        metadata = {'imported_at': now, 'source': 'custom_import',
+                    'created_at': now, 'updated_at': now}
+        stats = {}
+
+        logger.info(f"🏹 Motor Arrow: leyendo {csv_path}")
+        started = time.perf_counter()
+        total_inserted = 0
+        with tqdm(desc="Importando", unit=" docs") as progress:
+            engine = None
+            if workers > 0:
+                engine = BulkInsertEngine(crud.collection, batch_size, workers,
+                                          timestamps=False, progress=progress.update,
+                                          on_reject=quarantine.write)
+            try:
+                for documents in iter_bson_batches(
+                        csv_path, keep_all_columns, metadata, stats=stats,
+                        on_reject=quarantine.write):
+                    if engine is not None:
+                        engine.insert(documents)
+                        continue
+                    for i in range(0, len(documents), batch_size):
+                        batch = documents[i:i+batch_size]
+                        crud.collection.insert_many(batch)
+                        total_inserted += len(batch)
+                        progress.update(len(batch))
+            finally:
+                if engine is not None:
+                    engine.close()
+
+        if engine is not None:
+            engine.log_summary()
+            total_inserted = engine.inserted
+        quarantine.log_summary()
+
+        if stats['removed']:
+            logger.warning(
+                f"⚠️ Se eliminaron {stats['removed']:,} registros sin coordenadas válidas")
+        logger.info(
+            f"✅ Importación completada: {total_inserted:,} documentos de "
+            f"{stats['rows']:,} filas en {time.perf_counter() - started:.1f}s")
+
+        # Crear índices (en carga masiva los reconstruye deferred_indexes)
+        if build_indexes:
+            logger.info("📑 Creando índices...")
+            conn.create_indexes(collection_name)
+
+        _log_collection_stats(conn, collection_name)
+        _log_peak_memory()
+        return total_inserted
+
+    except Exception as e:
+        logger.error(f"❌ Error durante la importación: {e}")
+        import traceback
+        traceback.print_exc()
+        raise
+
+
 def main():
     """Función principal"""
     import argparse
@@ -329,7 +818,8 @@ def main():
     )
     parser.add_argument(
         'csv_file',
-        help='Ruta al archivo CSV de Airbnb'
+        nargs='+',
+        help='Ruta al archivo CSV de Airbnb (varios solo con --processes)'
     )
     parser.add_argument(
         '--collection',
@@ -340,7 +830,18 @@ def main():
         '--sample',
         type=int,
         default=0,
-        help='Número de registros a importar (0 = todos)'
+        help='Número de registros a importar (0 = todos), muestreados en streaming'
+    )
+    parser.add_argument(
+        '--sample-seed',
+        type=int,
+        default=SAMPLE_SEED,
+        help=f'Semilla del muestreo (default: {SAMPLE_SEED})'
+    )
+    parser.add_argument(
+        '--sample-by',
+        default=SAMPLE_STRATIFY,
+        help='Columna para muestreo estratificado (p. ej. neighbourhood_cleansed)'
     )
     parser.add_argument(
         '--keep-all',
@@ -352,6 +853,98 @@ def main():
         action='store_true',
         help='NO eliminar datos existentes antes de importar'
     )
+    parser.add_argument(
+        '--batch-size',
+        type=int,
+        default=IMPORT_BATCH_SIZE,
+        help=f'Documentos por lote de inserción (default: {IMPORT_BATCH_SIZE})'
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=IMPORT_WORKERS,
+        help='Lotes insert_many(ordered=False) concurrentes (0 = secuencial)'
+    )
+    parser.add_argument(
+        '--pre-encode',
+        action='store_true',
+        help='Pre-codificar a BSON en hilos y cortar lotes por bytes (requiere --workers)'
+    )
+    parser.add_argument(
+        '--adaptive',
+        action='store_true',
+        default=IMPORT_ADAPTIVE,
+        help='Lotes por bytes y latencia, reintentos y bisección de lotes fallidos'
+    )
+    parser.add_argument(
+        '--id-as-key',
+        action='store_true',
+        default=LISTING_ID_AS_KEY,
+        help='Guardar el id de Inside Airbnb como _id (búsqueda por id = lectura puntual)'
+    )
+    parser.add_argument(
+        '--clustered',
+        action='store_true',
+        default=CLUSTERED_LISTINGS,
+        help='Crear la colección clustered por _id (MongoDB >= 5.3, con --id-as-key)'
+    )
+    parser.add_argument(
+        '--sparse',
+        action='store_true',
+        default=SPARSE_DOCUMENTS,
+        help='Omitir los campos nulos en los documentos (se leen como NaN)'
+    )
+    parser.add_argument(
+        '--compact-keys',
+        action='store_true',
+        default=COMPACT_FIELDS,
+        help='Guardar los campos con claves cortas (review_scores_rating -> rsr); '
+             'AirbnbCRUD y AirbnbVisualizer traducen las consultas'
+    )
+    parser.add_argument(
+        '--stream',
+        action='store_true',
+        help='Leer, limpiar e insertar por chunks con memoria acotada'
+    )
+    parser.add_argument(
+        '--max-memory-mb',
+        type=float,
+        default=512,
+        help='Techo de memoria en MB para el modo --stream (default: 512)'
+    )
+    parser.add_argument(
+        '--delta',
+        action='store_true',
+        help='Importación incremental: solo escribe listings nuevos o modificados'
+    )
+    parser.add_argument(
+        '--delta-removed',
+        choices=['flag', 'delete'],
+        default='flag',
+        help='Listings desaparecidos en modo --delta: marcar (removed_at) o eliminar'
+    )
+    parser.add_argument(
+        '--resume',
+        action='store_true',
+        help='Checkpoint por chunk y reanudación tras un corte (implica --stream)'
+    )
+    parser.add_argument(
+        '--bulk-load',
+        action='store_true',
+        help='Eliminar los índices secundarios durante la carga y reconstruirlos al final'
+    )
+    parser.add_argument(
+        '--engine',
+        choices=['pandas', 'arrow'],
+        default='pandas',
+        help='Motor de ingesta: pandas o arrow (requiere pyarrow)'
+    )
+    parser.add_argument(
+        '--processes',
+        type=int,
+        default=0,
+        help='Procesos de parseo/limpieza en paralelo (0 = desactivado)'
+    )
 
     args = parser.parse_args()
 
@@ -359,20 +952,145 @@ def main():
     print("📥 IMPORTACIÓN DE DATASET PERSONALIZADO DE AIRBNB")
     print("="*70 + "\n")
 
-    csv_path = Path(args.csv_file)
+    csv_paths = [Path(csv_file) for csv_file in args.csv_file]
 
-    if not csv_path.exists():
-        logger.error(f"❌ El archivo no existe: {csv_path}")
+    for csv_path in csv_paths:
+        if not csv_path.exists():
+            logger.error(f"❌ El archivo no existe: {csv_path}")
+            sys.exit(1)
+
+    if len(csv_paths) > 1 and args.processes <= 0:
+        logger.error("❌ Varios archivos requieren --processes")
         sys.exit(1)
 
-    # Importar datos
-    import_custom_data(
-        csv_path=csv_path,
-        collection_name=args.collection,
-        sample_size=args.sample,
-        keep_all_columns=args.keep_all,
-        clear_existing=not args.no_clear
-    )
+    csv_path = csv_paths[0]
+
+    if args.delta and args.sample > 0:
+        logger.error("❌ --delta no es compatible con --sample")
+        sys.exit(1)
+
+    if args.pre_encode and args.workers <= 0:
+        logger.error("❌ --pre-encode requiere --workers > 0")
+        sys.exit(1)
+
+    # El delta solo elimina ($unset) los campos opcionales del esquema que
+    # pasan a nulo; en un documento disperso puede faltar cualquier campo
+    if args.delta and args.sparse:
+        logger.error("❌ --delta no es compatible con --sparse")
+        sys.exit(1)
+
+    if args.engine == 'arrow':
+        if not ARROW_AVAILABLE:
+            logger.error("❌ El motor Arrow requiere pyarrow (pip install pyarrow)")
+            sys.exit(1)
+        if (args.sample > 0 or args.delta or args.resume or args.processes > 0
+                or args.id_as_key or args.clustered or args.sparse or args.compact_keys):
+            logger.error(
+                "❌ --engine arrow no es compatible con --sample, --delta, "
+                "--resume, --processes, --id-as-key, --clustered, --sparse "
+                "ni --compact-keys")
+            sys.exit(1)
+
+    if args.clustered and not args.id_as_key:
+        logger.warning(
+            "⚠️ --clustered sin --id-as-key agrupa por ObjectId: "
+            "las búsquedas por id no serán lecturas puntuales")
+
+    if args.resume:
+        if args.delta or args.processes > 0:
+            logger.error("❌ --resume no es compatible con --delta ni --processes")
+            sys.exit(1)
+        args.stream = True
+
+    # Importar datos (en modo carga masiva, sin índices secundarios)
+    bulk_load = nullcontext()
+    if args.bulk_load:
+        bulk_load = MongoDBConnection().deferred_indexes(args.collection)
+
+    with bulk_load as deferred:
+        if args.engine == 'arrow':
+            import_custom_data_arrow(
+                csv_path=csv_path,
+                collection_name=args.collection,
+                batch_size=args.batch_size,
+                keep_all_columns=args.keep_all,
+                clear_existing=not args.no_clear,
+                workers=args.workers,
+                build_indexes=deferred is None
+            )
+        elif args.processes > 0:
+            if args.sample > 0 or args.stream:
+                logger.error("❌ --processes no es compatible con --sample ni --stream")
+                sys.exit(1)
+
+            import_custom_data_parallel(
+                csv_paths=csv_paths,
+                collection_name=args.collection,
+                batch_size=args.batch_size,
+                keep_all_columns=args.keep_all,
+                clear_existing=not args.no_clear,
+                processes=args.processes,
+                workers=args.workers,
+                pre_encode=args.pre_encode,
+                adaptive=args.adaptive,
+                delta=args.delta,
+                delta_removed=args.delta_removed,
+                id_as_key=args.id_as_key,
+                clustered=args.clustered,
+                sparse=args.sparse,
+                compact=args.compact_keys,
+                build_indexes=deferred is None
+            )
+        elif args.stream:
+            if args.sample > 0:
+                logger.error("❌ --sample no es compatible con --stream")
+                sys.exit(1)
+
+            import_custom_data_streaming(
+                csv_path=csv_path,
+                collection_name=args.collection,
+                batch_size=args.batch_size,
+                keep_all_columns=args.keep_all,
+                clear_existing=not args.no_clear,
+                max_memory_mb=args.max_memory_mb,
+                workers=args.workers,
+                pre_encode=args.pre_encode,
+                adaptive=args.adaptive,
+                delta=args.delta,
+                delta_removed=args.delta_removed,
+                resume=args.resume,
+                id_as_key=args.id_as_key,
+                clustered=args.clustered,
+                sparse=args.sparse,
+                compact=args.compact_keys,
+                build_indexes=deferred is None
+            )
+        else:
+            import_custom_data(
+                csv_path=csv_path,
+                collection_name=args.collection,
+                sample_size=args.sample,
+                batch_size=args.batch_size,
+                keep_all_columns=args.keep_all,
+                clear_existing=not args.no_clear,
+                workers=args.workers,
+                pre_encode=args.pre_encode,
+                adaptive=args.adaptive,
+                delta=args.delta,
+                delta_removed=args.delta_removed,
+                sample_seed=args.sample_seed,
+                sample_stratify=args.sample_by,
+                id_as_key=args.id_as_key,
+                clustered=args.clustered,
+                sparse=args.sparse,
+                compact=args.compact_keys,
+                build_indexes=deferred is None
+            )
+
+    # Primera carga masiva: no había índices que reconstruir
+    if deferred == []:
+        logger.info("📑 Creando índices...")
+        MongoDBConnection().create_indexes(args.collection)
 
     print("\n" + "="*70)
     print("🎉 ¡IMPORTACIÓN COMPLETADA!")
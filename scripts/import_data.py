@@ -3,13 +3,27 @@
 Script para importar datos de Airbnb a MongoDB
 """
 
-from src.crud_operations import AirbnbCRUD
+from src.crud_operations import AirbnbCRUD, assign_listing_ids
 from src.database import MongoDBConnection
-from src.config import RAW_DATA_DIR, SAMPLE_SIZE
+from src.cleaning import DEFAULT_FILLS, CleaningPlan
+from src.bulk_writer import create_insert_engine
+from src.streaming import find_csv_source
+from src.schema import read_listings_csv, sample_listings_csv
+from src.field_codec import get_codec
+from src.checkpoints import STATE_COLLECTION, ImportCheckpoint, discard_partial_batch
+from src.validation import (
+    RejectedListings, listing_documents, rejected_collection_name, split_valid_listings
+)
+from src.config import (
+    RAW_DATA_DIR, SAMPLE_SIZE, SAMPLE_SEED, SAMPLE_STRATIFY, IMPORT_BATCH_SIZE,
+    IMPORT_WORKERS, IMPORT_BULK_LOAD, IMPORT_PRE_ENCODE, IMPORT_ADAPTIVE, CLUSTERED_LISTINGS,
+    COMPACT_FIELDS
+)
 import os
 import sys
 import logging
 import pandas as pd
+from contextlib import nullcontext
 from pathlib import Path
 from tqdm import tqdm
 from datetime import datetime
@@ -24,6 +38,18 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Columnas importantes a mantener
+IMPORT_COLUMNS = [
+    'id', 'name', 'host_id', 'host_name', 'neighbourhood',
+    'latitude', 'longitude', 'room_type', 'price',
+    'minimum_nights', 'number_of_reviews', 'last_review',
+    'reviews_per_month', 'calculated_host_listings_count',
+    'availability_365'
+]
+
+# Plan de limpieza de las columnas importantes
+IMPORT_CLEANING_PLAN = CleaningPlan(select=IMPORT_COLUMNS, fills=DEFAULT_FILLS)
+
 
 def clean_dataframe(df: pd.DataFrame) -> pd.DataFrame:
     """
@@ -37,42 +63,8 @@ def clean_dataframe(df: pd.DataFrame) -> pd.DataFrame:
     """
     logger.info("🧹 Limpiando datos...")
 
-    # Columnas importantes a mantener
-    important_cols = [
-        'id', 'name', 'host_id', 'host_name', 'neighbourhood',
-        'latitude', 'longitude', 'room_type', 'price',
-        'minimum_nights', 'number_of_reviews', 'last_review',
-        'reviews_per_month', 'calculated_host_listings_count',
-        'availability_365'
-    ]
-
-    # Seleccionar solo columnas que existen
-    available_cols = [col for col in important_cols if col in df.columns]
-    df = df[available_cols].copy()
-
-    # Limpiar precios (remover $ y convertir a float)
-    if 'price' in df.columns:
-        df['price'] = df['price'].replace(
-            r'[\$,]', '', regex=True).astype(float)
-
-    # Convertir fechas
-    if 'last_review' in df.columns:
-        df['last_review'] = pd.to_datetime(df['last_review'], errors='coerce')
-
-    # Rellenar valores nulos
-    df['reviews_per_month'] = df['reviews_per_month'].fillna(0)
-    df['name'] = df['name'].fillna('Sin nombre')
-    df['host_name'] = df['host_name'].fillna('Sin nombre')
-
-    # Crear campo de ubicación geoespacial
-    if 'latitude' in df.columns and 'longitude' in df.columns:
-        df['location'] = df.apply(
-            lambda row: {
-                "type": "Point",
-                "coordinates": [row['longitude'], row['latitude']]
-            },
-            axis=1
-        )
+    # Selección, precios, fechas, nulos y ubicación en una sola pasada
+    df = IMPORT_CLEANING_PLAN.apply(df)
 
     logger.info(
         f"✅ Datos limpios: {len(df)} registros, {len(df.columns)} columnas")
@@ -83,7 +75,10 @@ def clean_dataframe(df: pd.DataFrame) -> pd.DataFrame:
 def import_data(
     csv_path: Path,
     sample_size: int = 0,
-    batch_size: int = 1000
+    batch_size: int = 1000,
+    workers: int = 0,
+    adaptive: bool = False,
+    build_indexes: bool = True
 ) -> None:
     """
     Importa datos del CSV a MongoDB
@@ -92,30 +87,58 @@ def import_data(
         csv_path: Ruta del archivo CSV
         sample_size: Número de registros a importar (0 = todos)
         batch_size: Tamaño del lote para inserción
+        workers: Lotes concurrentes en vuelo (0 = inserción secuencial)
+        adaptive: Si True, lotes por bytes y latencia con reintentos y
+            bisección (AdaptiveBulkWriter); implica al menos un lote en vuelo
+        build_indexes: Si False, no crea los índices al terminar (carga
+            masiva: los reconstruye deferred_indexes al salir)
     """
+    if adaptive:
+        workers = max(workers, 1)
+
     try:
-        logger.info(f"📖 Leyendo archivo: {csv_path}")
+        # Conectar a MongoDB
+        logger.info("🔌 Conectando a MongoDB...")
+        conn = MongoDBConnection()
+        # Con COMPACT_FIELDS los documentos se codifican al convertirlos
+        crud = AirbnbCRUD(codec=None)
+
+        # Buscar un checkpoint de una importación interrumpida
+        checkpoint = ImportCheckpoint(
+            conn.get_collection(STATE_COLLECTION), csv_path, crud.collection_name)
+        offset = checkpoint.load()
 
-        # Leer CSV
-        df = pd.read_csv(csv_path, low_memory=False)
-        logger.info(f"✅ Archivo cargado: {len(df):,} registros")
+        logger.info(f"📖 Leyendo archivo: {csv_path}")
 
-        # Aplicar sample si se especifica
+        # Leer CSV tipado, solo las columnas usadas (sin muestra, las filas
+        # ya confirmadas no se parsean)
         if sample_size > 0:
-            df = df.sample(n=min(sample_size, len(df)), random_state=42)
+            # Muestreo en streaming: la muestra conserva la fila de origen
+            # como índice y el orden del archivo, así que se puede reanudar
+            df = sample_listings_csv(csv_path, sample_size, IMPORT_COLUMNS,
+                                     seed=SAMPLE_SEED, stratify=SAMPLE_STRATIFY)
             logger.info(f"📊 Usando muestra de {len(df):,} registros")
+        elif offset > 0:
+            df = read_listings_csv(csv_path, IMPORT_COLUMNS, low_memory=False,
+                                   **checkpoint.read_csv_kwargs())
+            df.index += offset
+            logger.info(f"✅ Archivo cargado: {len(df):,} registros")
+        else:
+            df = read_listings_csv(csv_path, IMPORT_COLUMNS, low_memory=False)
+            logger.info(f"✅ Archivo cargado: {len(df):,} registros")
 
         # Limpiar datos
         df = clean_dataframe(df)
-
-        # Conectar a MongoDB
-        logger.info("🔌 Conectando a MongoDB...")
-        conn = MongoDBConnection()
-        crud = AirbnbCRUD()
+        if offset > 0:
+            df = df[df.index >= offset]
 
         # Verificar si la colección ya tiene datos
         existing_count = crud.get_total_listings()
-        if existing_count > 0:
+        if offset > 0:
+            logger.info(
+                f"⏩ Reanudando desde la fila {offset:,} "
+                f"({checkpoint.documents:,} documentos ya importados)")
+        elif existing_count > 0:
             logger.warning(
                 f"⚠️ La colección ya tiene {existing_count:,} documentos")
             response = input("¿Deseas eliminar los datos existentes? (s/n): ")
@@ -126,28 +149,81 @@ def import_data(
                 logger.info("Importación cancelada")
                 return
 
-        # Convertir a documentos
-        documents = df.to_dict('records')
+        # Con LISTING_ID_AS_KEY el _id es el id de Inside Airbnb
+        if CLUSTERED_LISTINGS and offset == 0:
+            conn.ensure_clustered(crud.collection_name)
+
+        checkpoint.start()
+
+        # Validar contra el esquema: los rechazos van a cuarentena con sus motivos
+        quarantine = RejectedListings(
+            conn.get_collection(rejected_collection_name(crud.collection_name)),
+            source=str(csv_path), clear=offset == 0)
+        df, rejects = split_valid_listings(df)
+        quarantine.write(rejects)
+        quarantine.log_summary()
+
+        # Convertir a documentos (fila de origen siguiente a cada documento)
+        documents = listing_documents(df, sparse=crud.sparse, codec=get_codec(COMPACT_FIELDS))
+        row_ends = df.index.to_numpy() + 1
+        if crud.id_as_key:
+            assign_listing_ids(documents)
+
+        # Con workers el checkpoint se confirma cada `workers` lotes: el grupo
+        # interrumpido (hasta el siguiente punto de confirmación) pudo quedar
+        # escrito a medias y se vuelve a enviar completo
+        group_size = batch_size * workers if workers > 0 else batch_size
+        if offset > 0:
+            discard_partial_batch(
+                crud.collection, (doc.get('id') for doc in documents[:group_size]))
 
         # Importar en lotes
-        logger.info(f"� Importando {len(documents):,} documentos...")
-
-        total_inserted = 0
-        for i in tqdm(range(0, len(documents), batch_size), desc="Importando"):
-            batch = documents[i:i+batch_size]
-
-            # Agregar metadata
-            for doc in batch:
-                doc['imported_at'] = datetime.now()
-
-            result = crud.create_many_listings(batch)
-            total_inserted += len(result.inserted_ids)
+        logger.info(f"📥 Importando {len(documents):,} documentos...")
+
+        if workers > 0:
+            now = datetime.now()
+            for doc in documents:
+                doc['imported_at'] = now
+
+            # Se confirma el checkpoint cada `workers` lotes, tras vaciar el motor
+            with tqdm(total=len(documents), desc="Importando") as progress, \
+                    create_insert_engine(crud.collection, batch_size, workers,
+                                         pre_encode=IMPORT_PRE_ENCODE, adaptive=adaptive,
+                                         on_reject=quarantine.write,
+                                         progress=progress.update) as engine:
+                for i in range(0, len(documents), group_size):
+                    group = documents[i:i+group_size]
+                    inserted, aborted = engine.inserted, engine.aborted
+                    engine.insert(group)
+                    engine.drain()
+                    # Un lote fallido completo (red, servidor) no se confirma:
+                    # al reanudar se vuelve a enviar el grupo
+                    if engine.aborted > aborted:
+                        raise engine.last_error
+                    checkpoint.commit(int(row_ends[i+len(group)-1]), engine.inserted - inserted)
+            engine.log_summary()
+            total_inserted = engine.inserted
+        else:
+            total_inserted = 0
+            for i in tqdm(range(0, len(documents), batch_size), desc="Importando"):
+                batch = documents[i:i+batch_size]
+
+                # Agregar metadata
+                for doc in batch:
+                    doc['imported_at'] = datetime.now()
+
+                result = crud.create_many_listings(batch)
+                total_inserted += len(result.inserted_ids)
+                checkpoint.commit(int(row_ends[i+len(batch)-1]), len(result.inserted_ids))
+
+        checkpoint.complete()
 
         logger.info(f"✅ Importación completada: {total_inserted:,} documentos")
 
-        # Crear índices
-        logger.info("📑 Creando índices...")
-        conn.create_indexes()
+        # Crear índices (en carga masiva los reconstruye deferred_indexes)
+        if build_indexes:
+            logger.info("📑 Creando índices...")
+            conn.create_indexes()
 
         # Mostrar estadísticas
         stats = conn.get_collection_stats()
@@ -180,16 +256,33 @@ def main():
     print("📥 IMPORTACIÓN DE DATOS A MONGODB")
     print("="*60 + "\n")
 
-    # Buscar archivo CSV
-    csv_file = RAW_DATA_DIR / "madrid_listings.csv"
+    # Buscar archivo CSV (sin comprimir, .csv.gz o .csv.zst)
+    csv_file = find_csv_source(RAW_DATA_DIR, "madrid_listings")
 
-    if not csv_file.exists():
-        logger.error(f"❌ No se encontró el archivo: {csv_file}")
+    if csv_file is None:
+        logger.error(f"❌ No se encontró el archivo: {RAW_DATA_DIR / 'madrid_listings.csv'}")
         logger.info("💡 Ejecuta 'python scripts/download_dataset.py' primero")
         sys.exit(1)
 
-    # Importar datos
-    import_data(csv_file, sample_size=SAMPLE_SIZE)
+    # Importar datos (en modo carga masiva, sin índices secundarios)
+    bulk_load = nullcontext()
+    if IMPORT_BULK_LOAD:
+        bulk_load = MongoDBConnection().deferred_indexes()
+
+    with bulk_load as deferred:
+        import_data(
+            csv_file,
+            sample_size=SAMPLE_SIZE,
+            batch_size=IMPORT_BATCH_SIZE,
+            workers=IMPORT_WORKERS,
+            adaptive=IMPORT_ADAPTIVE,
+            build_indexes=deferred is None
+        )
+
+    # Primera carga masiva: no había índices que reconstruir
+    if deferred == []:
+        logger.info("📑 Creando índices...")
+        MongoDBConnection().create_indexes()
 
     print("\n" + "="*60)
     print("🎉 ¡IMPORTACIÓN COMPLETADA!")
@@ -1,98 +1,141 @@
 #!/usr/bin/env python3
 import os
 import sys
+import time
 import logging
-import pandas as pd
-import math
+from contextlib import nullcontext
 from pathlib import Path
 from tqdm import tqdm
 from datetime import datetime
 from pymongo import MongoClient
 
-sys.path.insert(0, str(Path(__file__).parent))
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.bulk_writer import create_insert_engine
+from src.crud_operations import assign_listing_ids
+from src.cleaning import CleaningPlan
+from src.config import (
+    IMPORT_BATCH_SIZE, IMPORT_WORKERS, IMPORT_BULK_LOAD, IMPORT_PRE_ENCODE, IMPORT_ADAPTIVE,
+    LISTING_ID_AS_KEY, CLUSTERED_LISTINGS, SPARSE_DOCUMENTS, COMPACT_FIELDS
+)
+from src.database import deferred_indexes, ensure_clustered_collection
+from src.delta import DeltaImporter
+from src.field_codec import get_codec
+from src.validation import RejectedListings, rejected_collection_name
+from src.streaming import find_csv_source
+from src.schema import read_listings_csv
 
 logging.basicConfig(level=logging.INFO,
                     format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-
-def clean_document(doc):
-    """Limpia un documento de valores NaT/NaN"""
-    cleaned = {}
-    for key, value in doc.items():
-        # Chequear NaT, NaN, inf
-        if pd.isna(value):
-            cleaned[key] = None
-        elif isinstance(value, float) and (math.isnan(value) or math.isinf(value)):
-            cleaned[key] = None
-        elif hasattr(value, '__class__') and 'NaTType' in str(value.__class__):
-            cleaned[key] = None
-        else:
-            cleaned[key] = value
-    return cleaned
+# Todas las columnas; solo se convierten precios (nulos -> 0) y fechas
+CLEANING_PLAN = CleaningPlan(price_fill=0, booleans=(), percentages=())
 
 
 def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description='Importar data/raw/listings.csv a MongoDB'
+    )
+    parser.add_argument(
+        '--delta',
+        action='store_true',
+        help='Importación incremental: solo escribe listings nuevos o modificados'
+    )
+    parser.add_argument(
+        '--delta-removed',
+        choices=['flag', 'delete'],
+        default='flag',
+        help='Listings desaparecidos en modo --delta: marcar (removed_at) o eliminar'
+    )
+    args = parser.parse_args()
+
+    # El delta solo elimina ($unset) los campos opcionales del esquema que
+    # pasan a nulo; en un documento disperso puede faltar cualquier campo
+    if args.delta and SPARSE_DOCUMENTS:
+        logger.error("❌ --delta no es compatible con SPARSE_DOCUMENTS")
+        sys.exit(1)
+
     logger.info("📖 Leyendo CSV...")
-    df = pd.read_csv('data/raw/listings.csv', low_memory=False)
+    source = find_csv_source('data/raw', 'listings')
+    if source is None:
+        logger.error("❌ No se encontró data/raw/listings.csv (ni .csv.gz)")
+        sys.exit(1)
+    # Todas las columnas, con tipos para las del esquema de Inside Airbnb
+    df = read_listings_csv(source, columns=None, low_memory=False)
     logger.info(f"✅ {len(df):,} registros cargados")
 
-    # Limpiar precios
-    logger.info("💰 Limpiando precios...")
-    df['price'] = df['price'].replace(r'[\$,]', '', regex=True)
-    df['price'] = pd.to_numeric(df['price'], errors='coerce').fillna(0)
-
-    # Convertir fechas
-    logger.info("📅 Convirtiendo fechas...")
-    date_cols = ['last_scraped', 'host_since', 'first_review', 'last_review',
-                 'calendar_updated', 'calendar_last_scraped']
-    for col in date_cols:
-        if col in df.columns:
-            df[col] = pd.to_datetime(df[col], errors='coerce')
-            df[col] = df[col].where(pd.notna(df[col]), None)
-
-    # Crear location
-    logger.info("🗺️ Creando campo geoespacial...")
-    if 'latitude' in df.columns and 'longitude' in df.columns:
-        df['location'] = df.apply(
-            lambda row: {
-                'type': 'Point',
-                'coordinates': [float(row['longitude']), float(row['latitude'])]
-            } if pd.notna(row['latitude']) and pd.notna(row['longitude']) else None,
-            axis=1
-        )
-        df = df[df['location'].notna()]
+    # Precios, fechas y location con el plan compartido
+    logger.info(f"🧹 Limpiando datos: {CLEANING_PLAN.describe(df.columns)}")
+    df = CLEANING_PLAN.apply(df)
 
     logger.info(f"✅ Datos preparados: {len(df):,} registros")
 
-    # Convertir a documentos y limpiar
-    logger.info("📄 Convirtiendo a documentos...")
-    documents = df.to_dict('records')
-
-    logger.info("🧹 Limpiando valores especiales...")
-    cleaned_documents = [clean_document(doc)
-                         for doc in tqdm(documents, desc="Limpiando")]
-
     # Conectar a MongoDB
     logger.info("🔌 Conectando a MongoDB...")
     client = MongoClient('mongodb://localhost:27018/')
     db = client['airbnb_madrid']
     collection = db['listings']
 
-    # Limpiar colección existente
-    existing = collection.count_documents({})
-    if existing > 0:
-        logger.info(f"🗑️ Eliminando {existing:,} documentos existentes...")
-        collection.delete_many({})
-
-    # Importar en lotes
-    logger.info("📥 Importando a MongoDB...")
-    batch_size = 1000
-    for i in tqdm(range(0, len(cleaned_documents), batch_size), desc="Importando"):
-        batch = cleaned_documents[i:i+batch_size]
-        for doc in batch:
-            doc['imported_at'] = datetime.now()
-        collection.insert_many(batch)
+    # Validar contra el esquema y convertir a documentos (NaT/NaN/inf -> None);
+    # los rechazos van a la colección de cuarentena con sus motivos
+    logger.info("📄 Validando y convirtiendo a documentos...")
+    quarantine = RejectedListings(
+        db[rejected_collection_name(collection.name)], source=str(source),
+        clear=not args.delta)
+    cleaned_documents = quarantine.filter(
+        df, sparse=SPARSE_DOCUMENTS, codec=get_codec(COMPACT_FIELDS))
+    quarantine.log_summary()
+    if LISTING_ID_AS_KEY:
+        assign_listing_ids(cleaned_documents)
+
+    batch_size = IMPORT_BATCH_SIZE
+
+    if args.delta:
+        # Solo se escriben los listings nuevos o modificados
+        logger.info("🔁 Importación incremental...")
+        started = time.perf_counter()
+        now = datetime.now()
+        for doc in cleaned_documents:
+            doc['imported_at'] = now
+        importer = DeltaImporter(
+            collection, key='_id' if LISTING_ID_AS_KEY else 'id',
+            removed=args.delta_removed, batch_size=batch_size)
+        importer.apply(tqdm(cleaned_documents, desc="Delta"))
+        importer.finish()
+        importer.log_summary(time.perf_counter() - started)
+    else:
+        # Limpiar colección existente
+        existing = collection.count_documents({})
+        if existing > 0:
+            logger.info(f"🗑️ Eliminando {existing:,} documentos existentes...")
+            collection.delete_many({})
+        if CLUSTERED_LISTINGS:
+            ensure_clustered_collection(db, collection.name)
+
+        # Importar en lotes (en modo carga masiva, sin índices secundarios)
+        bulk_load = deferred_indexes(collection) if IMPORT_BULK_LOAD else nullcontext()
+        with bulk_load:
+            logger.info("📥 Importando a MongoDB...")
+            if IMPORT_WORKERS > 0 or IMPORT_ADAPTIVE:
+                now = datetime.now()
+                for doc in cleaned_documents:
+                    doc['imported_at'] = now
+                with tqdm(total=len(cleaned_documents), desc="Importando") as progress, \
+                        create_insert_engine(collection, batch_size, max(IMPORT_WORKERS, 1),
+                                             pre_encode=IMPORT_PRE_ENCODE, adaptive=IMPORT_ADAPTIVE,
+                                             on_reject=quarantine.write, timestamps=False,
+                                             progress=progress.update) as engine:
+                    engine.insert(cleaned_documents)
+                engine.log_summary()
+            else:
+                for i in tqdm(range(0, len(cleaned_documents), batch_size), desc="Importando"):
+                    batch = cleaned_documents[i:i+batch_size]
+                    for doc in batch:
+                        doc['imported_at'] = datetime.now()
+                    collection.insert_many(batch)
 
     total = collection.count_documents({})
     logger.info(f"\n✅ ¡Importación completada: {total:,} documentos!")
@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+Script para importar reviews.csv a MongoDB en streaming
+
+Las reseñas se leen por chunks con un techo de memoria y se insertan en su
+propia colección; al terminar, los agregados por listing se escriben en la
+colección de listings (campo review_stats) en una sola pasada bulk.
+"""
+
+import sys
+import time
+import logging
+from pathlib import Path
+from typing import Optional
+from tqdm import tqdm
+
+# Agregar src al path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.database import MongoDBConnection
+from src.bulk_writer import create_insert_engine
+from src.streaming import find_csv_source, iter_csv_chunks, peak_memory_mb
+from src.reviews import (
+    REVIEW_COLUMNS, ReviewAggregator, clean_reviews_chunk, create_review_indexes,
+    review_documents
+)
+from src.config import (
+    RAW_DATA_DIR, COLLECTION_NAME, REVIEWS_COLLECTION_NAME, IMPORT_BATCH_SIZE, IMPORT_WORKERS,
+    LISTING_ID_AS_KEY
+)
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+def import_reviews(
+    csv_path: Path,
+    collection_name: str = REVIEWS_COLLECTION_NAME,
+    listings_collection: Optional[str] = COLLECTION_NAME,
+    batch_size: int = 1000,
+    clear_existing: bool = True,
+    workers: int = 0,
+    pre_encode: bool = False,
+    chunk_rows: Optional[int] = None,
+    max_memory_mb: float = 512,
+    id_as_key: bool = LISTING_ID_AS_KEY
+) -> int:
+    """
+    Importa reviews.csv y fusiona los agregados por listing
+
+    Args:
+        csv_path: Ruta del reviews.csv (.csv, .csv.gz o .csv.zst)
+        collection_name: Nombre de la colección de reseñas
+        listings_collection: Colección de listings donde fusionar los
+            agregados (None = no fusionar)
+        batch_size: Documentos por lote de inserción
+        clear_existing: Si True, elimina las reseñas existentes antes de importar
+        workers: Lotes concurrentes en vuelo (0 = inserción secuencial)
+        pre_encode: Si True, pre-codifica los lotes a BSON (requiere workers)
+        chunk_rows: Filas por chunk del parser (opcional, por defecto se estima)
+        max_memory_mb: Techo de memoria del proceso en MB
+        id_as_key: Si True, los listings usan el id de Inside Airbnb como
+            _id y los agregados se fusionan por _id (lectura puntual)
+
+    Returns:
+        int: Total de reseñas insertadas
+    """
+    logger.info("🔌 Conectando a MongoDB...")
+    conn = MongoDBConnection()
+    collection = conn.get_collection(collection_name)
+
+    existing_count = collection.estimated_document_count()
+    if existing_count > 0 and clear_existing:
+        logger.info(f"🗑️ Eliminando colección '{collection_name}' ({existing_count:,} reseñas)...")
+        conn.get_database().drop_collection(collection_name)
+        collection = conn.get_collection(collection_name)
+
+    logger.info(f"📖 Leyendo archivo: {csv_path}")
+    started = time.perf_counter()
+    aggregator = ReviewAggregator()
+    rows = 0
+    total_inserted = 0
+
+    engine = None
+    progress = tqdm(desc="Importando", unit=" reseñas")
+    if workers > 0:
+        engine = create_insert_engine(collection, batch_size, workers, pre_encode=pre_encode,
+                                      timestamps=False, progress=progress.update)
+
+    try:
+        chunks = iter_csv_chunks(
+            csv_path, max_memory_mb, chunk_rows,
+            usecols=lambda col: col in REVIEW_COLUMNS, dtype=str)
+        for chunk in chunks:
+            rows += len(chunk)
+            chunk = clean_reviews_chunk(chunk)
+            aggregator.add(chunk)
+            documents = review_documents(chunk)
+            if engine is not None:
+                engine.insert(documents)
+                continue
+            for i in range(0, len(documents), batch_size):
+                result = collection.insert_many(documents[i:i+batch_size], ordered=False)
+                total_inserted += len(result.inserted_ids)
+                progress.update(len(result.inserted_ids))
+    finally:
+        if engine is not None:
+            engine.close()
+        progress.close()
+
+    if engine is not None:
+        engine.log_summary()
+        total_inserted = engine.inserted
+
+    elapsed = time.perf_counter() - started
+    logger.info(
+        f"✅ Importación completada: {total_inserted:,} de {rows:,} filas "
+        f"en {elapsed:.1f}s ({total_inserted / max(elapsed, 1e-9):,.0f} docs/s)")
+
+    # Índice tras la carga: construirlo una vez es más rápido que mantenerlo
+    logger.info("📑 Creando índices...")
+    create_review_indexes(collection)
+
+    # Agregados por listing en una sola pasada bulk
+    if listings_collection:
+        logger.info(f"🔗 Fusionando agregados en '{listings_collection}'...")
+        aggregator.merge_into(conn.get_collection(listings_collection),
+                              key='_id' if id_as_key else 'id')
+
+    peak = peak_memory_mb()
+    if peak is not None:
+        logger.info(f"🧠 Pico de memoria: {peak:,.1f} MB")
+    return total_inserted
+
+
+def main():
+    """Función principal"""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description='Importar reviews.csv y fusionar agregados en los listings'
+    )
+    parser.add_argument(
+        '--file',
+        help='Ruta del reviews.csv (default: madrid_reviews.csv* en RAW_DATA_DIR)'
+    )
+    parser.add_argument(
+        '--collection',
+        default=REVIEWS_COLLECTION_NAME,
+        help=f'Nombre de la colección de reseñas (default: {REVIEWS_COLLECTION_NAME})'
+    )
+    parser.add_argument(
+        '--listings-collection',
+        default=COLLECTION_NAME,
+        help=f'Colección de listings para los agregados (default: {COLLECTION_NAME})'
+    )
+    parser.add_argument(
+        '--no-merge',
+        action='store_true',
+        help='NO fusionar los agregados en los listings'
+    )
+    parser.add_argument(
+        '--id-as-key',
+        action='store_true',
+        default=LISTING_ID_AS_KEY,
+        help='Los listings se importaron con el id de Inside Airbnb como _id'
+    )
+    parser.add_argument(
+        '--no-clear',
+        action='store_true',
+        help='NO eliminar las reseñas existentes antes de importar'
+    )
+    parser.add_argument(
+        '--batch-size',
+        type=int,
+        default=IMPORT_BATCH_SIZE,
+        help=f'Documentos por lote de inserción (default: {IMPORT_BATCH_SIZE})'
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=IMPORT_WORKERS,
+        help='Lotes insert_many(ordered=False) concurrentes (0 = secuencial)'
+    )
+    parser.add_argument(
+        '--pre-encode',
+        action='store_true',
+        help='Pre-codificar a BSON en hilos y cortar lotes por bytes (requiere --workers)'
+    )
+    parser.add_argument(
+        '--chunk-rows',
+        type=int,
+        help='Filas por chunk del parser (por defecto se estima con --max-memory)'
+    )
+    parser.add_argument(
+        '--max-memory',
+        type=float,
+        default=512,
+        help='Techo de memoria del proceso en MB (default: 512)'
+    )
+
+    args = parser.parse_args()
+
+    if args.pre_encode and args.workers <= 0:
+        logger.error("❌ --pre-encode requiere --workers > 0")
+        sys.exit(1)
+
+    csv_file = Path(args.file) if args.file else find_csv_source(RAW_DATA_DIR, "madrid_reviews")
+    if csv_file is None or not csv_file.exists():
+        logger.error(f"❌ No se encontró el archivo: {csv_file or RAW_DATA_DIR / 'madrid_reviews.csv.gz'}")
+        logger.info("💡 Ejecuta 'python scripts/download_dataset.py --artifacts reviews' primero")
+        sys.exit(1)
+
+    print("\n" + "="*70)
+    print("💬 IMPORTACIÓN DE RESEÑAS")
+    print("="*70 + "\n")
+
+    import_reviews(
+        csv_file,
+        collection_name=args.collection,
+        listings_collection=None if args.no_merge else args.listings_collection,
+        batch_size=args.batch_size,
+        clear_existing=not args.no_clear,
+        workers=args.workers,
+        pre_encode=args.pre_encode,
+        chunk_rows=args.chunk_rows,
+        max_memory_mb=args.max_memory,
+        id_as_key=args.id_as_key
+    )
+
+    print("\n" + "="*70)
+    print("🎉 ¡IMPORTACIÓN COMPLETADA!")
+    print("="*70 + "\n")
+
+
+if __name__ == "__main__":
+    main()
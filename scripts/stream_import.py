@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+Importación en una sola pasada: descarga HTTP -> gunzip -> parser CSV -> MongoDB
+
+Los documentos empiezan a llegar a MongoDB mientras la descarga sigue en
+curso; no se escribe ningún archivo intermedio en disco.
+"""
+
+import sys
+import time
+import queue
+import logging
+import threading
+from datetime import datetime
+from functools import partial
+from pathlib import Path
+from tqdm import tqdm
+
+# Agregar src al path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from src.crud_operations import AirbnbCRUD, assign_listing_ids
+from src.database import MongoDBConnection
+from src.cleaning import LISTING_COLUMNS
+from src.schema import listing_read_csv_kwargs
+from src.bulk_writer import create_insert_engine
+from src.http_source import decompressed, open_url_source
+from src.streaming import iter_csv_chunks, peak_memory_mb
+from src.validation import RejectedListings, rejected_collection_name
+from src.field_codec import get_codec
+from src.config import (
+    AIRBNB_DATA_URL, IMPORT_BATCH_SIZE, IMPORT_WORKERS, CLUSTERED_LISTINGS, COMPACT_FIELDS
+)
+from import_custom_data import clean_custom_dataframe
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+_SENTINEL = None
+
+
+def stream_import(
+    url: str,
+    collection_name: str = "listings",
+    batch_size: int = 1000,
+    keep_all_columns: bool = False,
+    clear_existing: bool = True,
+    workers: int = 0,
+    pre_encode: bool = False,
+    chunk_rows: int = 5000,
+    queue_size: int = 4,
+    max_memory_mb: float = 512
+) -> int:
+    """
+    Descarga, parsea, limpia e inserta un CSV remoto en una sola pasada
+
+    Etapas y buffers acotados entre ellas:
+      1. Hilo de descarga -> cola de bloques HTTP (HTTPByteStream)
+      2. gunzip/zstd en streaming + parser CSV por chunks (hilo principal)
+      3. Cola de lotes de documentos (`queue_size`) -> hilo escritor
+
+    Args:
+        url: URL del CSV (.csv, .csv.gz o .csv.zst)
+        collection_name: Nombre de la colección en MongoDB
+        batch_size: Tamaño del lote para inserción
+        keep_all_columns: Si True, mantiene todas las columnas del CSV
+        clear_existing: Si True, elimina datos existentes antes de importar
+        workers: Lotes concurrentes en vuelo (0 = inserción secuencial)
+        pre_encode: Si True, pre-codifica los lotes a BSON (requiere workers)
+        chunk_rows: Filas por chunk del parser
+        queue_size: Chunks limpios máximos esperando al escritor
+        max_memory_mb: Techo de memoria del proceso en MB
+
+    Returns:
+        int: Total de documentos insertados
+    """
+    logger.info("🔌 Conectando a MongoDB...")
+    conn = MongoDBConnection()
+    # Con COMPACT_FIELDS los documentos se codifican al validarlos
+    crud = AirbnbCRUD(collection_name=collection_name, codec=None)
+    codec = get_codec(COMPACT_FIELDS)
+
+    existing_count = crud.get_total_listings()
+    if existing_count > 0 and clear_existing:
+        logger.info(f"🗑️ Eliminando {existing_count:,} documentos existentes...")
+        crud.collection.delete_many({})
+    if CLUSTERED_LISTINGS:
+        conn.ensure_clustered(collection_name)
+
+    clean = partial(clean_custom_dataframe, keep_all_columns=keep_all_columns, verbose=False)
+    metadata = {'imported_at': datetime.now(), 'source': url}
+    quarantine = RejectedListings(
+        conn.get_collection(rejected_collection_name(collection_name)),
+        source=url, clear=clear_existing)
+
+    started = time.perf_counter()
+    first_insert = []
+    inserted = [0]
+    errors = []
+    ready: queue.Queue = queue.Queue(maxsize=max(queue_size, 1))
+
+    download_bar = tqdm(desc="Descarga", unit='iB', unit_scale=True, unit_divisor=1024)
+    insert_bar = tqdm(desc="Importando", unit=" docs")
+
+    engine = None
+    if workers > 0:
+        engine = create_insert_engine(crud.collection, batch_size, workers,
+                                      pre_encode=pre_encode, on_reject=quarantine.write,
+                                      progress=insert_bar.update)
+
+    def write(documents):
+        if crud.id_as_key:
+            assign_listing_ids(documents)
+        if engine is not None:
+            engine.insert(documents)
+            return
+        for i in range(0, len(documents), batch_size):
+            result = crud.create_many_listings(documents[i:i+batch_size])
+            inserted[0] += len(result.inserted_ids)
+            insert_bar.update(len(result.inserted_ids))
+
+    def writer():
+        while True:
+            documents = ready.get()
+            if documents is _SENTINEL:
+                return
+            if errors:
+                continue  # Vaciar la cola para no bloquear al parser
+            try:
+                write(documents)
+                if not first_insert:
+                    first_insert.append(time.perf_counter() - started)
+            except Exception as e:
+                errors.append(e)
+
+    writer_thread = threading.Thread(target=writer, name='import-writer')
+    writer_thread.start()
+
+    raw = open_url_source(url, progress=download_bar.update)
+    chunks = 0
+    try:
+        with raw, decompressed(raw) as stream:
+            # Sin cabecera previa: columnas y tipos en el parseo, fechas al limpiar
+            read_kwargs = listing_read_csv_kwargs(
+                columns=None if keep_all_columns else LISTING_COLUMNS)
+            for chunk in iter_csv_chunks(stream, max_memory_mb, chunk_rows, **read_kwargs):
+                if errors:
+                    break
+                documents = quarantine.filter(clean(chunk), sparse=crud.sparse, codec=codec)
+                for doc in documents:
+                    doc.update(metadata)
+                chunks += 1
+                ready.put(documents)  # Bloquea si el escritor va retrasado
+    finally:
+        ready.put(_SENTINEL)
+        writer_thread.join()
+        if engine is not None:
+            engine.close()
+        download_bar.close()
+        insert_bar.close()
+
+    if errors:
+        raise errors[0]
+
+    total_inserted = engine.inserted if engine is not None else inserted[0]
+    elapsed = time.perf_counter() - started
+    if engine is not None:
+        engine.log_summary()
+    quarantine.log_summary()
+
+    logger.info(
+        f"✅ Importación completada: {total_inserted:,} documentos de {chunks:,} chunks "
+        f"en {elapsed:.1f}s ({raw.bytes_downloaded / 1024 / 1024:,.1f} MB descargados)")
+    if first_insert:
+        logger.info(f"🚚 Primer lote enviado a MongoDB a los {first_insert[0]:.1f}s")
+
+    # Crear índices
+    logger.info("📑 Creando índices...")
+    conn.create_indexes(collection_name)
+
+    peak = peak_memory_mb()
+    if peak is not None:
+        logger.info(f"🧠 Pico de memoria: {peak:,.1f} MB")
+    return total_inserted
+
+
+def main():
+    """Función principal"""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description='Descargar e importar el dataset en una sola pasada'
+    )
+    parser.add_argument(
+        '--url',
+        default=AIRBNB_DATA_URL,
+        help='URL del CSV (.csv, .csv.gz o .csv.zst; default: AIRBNB_DATA_URL)'
+    )
+    parser.add_argument(
+        '--collection',
+        default='listings',
+        help='Nombre de la colección (default: listings)'
+    )
+    parser.add_argument(
+        '--keep-all',
+        action='store_true',
+        help='Mantener TODAS las columnas del CSV'
+    )
+    parser.add_argument(
+        '--no-clear',
+        action='store_true',
+        help='NO eliminar datos existentes antes de importar'
+    )
+    parser.add_argument(
+        '--batch-size',
+        type=int,
+        default=IMPORT_BATCH_SIZE,
+        help=f'Documentos por lote de inserción (default: {IMPORT_BATCH_SIZE})'
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=IMPORT_WORKERS,
+        help='Lotes insert_many(ordered=False) concurrentes (0 = secuencial)'
+    )
+    parser.add_argument(
+        '--pre-encode',
+        action='store_true',
+        help='Pre-codificar a BSON en hilos y cortar lotes por bytes (requiere --workers)'
+    )
+    parser.add_argument(
+        '--chunk-rows',
+        type=int,
+        default=5000,
+        help='Filas por chunk del parser (default: 5000)'
+    )
+
+    args = parser.parse_args()
+
+    if args.pre_encode and args.workers <= 0:
+        logger.error("❌ --pre-encode requiere --workers > 0")
+        sys.exit(1)
+
+    print("\n" + "="*70)
+    print("📡 DESCARGA E IMPORTACIÓN EN STREAMING")
+    print("="*70 + "\n")
+
+    stream_import(
+        args.url,
+        collection_name=args.collection,
+        batch_size=args.batch_size,
+        keep_all_columns=args.keep_all,
+        clear_existing=not args.no_clear,
+        workers=args.workers,
+        pre_encode=args.pre_encode,
+        chunk_rows=args.chunk_rows
+    )
+
+    print("\n" + "="*70)
+    print("🎉 ¡IMPORTACIÓN COMPLETADA!")
+    print("="*70 + "\n")
+
+
+if __name__ == "__main__":
+    main()
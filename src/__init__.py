@@ -5,6 +5,7 @@ Airbnb Madrid MongoDB Analysis Package
 from .config import *
 from .database import MongoDBConnection, get_connection, get_collection
 from .crud_operations import AirbnbCRUD
+from .calendar_data import CalendarCRUD
 from .visualizations import AirbnbVisualizer
 
 __version__ = "1.0.0"
@@ -15,5 +16,6 @@ __all__ = [
     "get_connection",
     "get_collection",
     "AirbnbCRUD",
+    "CalendarCRUD",
     "AirbnbVisualizer"
 ]
@@ -0,0 +1,551 @@
+"""
+Motor de ingesta Arrow: CSV -> tablas Arrow tipadas -> lotes BSON sin dicts por fila
+"""
+
+import csv
+import io
+import logging
+import struct
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+import bson
+import numpy as np
+from bson.raw_bson import RawBSONDocument
+
+from .cleaning import (
+    LISTING_COLUMNS, DATE_COLUMNS, BOOLEAN_COLUMNS, PERCENTAGE_COLUMNS, dataframe_to_documents
+)
+from .validation import NUMERIC_RANGES, OPTIONAL_FIELDS, STRING_FIELDS, validate_listings
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.csv as pacsv
+except ImportError:  # pyarrow es opcional
+    pa = pc = pacsv = None
+
+logger = logging.getLogger(__name__)
+
+ARROW_AVAILABLE = pa is not None
+
+# Bytes de entrada que el lector Arrow parsea por bloque (≈ un RecordBatch)
+DEFAULT_BLOCK_SIZE = 8 * 1024 * 1024
+
+# Tipos de las columnas numéricas de listings.csv. Todas las columnas se leen
+# como texto y se convierten por lote con kernels de Arrow: un valor como
+# '2.0' en accommodates pasa el lote a float64 y uno no numérico, a nulo
+# (como errors='coerce'), en lugar de abortar la importación como haría el
+# conversor del lector CSV. Igual para precio/fecha/booleano/porcentaje.
+INT_COLUMNS = [
+    'id', 'scrape_id', 'host_id', 'accommodates',
+    'minimum_nights', 'maximum_nights',
+    'minimum_minimum_nights', 'maximum_minimum_nights',
+    'minimum_maximum_nights', 'maximum_maximum_nights',
+    'availability_30', 'availability_60', 'availability_90', 'availability_365',
+    'number_of_reviews', 'number_of_reviews_ltm', 'number_of_reviews_l30d',
+    'calculated_host_listings_count', 'calculated_host_listings_count_entire_homes',
+    'calculated_host_listings_count_private_rooms',
+    'calculated_host_listings_count_shared_rooms',
+]
+FLOAT_COLUMNS = [
+    'latitude', 'longitude', 'bathrooms', 'bedrooms', 'beds',
+    'host_listings_count', 'host_total_listings_count',
+    'minimum_nights_avg_ntm', 'maximum_nights_avg_ntm',
+    'review_scores_rating', 'review_scores_accuracy',
+    'review_scores_cleanliness', 'review_scores_checkin',
+    'review_scores_communication', 'review_scores_location',
+    'review_scores_value', 'reviews_per_month',
+]
+
+_NUMBER = r'^\s*[+-]?(\d+(\.\d*)?|\.\d+)([eE][+-]?\d+)?\s*$'
+
+# Tipos de elemento BSON
+_DOUBLE, _STRING, _DOCUMENT, _BOOL, _DATETIME, _NULL, _INT32, _INT64 = (
+    0x01, 0x02, 0x03, 0x08, 0x09, 0x0A, 0x10, 0x12)
+
+# Plantilla del subdocumento GeoJSON Point; las coordenadas ocupan dos
+# posiciones fijas, por lo que cada 'location' tiene siempre 61 bytes
+_POINT_TEMPLATE = bson.encode({'type': 'Point', 'coordinates': [1.5, 2.5]})
+_POINT_LON = _POINT_TEMPLATE.index(struct.pack('<d', 1.5))
+_POINT_LAT = _POINT_TEMPLATE.index(struct.pack('<d', 2.5))
+
+# Columna auxiliar con la fila de origen durante la validación (no se codifica)
+_ROW_COLUMN = '__row__'
+
+
+def _require_arrow() -> None:
+    """Lanza ImportError si pyarrow no está instalado"""
+    if not ARROW_AVAILABLE:
+        raise ImportError("El motor Arrow requiere pyarrow (pip install pyarrow)")
+
+
+# ===== LECTURA =====
+
+def read_csv_header(csv_path: Union[str, Path]) -> List[str]:
+    """
+    Lee los nombres de columna de un CSV (también comprimido)
+
+    Args:
+        csv_path: Ruta del archivo CSV
+
+    Returns:
+        List[str]: Nombres de columna
+    """
+    _require_arrow()
+    with pa.input_stream(str(csv_path), compression='detect') as stream:
+        head = stream.read(64 * 1024).decode('utf-8', errors='replace')
+    header = next(csv.reader(io.StringIO(head)), [])
+    if header:
+        header[0] = header[0].lstrip('\ufeff')
+    return header
+
+
+def open_listings_csv(
+    csv_path: Union[str, Path],
+    keep_all_columns: bool = False,
+    block_size: int = DEFAULT_BLOCK_SIZE
+):
+    """
+    Abre un CSV de listings como lector Arrow en streaming
+
+    Todas las columnas se leen como texto para que la inferencia por bloque
+    no cambie de tipo a mitad del archivo ni falle con un valor inesperado;
+    clean_listings_batch convierte después las numéricas.
+
+    Args:
+        csv_path: Ruta del archivo CSV (.gz/.bz2 se descomprimen al vuelo)
+        keep_all_columns: Si True, lee todas las columnas del CSV
+        block_size: Bytes de entrada por RecordBatch
+
+    Returns:
+        pyarrow.csv.CSVStreamingReader: Lector de RecordBatch
+    """
+    _require_arrow()
+    header = read_csv_header(csv_path)
+    if keep_all_columns:
+        columns = header
+    else:
+        columns = [col for col in LISTING_COLUMNS if col in header]
+
+    column_types = {col: pa.string() for col in columns}
+
+    return pacsv.open_csv(
+        str(csv_path),
+        read_options=pacsv.ReadOptions(block_size=block_size),
+        parse_options=pacsv.ParseOptions(newlines_in_values=True),
+        convert_options=pacsv.ConvertOptions(
+            column_types=column_types,
+            include_columns=columns,
+            strings_can_be_null=True
+        )
+    )
+
+
+# ===== LIMPIEZA (kernels de Arrow) =====
+
+def _coerce_float(arr):
+    """Convierte texto a float64; los valores no numéricos pasan a nulo"""
+    numeric = pc.match_substring_regex(arr, _NUMBER)
+    trimmed = pc.utf8_trim_whitespace(arr)
+    return pc.cast(pc.if_else(numeric, trimmed, pa.scalar(None, arr.type)), pa.float64())
+
+
+def _coerce_number(arr, kind):
+    """
+    Convierte texto a int64/float64 con la conversión más estricta que admita el lote
+
+    Un entero que no encaja (p. ej. '2.0') deja la columna en float64 y los
+    valores no numéricos pasan a nulo.
+    """
+    try:
+        return pc.cast(arr, kind)
+    except pa.ArrowInvalid:
+        pass
+    if pa.types.is_integer(kind):
+        numeric = pc.match_substring_regex(arr, _NUMBER)
+        trimmed = pc.if_else(numeric, pc.utf8_trim_whitespace(arr), pa.scalar(None, arr.type))
+        try:
+            return pc.cast(trimmed, kind)
+        except pa.ArrowInvalid:
+            pass
+    return _coerce_float(arr)
+
+
+def clean_listings_batch(batch) -> Tuple[Any, int]:
+    """
+    Limpia un RecordBatch con las mismas reglas que clean_custom_dataframe
+
+    Args:
+        batch: pyarrow.RecordBatch leído con open_listings_csv
+
+    Returns:
+        Tuple: (RecordBatch limpio, filas eliminadas por coordenadas inválidas)
+    """
+    columns = dict(zip(batch.schema.names, batch.columns))
+
+    def is_text(col):
+        return col in columns and pa.types.is_string(columns[col].type)
+
+    for cols, kind in ((INT_COLUMNS, pa.int64()), (FLOAT_COLUMNS, pa.float64())):
+        for col in cols:
+            if is_text(col):
+                columns[col] = _coerce_number(columns[col], kind)
+
+    if is_text('price'):
+        price = pc.replace_substring_regex(columns['price'], r'[\$,]', '')
+        columns['price'] = _coerce_float(price).fill_null(0.0)
+
+    for col in DATE_COLUMNS:
+        if is_text(col):
+            columns[col] = pc.strptime(
+                columns[col], format='%Y-%m-%d', unit='ms', error_is_null=True)
+
+    for col in BOOLEAN_COLUMNS:
+        if is_text(col):
+            values = columns[col]
+            known = pc.is_in(values, value_set=pa.array(['t', 'f']))
+            columns[col] = pc.if_else(
+                known, pc.equal(values, 't'), pa.scalar(None, pa.bool_()))
+
+    for col in PERCENTAGE_COLUMNS:
+        if is_text(col):
+            rate = _coerce_float(pc.replace_substring(columns[col], '%', ''))
+            columns[col] = pc.divide(rate, 100.0)
+
+    if 'reviews_per_month' in columns:
+        columns['reviews_per_month'] = columns['reviews_per_month'].fill_null(0)
+    for col in ('name', 'host_name'):
+        if is_text(col):
+            columns[col] = columns[col].fill_null('Sin nombre')
+
+    cleaned = pa.RecordBatch.from_arrays(list(columns.values()), names=list(columns))
+
+    removed = 0
+    if 'latitude' in columns and 'longitude' in columns:
+        lat = _float_values(columns['latitude'])
+        lon = _float_values(columns['longitude'])
+        with np.errstate(invalid='ignore'):
+            valid = (np.isfinite(lat) & np.isfinite(lon)
+                     & (np.abs(lat) <= 90) & (np.abs(lon) <= 180))
+        removed = int((~valid).sum())
+        if removed:
+            cleaned = cleaned.filter(pa.array(valid))
+
+    return cleaned, removed
+
+
+# ===== VALIDACIÓN =====
+
+def split_valid_batch(batch) -> Tuple[Any, List[Dict[str, Any]]]:
+    """
+    Separa las filas de un RecordBatch limpio que no cumplen el esquema
+
+    Aplica validate_listings (las mismas reglas que el camino de pandas)
+    solo sobre las columnas del $jsonSchema; 'location' se genera después
+    a partir de coordenadas ya válidas.
+
+    Args:
+        batch: pyarrow.RecordBatch limpio, con la fila de origen en _ROW_COLUMN
+
+    Returns:
+        Tuple: (RecordBatch válido sin _ROW_COLUMN, rechazos {row, reasons, document})
+    """
+    names = batch.schema.names
+    rows = batch.column(names.index(_ROW_COLUMN)).to_numpy(zero_copy_only=False)
+    batch = batch.drop_columns([_ROW_COLUMN])
+
+    fields = [name for name in dict.fromkeys([*STRING_FIELDS, *NUMERIC_RANGES]) if name in names]
+    schema_df = batch.select(fields).to_pandas()
+    schema_df.index = rows
+    reasons = validate_listings(schema_df).to_numpy()
+    invalid = reasons != ''
+    if not invalid.any():
+        return batch, []
+
+    rejected = batch.filter(pa.array(invalid)).to_pandas()
+    rejects = [
+        {'row': int(row), 'reasons': reason.split('; '), 'document': document}
+        for row, reason, document in zip(
+            rows[invalid].tolist(), reasons[invalid].tolist(), dataframe_to_documents(rejected))
+    ]
+    return batch.filter(pa.array(~invalid)), rejects
+
+
+# ===== CODIFICACIÓN BSON COLUMNAR =====
+
+def _float_values(arr) -> np.ndarray:
+    """Valores float64 de una columna con los nulos como NaN"""
+    return pc.cast(arr, pa.float64()).to_numpy(zero_copy_only=False)
+
+
+def _valid_mask(arr) -> np.ndarray:
+    """Máscara booleana de valores no nulos"""
+    if arr.null_count == 0:
+        return np.ones(len(arr), dtype=bool)
+    return arr.is_valid().to_numpy(zero_copy_only=False)
+
+
+def _starts(lengths: np.ndarray) -> np.ndarray:
+    """Offsets de inicio a partir de longitudes"""
+    starts = np.zeros(len(lengths), dtype=np.int64)
+    np.cumsum(lengths[:-1], out=starts[1:])
+    return starts
+
+
+def _scatter_segments(
+    out: np.ndarray,
+    dst_starts: np.ndarray,
+    src: np.ndarray,
+    src_starts: np.ndarray,
+    lengths: np.ndarray
+) -> None:
+    """Copia segmentos de longitud variable de `src` a `out` en un solo paso"""
+    total = int(lengths.sum())
+    if total == 0:
+        return
+    width = int(lengths[0])
+    if total == width * len(lengths) and np.all(lengths == width):
+        # Ancho fijo (columna sin nulos): copia por bloques 2D
+        rows = src[src_starts[:, None] + np.arange(width)]
+        out[dst_starts[:, None] + np.arange(width)] = rows
+        return
+    within = np.arange(total, dtype=np.int64) - np.repeat(_starts(lengths), lengths)
+    out[np.repeat(dst_starts, lengths) + within] = src[np.repeat(src_starts, lengths) + within]
+
+
+def _fixed_elements(
+    key: bytes,
+    codes: np.ndarray,
+    payload: np.ndarray,
+    keep: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Codifica elementos BSON de ancho fijo (tipo + clave + valor)
+
+    Args:
+        key: Nombre del campo en UTF-8
+        codes: Tipo BSON por fila (NULL para los nulos)
+        payload: Matriz (filas, ancho) con los bytes del valor
+        keep: Bytes del valor que se conservan por fila
+
+    Returns:
+        Tuple: (bytes concatenados de los elementos, longitud por fila)
+    """
+    rows, width = payload.shape
+    prefix = 2 + len(key)
+    matrix = np.empty((rows, prefix + width), dtype=np.uint8)
+    matrix[:, 0] = codes
+    matrix[:, 1:prefix - 1] = np.frombuffer(key, dtype=np.uint8)
+    matrix[:, prefix - 1] = 0
+    matrix[:, prefix:] = payload
+    lengths = prefix + keep.astype(np.int64)
+    mask = np.arange(prefix + width) < lengths[:, None]
+    return matrix[mask], lengths
+
+
+def _string_elements(key: bytes, arr) -> Tuple[np.ndarray, np.ndarray]:
+    """Codifica una columna de texto leyendo los buffers de Arrow directamente"""
+    arr = pc.cast(arr, pa.large_string())
+    rows = len(arr)
+    valid = _valid_mask(arr)
+    buffers = arr.buffers()
+    offsets = np.frombuffer(buffers[1], dtype=np.int64)[arr.offset:arr.offset + rows + 1]
+    data = (np.frombuffer(buffers[2], dtype=np.uint8)
+            if buffers[2] is not None else np.zeros(0, dtype=np.uint8))
+    sizes = np.where(valid, np.diff(offsets), 0)
+
+    # Cabecera: tipo + clave + longitud int32 (incluye el \0 final)
+    prefix = 2 + len(key)
+    header = np.empty((rows, prefix + 4), dtype=np.uint8)
+    header[:, 0] = np.where(valid, _STRING, _NULL)
+    header[:, 1:prefix - 1] = np.frombuffer(key, dtype=np.uint8)
+    header[:, prefix - 1] = 0
+    header[:, prefix:] = (sizes + 1).astype('<i4').view(np.uint8).reshape(rows, 4)
+
+    header_lengths = np.where(valid, prefix + 4, prefix)
+    lengths = np.where(valid, prefix + 4 + sizes + 1, prefix)
+    starts = _starts(lengths)
+    out = np.zeros(int(lengths.sum()), dtype=np.uint8)
+
+    _scatter_segments(out, starts, header.ravel(),
+                      np.arange(rows, dtype=np.int64) * (prefix + 4), header_lengths)
+    _scatter_segments(out, starts + prefix + 4, data, offsets[:-1], sizes)
+    return out, lengths
+
+
+def _column_elements(name: str, arr) -> Tuple[np.ndarray, np.ndarray]:
+    """Codifica una columna Arrow como elementos BSON, según su tipo"""
+    key = name.encode('utf-8')
+    rows = len(arr)
+    kind = arr.type
+
+    if pa.types.is_floating(kind):
+        values = _float_values(arr)
+        valid = np.isfinite(values)  # NaN/inf -> null, como dataframe_to_documents
+        payload = values.astype('<f8').view(np.uint8).reshape(rows, 8)
+        return _fixed_elements(key, np.where(valid, _DOUBLE, _NULL), payload,
+                               np.where(valid, 8, 0))
+
+    if pa.types.is_integer(kind):
+        values = pc.cast(arr, pa.int64()).fill_null(0).to_numpy(zero_copy_only=False)
+        valid = _valid_mask(arr)
+        # Como PyMongo: int32 si cabe, int64 si no (los bytes bajos en
+        # little-endian son la representación int32)
+        small = (values >= -2**31) & (values < 2**31)
+        codes = np.where(valid, np.where(small, _INT32, _INT64), _NULL)
+        keep = np.where(valid, np.where(small, 4, 8), 0)
+        payload = values.astype('<i8').view(np.uint8).reshape(rows, 8)
+        return _fixed_elements(key, codes, payload, keep)
+
+    if pa.types.is_boolean(kind):
+        valid = _valid_mask(arr)
+        values = arr.fill_null(False).to_numpy(zero_copy_only=False)
+        return _fixed_elements(key, np.where(valid, _BOOL, _NULL),
+                               values.astype(np.uint8).reshape(rows, 1),
+                               valid.astype(np.int64))
+
+    if pa.types.is_timestamp(kind) or pa.types.is_date(kind):
+        millis = pc.cast(pc.cast(arr, pa.timestamp('ms')), pa.int64())
+        valid = _valid_mask(arr)
+        values = millis.fill_null(0).to_numpy(zero_copy_only=False)
+        payload = values.astype('<i8').view(np.uint8).reshape(rows, 8)
+        return _fixed_elements(key, np.where(valid, _DATETIME, _NULL), payload,
+                               np.where(valid, 8, 0))
+
+    if pa.types.is_null(kind):
+        return _fixed_elements(key, np.full(rows, _NULL), np.zeros((rows, 0), np.uint8),
+                               np.zeros(rows, dtype=np.int64))
+
+    # Texto y cualquier otro tipo (se serializa como texto)
+    return _string_elements(key, arr)
+
+
+def _omit_nulls(
+    elements: Tuple[np.ndarray, np.ndarray],
+    valid: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Quita los elementos de las filas nulas (el campo no aparece en el documento)"""
+    data, lengths = elements
+    if valid.all():
+        return data, lengths
+    return data[np.repeat(valid, lengths)], np.where(valid, lengths, 0)
+
+
+def _location_elements(latitude, longitude) -> Tuple[np.ndarray, np.ndarray]:
+    """Codifica el campo GeoJSON 'location' a partir de lat/lon válidas"""
+    rows = len(latitude)
+    payload = np.tile(np.frombuffer(_POINT_TEMPLATE, dtype=np.uint8), (rows, 1))
+    lon = _float_values(longitude).astype('<f8').view(np.uint8).reshape(rows, 8)
+    lat = _float_values(latitude).astype('<f8').view(np.uint8).reshape(rows, 8)
+    payload[:, _POINT_LON:_POINT_LON + 8] = lon
+    payload[:, _POINT_LAT:_POINT_LAT + 8] = lat
+    return _fixed_elements(b'location', np.full(rows, _DOCUMENT), payload,
+                           np.full(rows, payload.shape[1]))
+
+
+def encode_bson_batch(
+    batch,
+    metadata: Optional[Dict[str, Any]] = None,
+    omit_null: Iterable[str] = ()
+) -> List[RawBSONDocument]:
+    """
+    Codifica un RecordBatch como documentos BSON sin crear dicts por fila
+
+    Cada columna se codifica con operaciones vectorizadas sobre sus buffers
+    y los elementos se ensamblan en un único buffer; las filas solo se
+    recorren para envolver cada documento en un RawBSONDocument. Si hay
+    latitud/longitud se agrega 'location' y, al final, la `metadata`
+    (valores constantes, p. ej. imported_at).
+
+    Args:
+        batch: pyarrow.RecordBatch limpio
+        metadata: Campos constantes que se agregan a cada documento
+        omit_null: Columnas cuyos nulos se omiten en lugar de guardarse
+            como null (los opcionales del esquema, como listing_documents)
+
+    Returns:
+        List[RawBSONDocument]: Documentos listos para insert_many
+    """
+    rows = batch.num_rows
+    if rows == 0:
+        return []
+
+    omit_null = set(omit_null)
+    elements = [_omit_nulls(_column_elements(name, column), _valid_mask(column))
+                if name in omit_null else _column_elements(name, column)
+                for name, column in zip(batch.schema.names, batch.columns)]
+    names = batch.schema.names
+    if 'latitude' in names and 'longitude' in names:
+        elements.append(_location_elements(
+            batch.column(names.index('latitude')), batch.column(names.index('longitude'))))
+
+    suffix = np.frombuffer(bson.encode(metadata or {})[4:-1], dtype=np.uint8)
+
+    doc_lengths = 4 + sum(lengths for _, lengths in elements) + len(suffix) + 1
+    doc_starts = _starts(doc_lengths)
+    out = np.zeros(int(doc_lengths.sum()), dtype=np.uint8)
+
+    # Longitud total de cada documento (int32)
+    sizes = doc_lengths.astype('<i4').view(np.uint8).reshape(rows, 4)
+    out[doc_starts[:, None] + np.arange(4)] = sizes
+
+    position = doc_starts + 4
+    for data, lengths in elements:
+        _scatter_segments(out, position, data, _starts(lengths), lengths)
+        position += lengths
+    if len(suffix):
+        out[position[:, None] + np.arange(len(suffix))] = suffix
+    # El \0 final de cada documento ya está en el buffer (np.zeros)
+
+    buffer = out.tobytes()
+    ends = (doc_starts + doc_lengths).tolist()
+    return [RawBSONDocument(buffer[start:end]) for start, end in zip(doc_starts.tolist(), ends)]
+
+
+def iter_bson_batches(
+    csv_path: Union[str, Path],
+    keep_all_columns: bool = False,
+    metadata: Optional[Dict[str, Any]] = None,
+    block_size: int = DEFAULT_BLOCK_SIZE,
+    stats: Optional[Dict[str, int]] = None,
+    on_reject: Optional[Callable[[List[Dict[str, Any]]], Any]] = None
+) -> Iterator[List[RawBSONDocument]]:
+    """
+    Lee, limpia y codifica un CSV de listings bloque a bloque
+
+    Los nulos de los campos opcionales del esquema se omiten, como en
+    listing_documents, para que el $jsonSchema no rechace el documento.
+
+    Args:
+        csv_path: Ruta del archivo CSV
+        keep_all_columns: Si True, mantiene todas las columnas del CSV
+        metadata: Campos constantes que se agregan a cada documento
+        block_size: Bytes de entrada por bloque
+        stats: Diccionario opcional donde acumular 'rows', 'removed' y 'rejected'
+        on_reject: Si se indica, cada bloque se valida contra el esquema de
+            listings y los rechazos se pasan a esta función (p. ej.
+            RejectedListings.write) en lugar de codificarse
+
+    Yields:
+        List[RawBSONDocument]: Documentos de cada bloque
+    """
+    stats = stats if stats is not None else {}
+    stats.setdefault('rows', 0)
+    stats.setdefault('removed', 0)
+    stats.setdefault('rejected', 0)
+
+    for batch in open_listings_csv(csv_path, keep_all_columns, block_size):
+        if on_reject is not None:
+            # Fila de origen de cada registro para la cuarentena
+            batch = batch.append_column(_ROW_COLUMN, pa.array(
+                np.arange(stats['rows'], stats['rows'] + batch.num_rows, dtype=np.int64)))
+        cleaned, removed = clean_listings_batch(batch)
+        stats['rows'] += batch.num_rows
+        stats['removed'] += removed
+        if on_reject is not None:
+            cleaned, rejects = split_valid_batch(cleaned)
+            if rejects:
+                stats['rejected'] += len(rejects)
+                on_reject(rejects)
+        yield encode_bson_batch(cleaned, metadata, omit_null=OPTIONAL_FIELDS)
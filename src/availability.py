@@ -0,0 +1,374 @@
+"""
+Índice de disponibilidad por fechas con un bitmap por listing
+
+Cada listing tiene un bitmap de 366 bits (un bit por día desde el inicio del
+calendario, 1 = disponible) empaquetado con numpy.packbits: 46 bytes por
+listing, guardados como BinData en MongoDB y cargados en memoria como una
+matriz uint8 (listings x bytes). "¿Quién está libre del 12 al 19 de marzo?"
+se resuelve con un AND vectorizado contra la máscara del rango, sin leer
+filas del calendario.
+"""
+
+import logging
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+from bson.binary import Binary
+from pymongo.collection import Collection
+
+logger = logging.getLogger(__name__)
+
+# Un año bisiesto completo
+DEFAULT_DAYS = 366
+
+# Orden de bits dentro de cada byte: el bit 0 es el primer día
+BIT_ORDER = 'little'
+
+DateLike = Union[date, datetime, str, np.datetime64]
+
+
+def _to_day(value: DateLike) -> np.datetime64:
+    """Normaliza una fecha a numpy datetime64[D]"""
+    return np.datetime64(pd.Timestamp(value).date(), 'D')
+
+
+class AvailabilityIndex:
+    """
+    Bitmaps de disponibilidad de todos los listings en una matriz numpy
+
+    Attributes:
+        start: Primer día cubierto (datetime64[D])
+        days: Días cubiertos por cada bitmap
+        listing_ids: IDs de listing ordenados (int64)
+        bits: Matriz uint8 (len(listing_ids) x ceil(days / 8))
+    """
+
+    def __init__(
+        self,
+        start: DateLike,
+        days: int,
+        listing_ids: np.ndarray,
+        bits: np.ndarray
+    ):
+        """
+        Inicializa el índice (ver AvailabilityIndexBuilder y load)
+
+        Args:
+            start: Primer día cubierto
+            days: Días cubiertos por cada bitmap
+            listing_ids: IDs de listing ordenados
+            bits: Bitmaps empaquetados, una fila por listing
+        """
+        self.start = _to_day(start)
+        self.days = int(days)
+        self.listing_ids = np.asarray(listing_ids, dtype=np.int64)
+        # Ancho explícito: reshape(..., -1) falla con cero listings
+        self.bits = np.asarray(bits, dtype=np.uint8).reshape(
+            len(self.listing_ids), (self.days + 7) // 8)
+
+    def __len__(self) -> int:
+        return len(self.listing_ids)
+
+    @property
+    def end(self) -> np.datetime64:
+        """Día siguiente al último cubierto"""
+        return self.start + np.timedelta64(self.days, 'D')
+
+    # ===== CONSULTAS =====
+
+    def _range_mask(self, check_in: DateLike, check_out: DateLike):
+        """
+        Máscara empaquetada de las noches [check_in, check_out)
+
+        Returns:
+            Tuple: (slice de columnas de bytes afectadas, máscara uint8)
+        """
+        first = int((_to_day(check_in) - self.start).astype(np.int64))
+        last = int((_to_day(check_out) - self.start).astype(np.int64))
+        if last <= first:
+            raise ValueError("La fecha de salida debe ser posterior a la de entrada")
+        if first < 0 or last > self.days:
+            raise ValueError(
+                f"Rango fuera del calendario ({self.start} a {self.end - np.timedelta64(1, 'D')})")
+
+        nights = np.zeros(self.bits.shape[1] * 8, dtype=bool)
+        nights[first:last] = True
+        columns = slice(first // 8, (last - 1) // 8 + 1)
+        mask = np.packbits(nights, bitorder=BIT_ORDER)[columns]
+        return columns, mask
+
+    def available_mask(
+        self,
+        check_in: DateLike,
+        check_out: DateLike,
+        listing_ids: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """
+        Indica qué listings están libres todas las noches de [check_in, check_out)
+
+        Args:
+            check_in: Fecha de entrada (primera noche)
+            check_out: Fecha de salida (no se ocupa esa noche)
+            listing_ids: IDs a comprobar (por defecto, todos los del índice)
+
+        Returns:
+            np.ndarray: Array booleano alineado con `listing_ids`
+                (los listings sin bitmap cuentan como no disponibles)
+        """
+        columns, mask = self._range_mask(check_in, check_out)
+        free = np.all((self.bits[:, columns] & mask) == mask, axis=1)
+        if listing_ids is None:
+            return free
+
+        listing_ids = np.asarray(listing_ids, dtype=np.int64)
+        positions = np.searchsorted(self.listing_ids, listing_ids)
+        positions = np.minimum(positions, max(len(self.listing_ids) - 1, 0))
+        known = (len(self.listing_ids) > 0) & (self.listing_ids[positions] == listing_ids)
+        return known & free[positions]
+
+    def available_ids(self, check_in: DateLike, check_out: DateLike) -> np.ndarray:
+        """
+        IDs de los listings libres todas las noches de [check_in, check_out)
+
+        Returns:
+            np.ndarray: IDs de listing ordenados
+        """
+        return self.listing_ids[self.available_mask(check_in, check_out)]
+
+    def available_days(self) -> np.ndarray:
+        """
+        Días disponibles por listing
+
+        Returns:
+            np.ndarray: Conteo de bits a 1 de cada bitmap
+        """
+        return np.unpackbits(self.bits, axis=1, count=self.days, bitorder=BIT_ORDER).sum(axis=1)
+
+    # ===== PERSISTENCIA =====
+
+    def to_documents(self) -> List[Dict[str, Any]]:
+        """
+        Convierte el índice en documentos {_id: listing_id, bits: BinData}
+
+        Returns:
+            List[Dict]: Un documento por listing
+        """
+        start = pd.Timestamp(self.start).to_pydatetime()
+        counts = self.available_days().tolist()
+        return [
+            {
+                '_id': listing_id,
+                'start': start,
+                'days': self.days,
+                'bits': Binary(row.tobytes()),
+                'available_days': count
+            }
+            for listing_id, row, count in zip(self.listing_ids.tolist(), self.bits, counts)
+        ]
+
+    def save(self, collection: Collection, batch_size: int = 5000) -> int:
+        """
+        Reemplaza el contenido de la colección con este índice
+
+        Args:
+            collection: Colección de destino
+            batch_size: Documentos por lote
+
+        Returns:
+            int: Documentos escritos
+        """
+        collection.delete_many({})
+        documents = self.to_documents()
+        for i in range(0, len(documents), batch_size):
+            collection.insert_many(documents[i:i+batch_size], ordered=False)
+        logger.info(
+            f"✅ Índice de disponibilidad guardado: {len(documents):,} listings, "
+            f"{self.bits.nbytes / 1024:,.1f} KB de bitmaps")
+        return len(documents)
+
+    @classmethod
+    def load(cls, collection: Collection) -> 'AvailabilityIndex':
+        """
+        Carga el índice completo de MongoDB a memoria
+
+        Args:
+            collection: Colección con los bitmaps
+
+        Returns:
+            AvailabilityIndex: Índice en memoria (vacío si no hay documentos)
+        """
+        documents = list(collection.find({}, {'start': 1, 'days': 1, 'bits': 1}).sort('_id', 1))
+        if not documents:
+            logger.warning(f"⚠️ No hay bitmaps de disponibilidad en '{collection.name}'")
+            return cls(np.datetime64('today', 'D'), DEFAULT_DAYS,
+                       np.empty(0, dtype=np.int64),
+                       np.empty((0, (DEFAULT_DAYS + 7) // 8), dtype=np.uint8))
+
+        start, days = documents[0]['start'], documents[0]['days']
+        if any(doc['start'] != start or doc['days'] != days for doc in documents):
+            raise ValueError(f"Los bitmaps de '{collection.name}' no comparten el mismo rango")
+
+        listing_ids = np.fromiter((doc['_id'] for doc in documents), dtype=np.int64,
+                                  count=len(documents))
+        bits = np.frombuffer(b''.join(doc['bits'] for doc in documents), dtype=np.uint8)
+        logger.info(f"✅ Índice de disponibilidad cargado: {len(documents):,} listings")
+        return cls(start, days, listing_ids, bits)
+
+
+class AvailabilityIndexBuilder:
+    """
+    Construye un AvailabilityIndex a partir de chunks del calendario
+
+    Sin `start` explícito, el rango empieza en el día más antiguo visto: si
+    un chunk posterior trae un día anterior, la matriz se desplaza. Las filas
+    que quedan fuera del rango se cuentan en `dropped`.
+    """
+
+    def __init__(self, start: Optional[DateLike] = None, days: int = DEFAULT_DAYS):
+        """
+        Inicializa el constructor
+
+        Args:
+            start: Primer día cubierto (por defecto, el día más antiguo del
+                calendario, que es la fecha del scrape)
+            days: Días cubiertos por cada bitmap
+        """
+        self.start = _to_day(start) if start is not None else None
+        self.days = int(days)
+        self.dropped = 0
+        self._fixed_start = start is not None
+        self._rows: Dict[int, int] = {}
+        self._matrix = np.zeros((1024, self.days), dtype=bool)
+        # Filas del calendario marcadas en cada día (para contar las que se pierden)
+        self._day_rows = np.zeros(self.days, dtype=np.int64)
+
+    def _shift(self, days: int) -> None:
+        """Retrasa el inicio del rango `days` días; los últimos días se descartan"""
+        kept = max(self.days - days, 0)
+        self.dropped += int(self._day_rows[kept:].sum())
+        shifted = np.zeros_like(self._matrix)
+        shifted[:, days:] = self._matrix[:, :kept]
+        self._matrix = shifted
+        self._day_rows = np.concatenate(
+            [np.zeros(self.days - kept, dtype=np.int64), self._day_rows[:kept]])
+
+    def add(self, chunk: pd.DataFrame) -> None:
+        """
+        Marca los días disponibles de un chunk limpio (clean_calendar_chunk)
+
+        Args:
+            chunk: DataFrame con listing_id, date y available
+        """
+        if chunk.empty:
+            return
+        dates = chunk['date'].to_numpy().astype('datetime64[D]')
+        first = dates.min()
+        if self.start is None:
+            self.start = first
+        elif first < self.start and not self._fixed_start:
+            self._shift(int((self.start - first).astype(np.int64)))
+            self.start = first
+
+        offsets = (dates - self.start).astype(np.int64)
+        in_range = (offsets >= 0) & (offsets < self.days)
+        self.dropped += int((~in_range).sum())
+        ids = chunk['listing_id'].to_numpy(dtype=np.int64)[in_range]
+        offsets = offsets[in_range]
+        available = chunk['available'].eq(True).to_numpy()[in_range]
+
+        unique_ids, inverse = np.unique(ids, return_inverse=True)
+        rows = np.array([self._rows.setdefault(listing_id, len(self._rows))
+                         for listing_id in unique_ids.tolist()], dtype=np.int64)
+
+        if len(self._rows) > len(self._matrix):
+            grown = np.zeros((max(len(self._rows), 2 * len(self._matrix)), self.days), dtype=bool)
+            grown[:len(self._matrix)] = self._matrix
+            self._matrix = grown
+
+        self._matrix[rows[inverse], offsets] = available
+        self._day_rows += np.bincount(offsets, minlength=self.days)
+
+    def build(self) -> AvailabilityIndex:
+        """
+        Empaqueta los bitmaps ordenados por listing_id
+
+        Returns:
+            AvailabilityIndex: Índice listo para consultar o guardar
+        """
+        listing_ids = np.fromiter(self._rows.keys(), dtype=np.int64, count=len(self._rows))
+        rows = np.fromiter(self._rows.values(), dtype=np.int64, count=len(self._rows))
+        order = np.argsort(listing_ids)
+        bits = np.packbits(self._matrix[rows[order]], axis=1, bitorder=BIT_ORDER)
+        start = self.start if self.start is not None else np.datetime64('today', 'D')
+        if self.dropped:
+            logger.warning(
+                f"⚠️ {self.dropped:,} filas del calendario fuera del rango "
+                f"{start} + {self.days} días no entran en los bitmaps")
+        return AvailabilityIndex(start, self.days, listing_ids[order], bits)
+
+
+def search_available(
+    crud,
+    index: AvailabilityIndex,
+    check_in: DateLike,
+    check_out: DateLike,
+    neighbourhood: Optional[str] = None,
+    room_type: Optional[str] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    neighbourhood_field: str = 'neighbourhood',
+    projection: Optional[Dict[str, int]] = None,
+    limit: int = 0
+) -> List[Dict[str, Any]]:
+    """
+    Busca listings libres en un rango de fechas con los filtros de AirbnbCRUD
+
+    Los filtros de barrio, tipo y precio se resuelven en MongoDB (con sus
+    índices) y la disponibilidad se comprueba en memoria con los bitmaps.
+
+    Args:
+        crud: Instancia de AirbnbCRUD sobre la colección de listings
+        index: Índice de disponibilidad en memoria
+        check_in: Fecha de entrada (primera noche)
+        check_out: Fecha de salida (no se ocupa esa noche)
+        neighbourhood: Barrio (opcional)
+        room_type: Tipo de habitación (opcional)
+        min_price: Precio mínimo (opcional)
+        max_price: Precio máximo (opcional)
+        neighbourhood_field: Campo del barrio (p. ej. 'neighbourhood_group_cleansed'
+            para distritos como Centro)
+        projection: Campos a devolver (siempre se incluye 'id')
+        limit: Número máximo de resultados (0 = sin límite)
+
+    Returns:
+        List[Dict]: Listings disponibles ordenados por precio
+    """
+    query: Dict[str, Any] = {'id': {'$exists': True}}
+    if neighbourhood is not None:
+        query[neighbourhood_field] = neighbourhood
+    if room_type is not None:
+        query['room_type'] = room_type
+    if min_price is not None or max_price is not None:
+        query['price'] = {}
+        if min_price is not None:
+            query['price']['$gte'] = min_price
+        if max_price is not None:
+            query['price']['$lte'] = max_price
+
+    if projection is not None:
+        projection = {**projection, 'id': 1}
+
+    candidates = crud.find_listings(query, projection, sort=[('price', 1)])
+    if not candidates:
+        return []
+
+    ids = np.array([int(doc['id']) for doc in candidates], dtype=np.int64)
+    free = index.available_mask(check_in, check_out, ids)
+    results = [doc for doc, ok in zip(candidates, free.tolist()) if ok]
+
+    logger.info(
+        f"✅ {len(results)} de {len(candidates)} listings libres "
+        f"del {_to_day(check_in)} al {_to_day(check_out)}")
+    return results[:limit] if limit > 0 else results
@@ -0,0 +1,723 @@
+"""
+Motor de inserción masiva concurrente para los scripts de importación
+"""
+
+import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from bson import ObjectId, decode, encode
+from bson.raw_bson import RawBSONDocument
+from pymongo.collection import Collection
+from pymongo.errors import (
+    BulkWriteError, ConnectionFailure, ExecutionTimeout, PyMongoError, WTimeoutError
+)
+
+logger = logging.getLogger(__name__)
+
+# Número máximo de errores individuales que se conservan para el resumen
+MAX_STORED_ERRORS = 20
+
+# Límites del servidor si no se pueden consultar con 'hello'
+DEFAULT_MAX_MESSAGE_BYTES = 48_000_000
+DEFAULT_MAX_WRITE_BATCH = 100_000
+
+# Margen para la cabecera del mensaje OP_MSG y del comando insert
+MESSAGE_OVERHEAD_BYTES = 64 * 1024
+
+# Documentos que codifica cada tarea de los hilos codificadores
+ENCODE_CHUNK = 1000
+
+# Lotes adaptativos (AdaptiveBulkWriter): tamaño inicial, mínimo y
+# aumento aditivo en bytes, y latencia objetivo por lote en segundos
+ADAPTIVE_INITIAL_BYTES = 1024 * 1024
+ADAPTIVE_MIN_BYTES = 64 * 1024
+ADAPTIVE_STEP_BYTES = 512 * 1024
+ADAPTIVE_TARGET_LATENCY = 0.5
+
+# Errores que se reintentan: red, elección de primario y timeouts del servidor
+TRANSIENT_ERRORS = (ConnectionFailure, ExecutionTimeout, WTimeoutError)
+
+DUPLICATE_KEY_CODE = 11000
+
+
+def is_transient_error(error: Exception) -> bool:
+    """Indica si un error de escritura es transitorio (se puede reintentar)"""
+    if isinstance(error, TRANSIENT_ERRORS):
+        return True
+    return isinstance(error, PyMongoError) and error.has_error_label('RetryableWriteError')
+
+
+def _add_timestamps(documents: List[Dict[str, Any]]) -> None:
+    """Agrega created_at/updated_at como AirbnbCRUD.create_many_listings"""
+    now = datetime.now()
+    for doc in documents:
+        doc['created_at'] = now
+        doc['updated_at'] = now
+
+
+def server_write_limits(collection: Collection) -> Dict[str, int]:
+    """
+    Consulta los límites de escritura del servidor con el comando 'hello'
+
+    Args:
+        collection: Colección MongoDB de destino
+
+    Returns:
+        Dict: max_message_bytes y max_write_batch (valores por defecto si
+            el comando falla)
+    """
+    try:
+        hello = collection.database.client.admin.command('hello')
+    except Exception as e:
+        logger.warning(f"⚠️ No se pudieron consultar los límites del servidor: {e}")
+        hello = {}
+    return {
+        "max_message_bytes": hello.get('maxMessageSizeBytes', DEFAULT_MAX_MESSAGE_BYTES),
+        "max_write_batch": hello.get('maxWriteBatchSize', DEFAULT_MAX_WRITE_BATCH),
+    }
+
+
+class BulkInsertEngine:
+    """
+    Inserta documentos en lotes insert_many(ordered=False) concurrentes
+
+    Mantiene hasta `workers` lotes en vuelo en un pool de hilos; cuando
+    todos están ocupados, `insert` bloquea al productor (backpressure).
+    Los fallos por documento no detienen la importación: se cuentan y se
+    conservan los primeros errores para el resumen final. Los lotes que
+    fallan completos (red, servidor) se cuentan además en `aborted` con el
+    último error en `last_error`: quien confirma checkpoints no debe
+    avanzar sobre esas filas. Los documentos que el servidor rechaza uno a
+    uno (p. ej. por el $jsonSchema) se pasan a `on_reject`.
+    """
+
+    def __init__(
+        self,
+        collection: Collection,
+        batch_size: int = 1000,
+        workers: int = 4,
+        timestamps: bool = True,
+        progress: Optional[Callable[[int], Any]] = None,
+        on_reject: Optional[Callable[[List[Dict[str, Any]]], Any]] = None
+    ):
+        """
+        Inicializa el motor de inserción
+
+        Args:
+            collection: Colección MongoDB de destino
+            batch_size: Documentos por lote
+            workers: Lotes simultáneos en vuelo
+            timestamps: Si True, agrega created_at/updated_at como
+                AirbnbCRUD.create_many_listings
+            progress: Callback opcional que recibe los documentos insertados
+                por cada lote (p. ej. tqdm.update)
+            on_reject: Callback con los documentos rechazados, como
+                [{'document', 'reasons'}] (p. ej. RejectedListings.write)
+        """
+        self.collection = collection
+        self.batch_size = max(int(batch_size), 1)
+        self.workers = max(int(workers), 1)
+        self.timestamps = timestamps
+        self.progress = progress
+        self.on_reject = on_reject
+
+        self.inserted = 0
+        self.failed = 0
+        self.aborted = 0
+        self.batches = 0
+        self.errors: List[Dict[str, Any]] = []
+        self.last_error: Optional[Exception] = None
+
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.workers, thread_name_prefix='bulk-insert')
+        self._slots = threading.BoundedSemaphore(self.workers)
+        self._lock = threading.Lock()
+        self._reject_lock = threading.Lock()
+        self._buffer: List[Dict[str, Any]] = []
+        self._started = time.perf_counter()
+        self._finished: Optional[float] = None
+
+    # ===== PRODUCTOR =====
+
+    def insert(self, documents: Iterable[Dict[str, Any]]) -> None:
+        """
+        Agrega documentos al motor; se envían en lotes de `batch_size`
+
+        Args:
+            documents: Documentos a insertar
+        """
+        for doc in documents:
+            self._buffer.append(doc)
+            if len(self._buffer) >= self.batch_size:
+                self._submit(self._buffer)
+                self._buffer = []
+
+    def flush(self) -> None:
+        """Envía el lote parcial pendiente"""
+        if self._buffer:
+            self._submit(self._buffer)
+            self._buffer = []
+
+    def drain(self) -> None:
+        """Envía lo pendiente y espera a que terminen todos los lotes en vuelo"""
+        self.flush()
+        for _ in range(self.workers):
+            self._slots.acquire()
+        for _ in range(self.workers):
+            self._slots.release()
+
+    def close(self) -> Dict[str, Any]:
+        """
+        Envía lo pendiente, espera a los lotes en vuelo y libera el pool
+
+        Returns:
+            Dict: Estadísticas de la importación (ver `stats`)
+        """
+        if self._finished is None:
+            self.flush()
+            self._executor.shutdown(wait=True)
+            self._finished = time.perf_counter()
+        return self.stats()
+
+    def _submit(self, batch: List[Dict[str, Any]]) -> None:
+        """Envía un lote al pool, bloqueando si no hay huecos libres"""
+        self._slots.acquire()
+        try:
+            future = self._executor.submit(self._insert_batch, batch)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+
+    # ===== CONSUMIDOR =====
+
+    def _insert_batch(self, batch: List[Dict[str, Any]]) -> None:
+        """Inserta un lote y registra el resultado"""
+        if self.timestamps:
+            _add_timestamps(batch)
+        self._write_batch(batch)
+
+    def _write_batch(self, batch: List[Any]) -> None:
+        """Ejecuta insert_many(ordered=False) y acumula las estadísticas"""
+        try:
+            self.collection.insert_many(batch, ordered=False)
+            # Sin excepción se insertó el lote completo (los RawBSONDocument
+            # no aparecen en inserted_ids)
+            inserted, errors, aborted = len(batch), [], 0
+        except BulkWriteError as e:
+            inserted = e.details.get('nInserted', 0)
+            errors = e.details.get('writeErrors', [])
+            aborted = 0
+        except Exception as e:
+            logger.error(f"❌ Lote de {len(batch)} documentos fallido: {e}")
+            inserted, errors = 0, [{'errmsg': str(e), 'count': len(batch)}]
+            aborted = len(batch)
+            self.last_error = e
+
+        failed = len(batch) - inserted
+        with self._lock:
+            self.inserted += inserted
+            self.failed += failed
+            self.aborted += aborted
+            self.batches += 1
+            room = MAX_STORED_ERRORS - len(self.errors)
+            if room > 0:
+                self.errors.extend(errors[:room])
+
+        if failed:
+            logger.warning(f"⚠️ {failed} documentos rechazados en un lote")
+        if aborted == 0:
+            self._reject([(batch[error['index']], error.get('errmsg', str(error)))
+                          for error in errors if 'index' in error])
+        if self.progress is not None:
+            self.progress(inserted)
+
+    def _reject(self, rejected: List[Tuple[Any, str]]) -> None:
+        """Pasa los documentos rechazados (documento, motivo) a `on_reject`"""
+        if not rejected or self.on_reject is None:
+            return
+        with self._reject_lock:
+            self.on_reject([
+                {'document': decode(doc.raw) if isinstance(doc, RawBSONDocument) else doc,
+                 'reasons': [reason]}
+                for doc, reason in rejected])
+
+    # ===== ESTADÍSTICAS =====
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Retorna las estadísticas de la importación
+
+        Returns:
+            Dict: inserted, failed, batches, elapsed (s) y docs_per_second
+        """
+        end = self._finished if self._finished is not None else time.perf_counter()
+        elapsed = end - self._started
+        return {
+            "inserted": self.inserted,
+            "failed": self.failed,
+            "batches": self.batches,
+            "elapsed": elapsed,
+            "docs_per_second": self.inserted / elapsed if elapsed > 0 else 0.0
+        }
+
+    def log_summary(self) -> None:
+        """Registra el resumen de rendimiento y los primeros errores"""
+        stats = self.stats()
+        logger.info(
+            f"⚡ {stats['inserted']:,} documentos en {stats['elapsed']:.1f}s "
+            f"({stats['docs_per_second']:,.0f} docs/s, {self.workers} lotes en vuelo "
+            f"de {self.batch_size})")
+        if stats['failed']:
+            logger.warning(f"⚠️ {stats['failed']:,} documentos no insertados")
+            for error in self.errors[:5]:
+                logger.warning(f"  - {error.get('errmsg', error)}")
+
+    def __enter__(self):
+        """Context manager entry"""
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """Context manager exit"""
+        self.close()
+
+
+class RawBSONInsertEngine(BulkInsertEngine):
+    """
+    Variante de BulkInsertEngine que pre-codifica los documentos a BSON
+
+    Un pool de hilos codificadores convierte los dicts en RawBSONDocument
+    (PyMongo los envía sin volver a codificarlos) mientras otros lotes
+    viajan por la red. Los lotes no se cortan por número de documentos
+    sino por bytes, al tamaño máximo de mensaje del servidor, de modo que
+    cada insert_many es un único mensaje.
+    """
+
+    def __init__(
+        self,
+        collection: Collection,
+        batch_size: int = 1000,
+        workers: int = 4,
+        timestamps: bool = True,
+        progress: Optional[Callable[[int], Any]] = None,
+        encoders: int = 2,
+        max_batch_bytes: Optional[int] = None,
+        on_reject: Optional[Callable[[List[Dict[str, Any]]], Any]] = None
+    ):
+        """
+        Inicializa el motor de inserción pre-codificada
+
+        Args:
+            collection: Colección MongoDB de destino
+            batch_size: Sin uso para cortar lotes (se mantiene por
+                compatibilidad); el límite es `max_batch_bytes`
+            workers: Lotes simultáneos en vuelo
+            timestamps: Si True, agrega created_at/updated_at antes de codificar
+            progress: Callback opcional que recibe los documentos insertados
+            encoders: Hilos codificadores
+            max_batch_bytes: Bytes máximos por lote (por defecto, el tamaño
+                máximo de mensaje del servidor)
+            on_reject: Callback con los documentos rechazados (ver BulkInsertEngine)
+        """
+        super().__init__(collection, batch_size, workers, timestamps, progress, on_reject)
+        limits = server_write_limits(collection)
+        self.max_batch_bytes = max_batch_bytes or (
+            limits['max_message_bytes'] - MESSAGE_OVERHEAD_BYTES)
+        self.max_batch_docs = limits['max_write_batch']
+        self.encoders = max(int(encoders), 1)
+
+        self._encoder = ThreadPoolExecutor(
+            max_workers=self.encoders, thread_name_prefix='bson-encode')
+        self._encode_slots = threading.BoundedSemaphore(self.encoders * 2)
+        self._batch_lock = threading.Lock()
+        self._pending: List[Dict[str, Any]] = []
+        self._encoded: List[RawBSONDocument] = []
+        self._encoded_bytes = 0
+        self.encoded_bytes = 0
+
+    # ===== PRODUCTOR =====
+
+    def insert(self, documents: Iterable[Dict[str, Any]]) -> None:
+        """
+        Agrega documentos; se codifican en segundo plano por bloques
+
+        Args:
+            documents: Documentos a insertar
+        """
+        for doc in documents:
+            self._pending.append(doc)
+            if len(self._pending) >= ENCODE_CHUNK:
+                self._submit_encode(self._pending)
+                self._pending = []
+
+    def flush(self) -> None:
+        """Codifica lo pendiente y envía el lote parcial"""
+        if self._pending:
+            self._submit_encode(self._pending)
+            self._pending = []
+        self._wait_encoders()
+        with self._batch_lock:
+            batch, self._encoded, self._encoded_bytes = self._encoded, [], 0
+        if batch:
+            self._submit(batch)
+
+    def close(self) -> Dict[str, Any]:
+        """
+        Codifica e inserta lo pendiente y libera los pools
+
+        Returns:
+            Dict: Estadísticas de la importación (ver `stats`)
+        """
+        if self._finished is None:
+            self.flush()
+            self._encoder.shutdown(wait=True)
+            self._executor.shutdown(wait=True)
+            self._finished = time.perf_counter()
+        return self.stats()
+
+    def _submit_encode(self, documents: List[Dict[str, Any]]) -> None:
+        """Envía un bloque a los codificadores, bloqueando si van retrasados"""
+        self._encode_slots.acquire()
+        try:
+            future = self._encoder.submit(self._encode, documents)
+        except Exception:
+            self._encode_slots.release()
+            raise
+        future.add_done_callback(lambda _: self._encode_slots.release())
+
+    def _wait_encoders(self) -> None:
+        """Espera a que terminen todas las tareas de codificación"""
+        slots = self.encoders * 2
+        for _ in range(slots):
+            self._encode_slots.acquire()
+        for _ in range(slots):
+            self._encode_slots.release()
+
+    # ===== CODIFICADORES =====
+
+    def _encode(self, documents: List[Dict[str, Any]]) -> None:
+        """Codifica un bloque y lo agrega al lote en curso (por bytes)"""
+        if self.timestamps:
+            _add_timestamps(documents)
+
+        encoded, rejected = [], []
+        for doc in documents:
+            if '_id' not in doc:
+                doc['_id'] = ObjectId()  # Como insert_many con dicts
+            try:
+                encoded.append(RawBSONDocument(encode(doc)))
+            except Exception as e:
+                rejected.append((doc, f"BSON: {e}"))
+
+        if rejected:
+            logger.warning(f"⚠️ {len(rejected)} documentos no codificables en BSON")
+            with self._lock:
+                self.failed += len(rejected)
+                room = MAX_STORED_ERRORS - len(self.errors)
+                if room > 0:
+                    self.errors.extend({'errmsg': reason, 'count': 1}
+                                       for _, reason in rejected[:room])
+            self._reject(rejected)
+
+        full = []
+        with self._batch_lock:
+            for raw in encoded:
+                size = len(raw.raw)
+                if self._encoded and (
+                        self._encoded_bytes + size > self.max_batch_bytes
+                        or len(self._encoded) >= self.max_batch_docs):
+                    full.append(self._encoded)
+                    self._encoded, self._encoded_bytes = [], 0
+                self._encoded.append(raw)
+                self._encoded_bytes += size
+                self.encoded_bytes += size
+
+        # Fuera del lock: _submit puede bloquear si los escritores van llenos
+        for batch in full:
+            self._submit(batch)
+
+    # ===== CONSUMIDOR =====
+
+    def _insert_batch(self, batch: List[RawBSONDocument]) -> None:
+        """Inserta un lote ya codificado"""
+        self._write_batch(batch)
+
+    def log_summary(self) -> None:
+        """Registra el resumen de rendimiento, incluido el volumen codificado"""
+        super().log_summary()
+        logger.info(
+            f"🧬 {self.encoded_bytes / 1024 / 1024:,.1f} MB pre-codificados en "
+            f"{self.batches} lotes (máx. {self.max_batch_bytes / 1024 / 1024:,.0f} MB/lote)")
+
+
+class AdaptiveBulkWriter(BulkInsertEngine):
+    """
+    Motor de inserción con lotes adaptativos, reintentos y bisección
+
+    - Los documentos se codifican a BSON al entrar y los lotes se cortan
+      por bytes codificados, no por número de documentos: un lote de
+      listings con --keep-all (description, host_about, amenities...) pesa
+      mucho más que uno con las columnas mínimas.
+    - El tamaño objetivo del lote se ajusta con AIMD según la latencia de
+      cada insert_many: crece de forma aditiva mientras la latencia queda
+      por debajo del objetivo y se reduce a la mitad si la supera o si hay
+      un error transitorio.
+    - Los errores transitorios (red, elección de primario, timeouts) se
+      reintentan con backoff exponencial y jitter. En los reintentos, un
+      duplicado de _id significa que el documento ya entró en el intento
+      anterior (los _id se asignan aquí) y se cuenta como insertado.
+    - Si el servidor rechaza un lote completo (documento demasiado grande,
+      error de comando...), el lote se divide en dos recursivamente hasta
+      aislar los documentos problemáticos; el resto se inserta.
+
+    Los documentos rechazados se pasan a `on_reject` (p. ej.
+    RejectedListings.write) en lugar de detener la importación. Un lote
+    que agota los reintentos no es un rechazo del documento: se cuenta en
+    `aborted` y no se envía a `on_reject`.
+    """
+
+    def __init__(
+        self,
+        collection: Collection,
+        batch_size: int = 1000,
+        workers: int = 4,
+        timestamps: bool = True,
+        progress: Optional[Callable[[int], Any]] = None,
+        target_latency: float = ADAPTIVE_TARGET_LATENCY,
+        initial_batch_bytes: int = ADAPTIVE_INITIAL_BYTES,
+        min_batch_bytes: int = ADAPTIVE_MIN_BYTES,
+        max_batch_bytes: Optional[int] = None,
+        retries: int = 3,
+        backoff: float = 0.5,
+        on_reject: Optional[Callable[[List[Dict[str, Any]]], Any]] = None
+    ):
+        """
+        Inicializa el motor adaptativo
+
+        Args:
+            collection: Colección MongoDB de destino
+            batch_size: Sin uso para cortar lotes (se mantiene por
+                compatibilidad); el límite es el tamaño adaptativo en bytes
+            workers: Lotes simultáneos en vuelo
+            timestamps: Si True, agrega created_at/updated_at antes de codificar
+            progress: Callback opcional que recibe los documentos insertados
+            target_latency: Latencia objetivo por insert_many en segundos
+            initial_batch_bytes: Tamaño inicial del lote en bytes
+            min_batch_bytes: Tamaño mínimo del lote en bytes
+            max_batch_bytes: Tamaño máximo del lote (por defecto, el tamaño
+                máximo de mensaje del servidor)
+            retries: Reintentos por lote ante errores transitorios
+            backoff: Espera base en segundos (se duplica en cada reintento)
+            on_reject: Callback con los documentos rechazados, como
+                [{'document', 'reasons'}]
+        """
+        super().__init__(collection, batch_size, workers, timestamps, progress, on_reject)
+        limits = server_write_limits(collection)
+        self.max_batch_bytes = max_batch_bytes or (
+            limits['max_message_bytes'] - MESSAGE_OVERHEAD_BYTES)
+        self.max_batch_docs = limits['max_write_batch']
+        self.min_batch_bytes = min(min_batch_bytes, self.max_batch_bytes)
+        self.batch_bytes = max(min(initial_batch_bytes, self.max_batch_bytes), self.min_batch_bytes)
+        self.target_latency = target_latency
+        self.retries = max(int(retries), 0)
+        self.backoff = backoff
+
+        self.retried = 0
+        self.splits = 0
+        self.encoded_bytes = 0
+        self.peak_batch_bytes = self.batch_bytes
+        self._buffer_bytes = 0
+
+    # ===== PRODUCTOR =====
+
+    def insert(self, documents: Iterable[Dict[str, Any]]) -> None:
+        """
+        Codifica los documentos y los agrupa en lotes del tamaño actual en bytes
+
+        Args:
+            documents: Documentos a insertar
+        """
+        now = datetime.now()
+        for doc in documents:
+            if self.timestamps:
+                doc['created_at'] = now
+                doc['updated_at'] = now
+            if '_id' not in doc:
+                doc['_id'] = ObjectId()  # Como insert_many con dicts
+            try:
+                raw = RawBSONDocument(encode(doc))
+            except Exception as e:
+                self._record(0, [(doc, f"BSON: {e}")])
+                continue
+
+            size = len(raw.raw)
+            if self._buffer and (
+                    self._buffer_bytes + size > self.batch_bytes
+                    or len(self._buffer) >= self.max_batch_docs):
+                self.flush()
+            self._buffer.append(raw)
+            self._buffer_bytes += size
+            self.encoded_bytes += size
+
+    def flush(self) -> None:
+        """Envía el lote parcial pendiente"""
+        self._buffer_bytes = 0
+        super().flush()
+
+    # ===== CONSUMIDOR =====
+
+    def _insert_batch(self, batch: List[RawBSONDocument]) -> None:
+        """Inserta un lote ya codificado"""
+        self._write_batch(batch)
+
+    def _write_batch(self, batch: List[RawBSONDocument]) -> None:
+        """Inserta un lote con reintentos y bisección y acumula las estadísticas"""
+        inserted, rejected = self._write_adaptive(batch)
+        self._record(inserted, rejected)
+        with self._lock:
+            self.batches += 1
+        if self.progress is not None:
+            self.progress(inserted)
+
+    def _write_adaptive(
+        self,
+        batch: List[RawBSONDocument],
+        retried: bool = False
+    ) -> Tuple[int, List[Tuple[Any, str]]]:
+        """
+        Inserta un lote: reintenta los errores transitorios y divide el
+        lote si el servidor lo rechaza completo
+
+        Returns:
+            Tuple: (documentos insertados, [(documento, motivo)] rechazados)
+        """
+        size = sum(len(raw.raw) for raw in batch)
+        attempt = 0
+        while True:
+            started = time.perf_counter()
+            try:
+                self.collection.insert_many(batch, ordered=False)
+                self._adjust(size, time.perf_counter() - started)
+                return len(batch), []
+            except BulkWriteError as e:
+                # El servidor procesó el lote: los errores son por documento
+                self._adjust(size, time.perf_counter() - started)
+                inserted = e.details.get('nInserted', 0)
+                rejected = []
+                for error in e.details.get('writeErrors', []):
+                    if (retried or attempt > 0) and error.get('code') == DUPLICATE_KEY_CODE \
+                            and '_id' in error.get('keyPattern', {'_id': 1}):
+                        inserted += 1  # Ya insertado en el intento anterior
+                    else:
+                        rejected.append((batch[error['index']], error.get('errmsg', str(error))))
+                return inserted, rejected
+            except Exception as e:
+                if is_transient_error(e):
+                    self._adjust(size, None)
+                    if attempt < self.retries:
+                        delay = self.backoff * 2 ** attempt * (1 + random.random())
+                        attempt += 1
+                        with self._lock:
+                            self.retried += 1
+                        logger.warning(
+                            f"⚠️ Error transitorio en un lote de {len(batch)} documentos "
+                            f"({e}); reintento {attempt}/{self.retries} en {delay:.1f}s")
+                        time.sleep(delay)
+                        continue
+                    logger.error(f"❌ Lote de {len(batch)} documentos fallido tras "
+                                 f"{self.retries} reintentos: {e}")
+                    with self._lock:
+                        self.failed += len(batch)
+                        self.aborted += len(batch)
+                        self.last_error = e
+                        if len(self.errors) < MAX_STORED_ERRORS:
+                            self.errors.append({'errmsg': str(e), 'count': len(batch)})
+                    return 0, []
+
+                if len(batch) == 1:
+                    return 0, [(batch[0], str(e))]
+
+                # Lote rechazado completo: bisección para aislar los culpables
+                with self._lock:
+                    self.splits += 1
+                middle = len(batch) // 2
+                retried = retried or attempt > 0
+                left = self._write_adaptive(batch[:middle], retried)
+                right = self._write_adaptive(batch[middle:], retried)
+                return left[0] + right[0], left[1] + right[1]
+
+    def _adjust(self, size: int, elapsed: Optional[float]) -> None:
+        """AIMD: suma un paso si el lote fue rápido, divide a la mitad si fue lento o falló"""
+        with self._lock:
+            if elapsed is not None and elapsed <= self.target_latency:
+                # Solo crece si el lote medido llenaba el tamaño actual
+                if size >= self.batch_bytes / 2:
+                    self.batch_bytes = min(self.batch_bytes + ADAPTIVE_STEP_BYTES, self.max_batch_bytes)
+            else:
+                self.batch_bytes = max(self.batch_bytes // 2, self.min_batch_bytes)
+            self.peak_batch_bytes = max(self.peak_batch_bytes, self.batch_bytes)
+
+    def _record(self, inserted: int, rejected: List[Tuple[Any, str]]) -> None:
+        """Acumula insertados y rechazados y notifica los rechazos"""
+        with self._lock:
+            self.inserted += inserted
+            self.failed += len(rejected)
+            room = MAX_STORED_ERRORS - len(self.errors)
+            if room > 0:
+                self.errors.extend({'errmsg': reason} for _, reason in rejected[:room])
+        if not rejected:
+            return
+
+        logger.warning(f"⚠️ {len(rejected)} documentos rechazados en un lote")
+        self._reject(rejected)
+
+    def log_summary(self) -> None:
+        """Registra el resumen, con el tamaño de lote alcanzado, reintentos y divisiones"""
+        stats = self.stats()
+        logger.info(
+            f"⚡ {stats['inserted']:,} documentos en {stats['elapsed']:.1f}s "
+            f"({stats['docs_per_second']:,.0f} docs/s, {self.workers} lotes en vuelo)")
+        logger.info(
+            f"📐 Lotes adaptativos: {self.encoded_bytes / 1024 / 1024:,.1f} MB en "
+            f"{self.batches} lotes, tamaño actual {self.batch_bytes / 1024:,.0f} KB "
+            f"(máx. alcanzado {self.peak_batch_bytes / 1024:,.0f} KB), "
+            f"{self.retried} reintentos, {self.splits} divisiones")
+        if stats['failed']:
+            logger.warning(f"⚠️ {stats['failed']:,} documentos no insertados")
+            for error in self.errors[:5]:
+                logger.warning(f"  - {error.get('errmsg', error)}")
+
+
+def create_insert_engine(
+    collection: Collection,
+    batch_size: int = 1000,
+    workers: int = 4,
+    pre_encode: bool = False,
+    adaptive: bool = False,
+    **kwargs
+) -> BulkInsertEngine:
+    """
+    Crea el motor de inserción adecuado
+
+    Args:
+        collection: Colección MongoDB de destino
+        batch_size: Documentos por lote (solo sin pre-codificación)
+        workers: Lotes simultáneos en vuelo
+        pre_encode: Si True, usa RawBSONInsertEngine
+        adaptive: Si True, usa AdaptiveBulkWriter (lotes por bytes y latencia,
+            reintentos y bisección; ya pre-codifica por sí mismo)
+        **kwargs: Argumentos adicionales del motor (timestamps, progress,
+            on_reject...)
+
+    Returns:
+        BulkInsertEngine: Motor listo para usar
+    """
+    if adaptive:
+        return AdaptiveBulkWriter(collection, batch_size, workers, **kwargs)
+    engine_cls = RawBSONInsertEngine if pre_encode else BulkInsertEngine
+    return engine_cls(collection, batch_size, workers, **kwargs)
@@ -0,0 +1,305 @@
+"""
+Calendario de disponibilidad (calendar.csv) en una colección time-series
+
+Cada fila de calendar.csv es un listing en un día. Con `listing_id` como
+metaField y `date` como timeField, MongoDB agrupa los días de cada listing
+en buckets comprimidos, y las consultas por listing y rango de fechas solo
+leen los buckets cuyo intervalo [min, max] se solapa con el rango pedido.
+"""
+
+import logging
+from datetime import date, datetime, time
+from typing import Any, Dict, List, Optional, Union
+
+import pandas as pd
+from pymongo.collection import Collection
+from pymongo.database import Database
+
+from .database import get_collection
+from .cleaning import dataframe_to_documents
+from .config import CALENDAR_COLLECTION_NAME
+
+logger = logging.getLogger(__name__)
+
+# Columnas de calendar.csv de Inside Airbnb
+CALENDAR_COLUMNS = ['listing_id', 'date', 'available', 'price', 'adjusted_price',
+                    'minimum_nights', 'maximum_nights']
+
+CALENDAR_TIME_FIELD = 'date'
+CALENDAR_META_FIELD = 'listing_id'
+
+# Datos diarios: con 'hours' cada bucket cubre hasta 30 días de un listing
+CALENDAR_GRANULARITY = 'hours'
+
+
+def ensure_calendar_collection(
+    db: Database,
+    collection_name: str = CALENDAR_COLLECTION_NAME
+) -> Collection:
+    """
+    Crea la colección time-series del calendario si no existe
+
+    Args:
+        db: Base de datos MongoDB
+        collection_name: Nombre de la colección
+
+    Returns:
+        Collection: Colección del calendario
+    """
+    if collection_name in db.list_collection_names():
+        collection = db[collection_name]
+        if 'timeseries' not in collection.options():
+            logger.warning(
+                f"⚠️ '{collection_name}' existe pero no es time-series; "
+                f"elimínala para recrearla con buckets")
+        return collection
+
+    collection = db.create_collection(
+        collection_name,
+        timeseries={
+            'timeField': CALENDAR_TIME_FIELD,
+            'metaField': CALENDAR_META_FIELD,
+            'granularity': CALENDAR_GRANULARITY,
+        }
+    )
+    # Índice secundario sobre meta + tiempo para las consultas por rango
+    collection.create_index([(CALENDAR_META_FIELD, 1), (CALENDAR_TIME_FIELD, 1)])
+    logger.info(f"✅ Colección time-series '{collection_name}' creada")
+    return collection
+
+
+def _parse_price(series: pd.Series) -> pd.Series:
+    """Convierte precios '$1,234.00' a float"""
+    cleaned = series.astype('string').str.replace(r'[$,]', '', regex=True)
+    return pd.to_numeric(cleaned, errors='coerce')
+
+
+def clean_calendar_chunk(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Limpia un chunk de calendar.csv con operaciones vectorizadas
+
+    - listing_id como entero y date como fecha (se descartan filas inválidas)
+    - available 't'/'f' a booleano
+    - price/adjusted_price numéricos (se omite adjusted_price si viene vacío)
+    - minimum_nights/maximum_nights como enteros
+
+    Args:
+        df: Chunk crudo de calendar.csv
+
+    Returns:
+        pd.DataFrame: Chunk limpio
+    """
+    df = df[[col for col in CALENDAR_COLUMNS if col in df.columns]].copy()
+
+    df['listing_id'] = pd.to_numeric(df['listing_id'], errors='coerce')
+    df['date'] = pd.to_datetime(df['date'], format='%Y-%m-%d', errors='coerce')
+    df = df.dropna(subset=['listing_id', 'date'])
+    df['listing_id'] = df['listing_id'].astype('int64')
+
+    if 'available' in df.columns:
+        df['available'] = df['available'].map({'t': True, 'f': False})
+
+    for col in ('price', 'adjusted_price'):
+        if col in df.columns:
+            df[col] = _parse_price(df[col]).astype('float64')
+    if 'adjusted_price' in df.columns and df['adjusted_price'].isna().all():
+        df = df.drop(columns='adjusted_price')
+
+    for col in ('minimum_nights', 'maximum_nights'):
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors='coerce').astype('Int32')
+
+    return df
+
+
+def calendar_documents(df: pd.DataFrame) -> List[Dict[str, Any]]:
+    """
+    Convierte un chunk limpio en documentos de medida time-series
+
+    Los campos nulos se omiten en lugar de guardarse como null: en una
+    colección de millones de filas cada campo ahorrado cuenta.
+
+    Args:
+        df: Chunk limpio (clean_calendar_chunk)
+
+    Returns:
+        List[Dict]: Documentos para insertar
+    """
+    return [
+        {key: value for key, value in doc.items() if value is not None}
+        for doc in dataframe_to_documents(df)
+    ]
+
+
+def _as_datetime(value: Union[date, datetime, str], end_of_day: bool = False) -> datetime:
+    """Normaliza fechas (date, datetime o 'YYYY-MM-DD') a datetime"""
+    if isinstance(value, str):
+        value = datetime.strptime(value, '%Y-%m-%d')
+    if not isinstance(value, datetime):
+        value = datetime.combine(value, time.max if end_of_day else time.min)
+    return value
+
+
+class CalendarCRUD:
+    """
+    Consultas sobre la colección time-series del calendario
+    """
+
+    def __init__(self, collection_name: str = CALENDAR_COLLECTION_NAME):
+        """
+        Inicializa la clase con la colección especificada
+
+        Args:
+            collection_name: Nombre de la colección
+        """
+        self.collection: Collection = get_collection(collection_name)
+        self.collection_name = collection_name
+        logger.info(f"Calendar operations initialized for collection: {collection_name}")
+
+    @staticmethod
+    def _range_filter(
+        listing_id: int,
+        start: Union[date, datetime, str],
+        end: Union[date, datetime, str]
+    ) -> Dict[str, Any]:
+        """Filtro por metaField y rango de fechas (ambos extremos incluidos)"""
+        return {
+            CALENDAR_META_FIELD: int(listing_id),
+            CALENDAR_TIME_FIELD: {
+                '$gte': _as_datetime(start),
+                '$lte': _as_datetime(end, end_of_day=True)
+            }
+        }
+
+    def get_availability(
+        self,
+        listing_id: int,
+        start: Union[date, datetime, str],
+        end: Union[date, datetime, str]
+    ) -> List[Dict[str, Any]]:
+        """
+        Obtiene la disponibilidad diaria de un listing en un rango de fechas
+
+        Args:
+            listing_id: ID del listing (el 'id' de Inside Airbnb)
+            start: Fecha inicial (incluida)
+            end: Fecha final (incluida)
+
+        Returns:
+            List[Dict]: Días ordenados con 'date' y 'available'
+        """
+        try:
+            cursor = self.collection.find(
+                self._range_filter(listing_id, start, end),
+                {'_id': 0, 'date': 1, 'available': 1}
+            ).sort('date', 1)
+
+            results = list(cursor)
+            logger.info(f"✅ {len(results)} días de calendario para {listing_id}")
+            return results
+
+        except Exception as e:
+            logger.error(f"❌ Error al obtener disponibilidad: {e}")
+            raise
+
+    def get_price_series(
+        self,
+        listing_id: int,
+        start: Union[date, datetime, str],
+        end: Union[date, datetime, str]
+    ) -> pd.DataFrame:
+        """
+        Obtiene la serie de precios diarios de un listing
+
+        Args:
+            listing_id: ID del listing
+            start: Fecha inicial (incluida)
+            end: Fecha final (incluida)
+
+        Returns:
+            pd.DataFrame: Columnas date, price y available indexadas por fecha
+        """
+        try:
+            cursor = self.collection.find(
+                self._range_filter(listing_id, start, end),
+                {'_id': 0, 'date': 1, 'price': 1, 'available': 1}
+            ).sort('date', 1)
+
+            df = pd.DataFrame(list(cursor), columns=['date', 'price', 'available'])
+            return df.set_index('date')
+
+        except Exception as e:
+            logger.error(f"❌ Error al obtener serie de precios: {e}")
+            raise
+
+    def get_availability_summary(
+        self,
+        listing_id: int,
+        start: Union[date, datetime, str],
+        end: Union[date, datetime, str]
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Resume disponibilidad y precio de un listing en un rango de fechas
+
+        Args:
+            listing_id: ID del listing
+            start: Fecha inicial (incluida)
+            end: Fecha final (incluida)
+
+        Returns:
+            Dict o None: Días, días disponibles, tasa de ocupación y
+                precio medio/mínimo/máximo (None si no hay datos)
+        """
+        pipeline = [
+            {'$match': self._range_filter(listing_id, start, end)},
+            {
+                '$group': {
+                    '_id': f'${CALENDAR_META_FIELD}',
+                    'days': {'$sum': 1},
+                    'available_days': {'$sum': {'$cond': ['$available', 1, 0]}},
+                    'avg_price': {'$avg': '$price'},
+                    'min_price': {'$min': '$price'},
+                    'max_price': {'$max': '$price'},
+                    'first_date': {'$min': '$date'},
+                    'last_date': {'$max': '$date'}
+                }
+            },
+            {
+                '$project': {
+                    '_id': 0,
+                    'listing_id': '$_id',
+                    'days': 1,
+                    'available_days': 1,
+                    'occupancy_rate': {
+                        '$round': [{'$subtract': [1, {'$divide': ['$available_days', '$days']}]}, 4]
+                    },
+                    'avg_price': {'$round': ['$avg_price', 2]},
+                    'min_price': 1,
+                    'max_price': 1,
+                    'first_date': 1,
+                    'last_date': 1
+                }
+            }
+        ]
+
+        try:
+            results = list(self.collection.aggregate(pipeline))
+            return results[0] if results else None
+
+        except Exception as e:
+            logger.error(f"❌ Error en resumen de disponibilidad: {e}")
+            raise
+
+    def get_bucket_stats(self) -> Dict[str, Any]:
+        """
+        Obtiene estadísticas de los buckets time-series de la colección
+
+        Returns:
+            Dict: Sección 'timeseries' de collStats (vacío si no disponible)
+        """
+        try:
+            stats = self.collection.database.command('collStats', self.collection_name)
+            return stats.get('timeseries', {})
+        except Exception as e:
+            logger.warning(f"⚠️ No se pudieron obtener estadísticas de buckets: {e}")
+            return {}
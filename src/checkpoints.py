@@ -0,0 +1,211 @@
+"""
+Checkpoints por lote para reanudar importaciones interrumpidas
+"""
+
+import hashlib
+import logging
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Union
+
+from pymongo.collection import Collection
+
+logger = logging.getLogger(__name__)
+
+STATE_COLLECTION = 'import_state'
+
+# Bytes del inicio y del final del archivo que entran en la huella
+FINGERPRINT_SAMPLE_BYTES = 1024 * 1024
+
+
+def file_fingerprint(path: Union[str, Path]) -> str:
+    """
+    Calcula una huella barata del archivo de origen
+
+    Combina tamaño, fecha de modificación y un hash del primer y último MB,
+    sin leer el archivo completo.
+
+    Args:
+        path: Ruta del archivo
+
+    Returns:
+        str: Huella hexadecimal
+    """
+    path = Path(path)
+    stat = path.stat()
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"{stat.st_size}:{stat.st_mtime_ns}".encode())
+
+    with open(path, 'rb') as f:
+        digest.update(f.read(FINGERPRINT_SAMPLE_BYTES))
+        if stat.st_size > FINGERPRINT_SAMPLE_BYTES:
+            f.seek(max(stat.st_size - FINGERPRINT_SAMPLE_BYTES, FINGERPRINT_SAMPLE_BYTES))
+            digest.update(f.read())
+
+    return digest.hexdigest()
+
+
+class ImportCheckpoint:
+    """
+    Registra en una colección de estado la última fila de origen confirmada
+
+    El offset se expresa en filas del CSV de origen (antes de la limpieza),
+    de modo que una nueva ejecución puede saltarlas al leer. Solo se reanuda
+    si la huella del archivo coincide con la registrada.
+
+    `begin` registra además las filas del chunk que se empieza a escribir:
+    al reanudar, `interrupted_rows` indica exactamente qué filas pudieron
+    quedar escritas a medias, aunque los chunks nuevos tengan otro tamaño.
+    """
+
+    def __init__(
+        self,
+        state: Collection,
+        source_path: Union[str, Path],
+        collection_name: str
+    ):
+        """
+        Inicializa el checkpoint
+
+        Args:
+            state: Colección donde se guarda el estado de las importaciones
+            source_path: Ruta del archivo de origen
+            collection_name: Colección de destino de la importación
+        """
+        self.state = state
+        self.source_path = Path(source_path)
+        self.collection_name = collection_name
+        self.key = f"{collection_name}:{self.source_path.resolve()}"
+        self.fingerprint = file_fingerprint(self.source_path)
+        self.rows_committed = 0
+        self.documents = 0
+        # Chunk en curso al cortarse la ejecución anterior (None si no consta)
+        self.interrupted_rows: Optional[int] = None
+        self.interrupted_since: Optional[datetime] = None
+
+    def load(self) -> int:
+        """
+        Busca un checkpoint reanudable para este archivo y colección
+
+        Returns:
+            int: Filas de origen ya confirmadas (0 si no hay que reanudar)
+        """
+        record = self.state.find_one({'_id': self.key})
+        if record is None or record.get('status') != 'running':
+            return 0
+
+        if record.get('fingerprint') != self.fingerprint:
+            logger.warning(
+                "⚠️ El archivo de origen cambió desde el último checkpoint; "
+                "se importará desde el principio")
+            return 0
+
+        self.rows_committed = record.get('rows_committed', 0)
+        self.documents = record.get('documents', 0)
+        if record.get('rows_pending') is not None:
+            self.interrupted_rows = max(record['rows_pending'] - self.rows_committed, 0)
+            self.interrupted_since = record.get('pending_since')
+        return self.rows_committed
+
+    def start(self) -> None:
+        """Registra el inicio (o la reanudación) de la importación"""
+        self.state.update_one(
+            {'_id': self.key},
+            {'$set': {
+                'collection': self.collection_name,
+                'source': str(self.source_path),
+                'fingerprint': self.fingerprint,
+                'rows_committed': self.rows_committed,
+                'documents': self.documents,
+                'status': 'running',
+                'updated_at': datetime.now()
+            }},
+            upsert=True
+        )
+
+    def begin(self, rows_end: int) -> None:
+        """
+        Registra el chunk que se empieza a escribir
+
+        Args:
+            rows_end: Total de filas de origen consumidas al terminar el chunk
+        """
+        self.state.update_one(
+            {'_id': self.key},
+            {'$set': {
+                'rows_pending': rows_end,
+                'pending_since': datetime.now(),
+                'updated_at': datetime.now()
+            }}
+        )
+
+    def commit(self, rows_committed: int, documents: int = 0) -> None:
+        """
+        Confirma un lote ya escrito en MongoDB
+
+        Args:
+            rows_committed: Total de filas de origen consumidas hasta ahora
+            documents: Documentos escritos en este lote
+        """
+        self.rows_committed = rows_committed
+        self.documents += documents
+        self.state.update_one(
+            {'_id': self.key},
+            {'$set': {
+                'rows_committed': rows_committed,
+                'documents': self.documents,
+                'updated_at': datetime.now()
+            }}
+        )
+
+    def complete(self) -> None:
+        """Marca la importación como terminada"""
+        self.state.update_one(
+            {'_id': self.key},
+            {'$set': {'status': 'completed', 'updated_at': datetime.now()}}
+        )
+
+    def read_csv_kwargs(self) -> Dict[str, Any]:
+        """
+        Argumentos de pd.read_csv para saltar las filas ya confirmadas
+
+        Returns:
+            Dict: {'skiprows': ...} o vacío si se empieza desde el principio
+        """
+        if self.rows_committed <= 0:
+            return {}
+        # La fila 0 es la cabecera
+        return {'skiprows': range(1, self.rows_committed + 1)}
+
+
+def discard_partial_batch(
+    collection: Collection,
+    listing_ids: Iterable[Any],
+    key: str = 'id',
+    since: Optional[datetime] = None
+) -> int:
+    """
+    Elimina documentos de un lote que pudo quedar a medias antes del corte
+
+    Args:
+        collection: Colección de destino
+        listing_ids: Ids del primer lote tras el checkpoint
+        key: Campo con el id del listing
+        since: Si se indica, solo elimina documentos con imported_at
+            posterior (los de la ejecución interrumpida, no los que ya
+            había en la colección)
+
+    Returns:
+        int: Documentos eliminados
+    """
+    ids = [listing_id for listing_id in listing_ids if listing_id is not None]
+    if not ids:
+        return 0
+    query: Dict[str, Any] = {key: {'$in': ids}}
+    if since is not None:
+        query['imported_at'] = {'$gte': since}
+    result = collection.delete_many(query)
+    if result.deleted_count:
+        logger.info(f"🧹 {result.deleted_count} documentos del lote interrumpido eliminados")
+    return result.deleted_count
+
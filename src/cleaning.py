@@ -0,0 +1,462 @@
+"""
+Funciones de limpieza compartidas por los scripts de importación
+"""
+
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Columnas estándar de listings.csv de Inside Airbnb
+LISTING_COLUMNS = [
+    'id', 'listing_url', 'scrape_id', 'last_scraped',
+    'name', 'description', 'neighborhood_overview', 'picture_url',
+    'host_id', 'host_url', 'host_name', 'host_since', 'host_location',
+    'host_about', 'host_response_time', 'host_response_rate',
+    'host_acceptance_rate', 'host_is_superhost', 'host_thumbnail_url',
+    'host_picture_url', 'host_neighbourhood', 'host_listings_count',
+    'host_total_listings_count', 'host_verifications',
+    'host_has_profile_pic', 'host_identity_verified',
+    'neighbourhood', 'neighbourhood_cleansed', 'neighbourhood_group_cleansed',
+    'latitude', 'longitude', 'property_type', 'room_type',
+    'accommodates', 'bathrooms', 'bathrooms_text', 'bedrooms', 'beds',
+    'amenities', 'price', 'minimum_nights', 'maximum_nights',
+    'minimum_minimum_nights', 'maximum_minimum_nights',
+    'minimum_maximum_nights', 'maximum_maximum_nights',
+    'minimum_nights_avg_ntm', 'maximum_nights_avg_ntm',
+    'calendar_updated', 'has_availability', 'availability_30',
+    'availability_60', 'availability_90', 'availability_365',
+    'calendar_last_scraped', 'number_of_reviews', 'number_of_reviews_ltm',
+    'number_of_reviews_l30d', 'first_review', 'last_review',
+    'review_scores_rating', 'review_scores_accuracy',
+    'review_scores_cleanliness', 'review_scores_checkin',
+    'review_scores_communication', 'review_scores_location',
+    'review_scores_value', 'license', 'instant_bookable',
+    'calculated_host_listings_count', 'calculated_host_listings_count_entire_homes',
+    'calculated_host_listings_count_private_rooms',
+    'calculated_host_listings_count_shared_rooms',
+    'reviews_per_month'
+]
+
+# Campos que puede tener un documento de listings: columnas del CSV,
+# location (GeoJSON) y metadata de importación
+LISTING_DOCUMENT_FIELDS = LISTING_COLUMNS + [
+    'location', 'created_at', 'updated_at', 'imported_at', 'source'
+]
+
+# Columnas de fecha, booleanas ('t'/'f') y de porcentaje ('95%')
+DATE_COLUMNS = ['last_scraped', 'host_since', 'calendar_updated',
+                'first_review', 'last_review', 'calendar_last_scraped']
+BOOLEAN_COLUMNS = ['host_is_superhost', 'host_has_profile_pic',
+                   'host_identity_verified', 'has_availability', 'instant_bookable']
+PERCENTAGE_COLUMNS = ['host_response_rate', 'host_acceptance_rate']
+
+# Formato de las fechas de Inside Airbnb
+DATE_FORMAT = '%Y-%m-%d'
+
+# Valores por defecto para nulos comunes
+DEFAULT_FILLS = {'reviews_per_month': 0, 'name': 'Sin nombre', 'host_name': 'Sin nombre'}
+
+
+def add_location_column(
+    df: pd.DataFrame,
+    drop_invalid: bool = True,
+    lat_col: str = 'latitude',
+    lon_col: str = 'longitude'
+) -> pd.DataFrame:
+    """
+    Crea el campo GeoJSON 'location' a partir de latitud y longitud
+
+    Trabaja sobre los arrays completos de coordenadas: la validación
+    (nulos, no numéricos y fuera de rango) se hace en una sola pasada
+    vectorizada y solo la construcción final de los Point recorre filas.
+
+    Args:
+        df: DataFrame con columnas de latitud y longitud
+        drop_invalid: Si True, elimina las filas sin coordenadas válidas;
+            si False, las mantiene con location = None
+        lat_col: Nombre de la columna de latitud
+        lon_col: Nombre de la columna de longitud
+
+    Returns:
+        pd.DataFrame: DataFrame con la columna 'location'
+    """
+    if lat_col not in df.columns or lon_col not in df.columns:
+        return df
+
+    lat = pd.to_numeric(df[lat_col], errors='coerce').to_numpy(dtype='float64')
+    lon = pd.to_numeric(df[lon_col], errors='coerce').to_numpy(dtype='float64')
+
+    with np.errstate(invalid='ignore'):
+        valid = (
+            np.isfinite(lat) & np.isfinite(lon)
+            & (np.abs(lat) <= 90) & (np.abs(lon) <= 180)
+        )
+
+    removed = int(len(valid) - valid.sum())
+
+    if drop_invalid:
+        if removed > 0:
+            df = df.loc[valid].copy()
+            lat, lon = lat[valid], lon[valid]
+            logger.warning(
+                f"⚠️ Removidos {removed} registros sin coordenadas válidas")
+        locations = [
+            {"type": "Point", "coordinates": [x, y]}
+            for x, y in zip(lon.tolist(), lat.tolist())
+        ]
+    else:
+        locations = np.full(len(df), None, dtype=object)
+        locations[valid] = [
+            {"type": "Point", "coordinates": [x, y]}
+            for x, y in zip(lon[valid].tolist(), lat[valid].tolist())
+        ]
+
+    df['location'] = locations
+    return df
+
+
+def dataframe_to_documents(df: pd.DataFrame, sparse: bool = False) -> List[Dict[str, Any]]:
+    """
+    Convierte un DataFrame en documentos listos para MongoDB
+
+    Sustituye NaN, NaT, None e infinitos por None columna a columna (una
+    máscara vectorizada por columna, sin llamadas por celda) y construye
+    los documentos directamente desde los arrays resultantes, con tipos
+    nativos de Python que BSON puede codificar.
+
+    Args:
+        df: DataFrame limpio
+        sparse: Si True, los campos nulos se omiten en lugar de guardarse
+            como None (documentos dispersos; ver restore_missing_fields)
+
+    Returns:
+        List[Dict]: Documentos para insertar
+    """
+    names = [str(name) for name in df.columns]
+    arrays = []
+    masks = []
+
+    for position in range(df.shape[1]):
+        series = df.iloc[:, position]
+        values = series.to_numpy(dtype=object, copy=True)
+        missing = series.isna().to_numpy()
+
+        if pd.api.types.is_float_dtype(series.dtype):
+            missing = missing | np.isinf(series.to_numpy(dtype='float64', na_value=np.nan))
+
+        if missing.any():
+            values[missing] = None
+            masks.append((names[position], missing))
+        arrays.append(values)
+
+    documents = [dict(zip(names, row)) for row in zip(*arrays)]
+    if sparse:
+        # Solo se recorren las celdas nulas, no todos los campos
+        for name, missing in masks:
+            for row in np.flatnonzero(missing).tolist():
+                del documents[row][name]
+    return documents
+
+
+def drop_null_fields(documents: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Elimina los campos None de documentos ya construidos (modo disperso)
+
+    Args:
+        documents: Documentos a modificar en el sitio
+
+    Returns:
+        List[Dict]: Los mismos documentos
+    """
+    for doc in documents:
+        for key in [key for key, value in doc.items() if value is None]:
+            del doc[key]
+    return documents
+
+
+def _projected_fields(projection: Any) -> Optional[List[str]]:
+    """Campos incluidos por una proyección (None si es de exclusión o no hay)"""
+    if not projection:
+        return None
+    fields = [field for field in projection if field != '_id']
+    if isinstance(projection, dict) and not all(projection[field] for field in fields):
+        return None
+    return fields or None
+
+
+def restore_missing_fields(
+    documents: List[Dict[str, Any]],
+    projection: Any = None,
+    known_fields: Iterable[str] = ()
+) -> List[Dict[str, Any]]:
+    """
+    Restaura como NaN los campos omitidos en documentos dispersos
+
+    Los campos esperados son los de la proyección de inclusión o, sin ella,
+    `known_fields` más la unión de los campos de los documentos leídos
+    (menos los excluidos por la proyección).
+
+    Args:
+        documents: Documentos leídos (se modifican en el sitio)
+        projection: Proyección de la consulta (dict o lista de campos)
+        known_fields: Campos que puede tener cualquier documento (p. ej.
+            LISTING_DOCUMENT_FIELDS), con los nombres lógicos
+
+    Returns:
+        List[Dict]: Los mismos documentos
+    """
+    fields = _projected_fields(projection)
+    if fields is None:
+        fields = dict.fromkeys([*known_fields, *(key for doc in documents for key in doc)])
+        if isinstance(projection, dict):
+            for field, value in projection.items():
+                if not value:
+                    fields.pop(field, None)
+    for doc in documents:
+        for field in fields:
+            doc.setdefault(field, np.nan)
+    return documents
+
+
+def documents_to_dataframe(
+    documents: Iterable[Dict[str, Any]],
+    projection: Any = None
+) -> pd.DataFrame:
+    """
+    Construye un DataFrame a partir de documentos (dispersos o no)
+
+    pandas ya rellena con NaN los campos que faltan en algunas filas; aquí
+    se añaden además las columnas proyectadas que no aparecen en ninguna.
+
+    Args:
+        documents: Documentos leídos
+        projection: Proyección de la consulta (dict o lista de campos)
+
+    Returns:
+        pd.DataFrame: Una columna por campo, NaN donde falta
+    """
+    df = pd.DataFrame(list(documents))
+    fields = _projected_fields(projection)
+    if fields:
+        missing = [field for field in fields if field not in df.columns]
+        if missing:
+            df = df.reindex(columns=[*df.columns, *missing])
+    return df
+
+
+# ===== KERNELS DE LIMPIEZA =====
+
+def _factorize(series: pd.Series) -> Tuple[np.ndarray, pd.Series]:
+    """Códigos y valores únicos (sin nulos) de una columna"""
+    codes, uniques = pd.factorize(series)
+    return codes, pd.Series(np.asarray(uniques, dtype=object))
+
+
+def _strip_to_float(text: pd.Series, chars: str) -> np.ndarray:
+    """Quita `chars` de cada cadena y la convierte a float (inválidos -> NaN)"""
+    text = text.astype(str)
+    for char in chars:
+        text = text.str.replace(char, '', regex=False)
+    try:
+        # astype usa el parser de C y es varias veces más rápido que to_numeric
+        return text.to_numpy(dtype=object).astype('float64')
+    except ValueError:
+        return pd.to_numeric(text, errors='coerce').to_numpy(dtype='float64')
+
+
+def clean_numeric_text(
+    series: pd.Series,
+    strip: str = '$,',
+    scale: float = 1.0,
+    fill_value: Optional[float] = None
+) -> pd.Series:
+    """
+    Convierte texto como '$1,234.00' o '95%' a float
+
+    El trabajo de cadenas se hace solo sobre los valores únicos (precios y
+    porcentajes se repiten mucho) y se expande con los códigos de factorize.
+
+    Args:
+        series: Columna a convertir
+        strip: Caracteres a eliminar antes de convertir
+        scale: Divisor aplicado al resultado (100 para porcentajes)
+        fill_value: Valor para los nulos e inválidos (None = NaN)
+
+    Returns:
+        pd.Series: Columna float64
+    """
+    if pd.api.types.is_numeric_dtype(series.dtype) and not pd.api.types.is_bool_dtype(series.dtype):
+        values = series.to_numpy(dtype='float64', na_value=np.nan)
+    else:
+        codes, uniques = _factorize(series)
+        # El código -1 (nulo) toma el último elemento: NaN
+        values = np.append(_strip_to_float(uniques, strip), np.nan)[codes]
+
+    if scale != 1.0:
+        values = values / scale
+    if fill_value is not None:
+        values = np.where(np.isnan(values), fill_value, values)
+    return pd.Series(values, index=series.index, name=series.name)
+
+
+def clean_price(series: pd.Series, fill_value: Optional[float] = None) -> pd.Series:
+    """Convierte precios '$1,234.00' a float"""
+    return clean_numeric_text(series, '$,', fill_value=fill_value)
+
+
+def clean_percentage(series: pd.Series) -> pd.Series:
+    """Convierte porcentajes '95%' a fracción (0.95)"""
+    return clean_numeric_text(series, '%', scale=100.0)
+
+
+def clean_boolean(series: pd.Series) -> pd.Series:
+    """
+    Convierte 't'/'f' a booleano nullable (otros valores -> nulo)
+
+    Args:
+        series: Columna a convertir
+
+    Returns:
+        pd.Series: Columna de dtype 'boolean'
+    """
+    codes, uniques = _factorize(series)
+    mapping = {'t': True, 'f': False, True: True, False: False}
+    values = pd.array([mapping.get(value) for value in uniques] + [None], dtype='boolean')
+    return pd.Series(values[codes], index=series.index, name=series.name)
+
+
+def clean_date(series: pd.Series, date_format: str = DATE_FORMAT) -> pd.Series:
+    """
+    Convierte fechas con formato fijo y caché de valores repetidos
+
+    Si ningún valor cumple el formato (un CSV propio con otro formato de
+    fecha) se vuelve a la inferencia de pandas sobre toda la columna.
+
+    Args:
+        series: Columna a convertir
+        date_format: Formato esperado
+
+    Returns:
+        pd.Series: Columna datetime64 (inválidos -> NaT)
+    """
+    if pd.api.types.is_datetime64_any_dtype(series.dtype):
+        return series
+
+    parsed = pd.to_datetime(series, format=date_format, errors='coerce', cache=True)
+    if parsed.isna().all() and series.notna().any():
+        parsed = pd.to_datetime(series, errors='coerce')
+    return parsed
+
+
+def fill_missing(series: pd.Series, value: Any) -> pd.Series:
+    """Rellena los nulos de una columna"""
+    return series.fillna(value)
+
+
+class CleaningPlan:
+    """
+    Plan de limpieza compilado: qué kernel aplica a cada columna
+
+    El plan se resuelve una vez por cabecera (y se reutiliza en cada chunk
+    de la misma cabecera). Al aplicarlo, cada columna se lee una sola vez:
+    conversión y relleno de nulos van en el mismo paso y todas las columnas
+    nuevas se asignan juntas.
+    """
+
+    def __init__(
+        self,
+        select: Optional[Sequence[str]] = None,
+        price_fill: Optional[float] = None,
+        dates: Iterable[str] = DATE_COLUMNS,
+        booleans: Iterable[str] = BOOLEAN_COLUMNS,
+        percentages: Iterable[str] = PERCENTAGE_COLUMNS,
+        fills: Optional[Dict[str, Any]] = None,
+        location: bool = True
+    ):
+        """
+        Define el plan
+
+        Args:
+            select: Columnas a conservar, en orden (None = todas)
+            price_fill: Valor para precios nulos o inválidos (None = NaN)
+            dates: Columnas de fecha
+            booleans: Columnas 't'/'f'
+            percentages: Columnas de porcentaje
+            fills: Valores para nulos por columna
+            location: Si True, crea 'location' y descarta coordenadas inválidas
+        """
+        self.select = list(select) if select is not None else None
+        self.price_fill = price_fill
+        self.dates = list(dates)
+        self.booleans = list(booleans)
+        self.percentages = list(percentages)
+        self.fills = dict(fills or {})
+        self.location = location
+        self._compiled: Dict[Tuple[str, ...], Tuple[List[str], List[tuple]]] = {}
+
+    def compile(self, columns: Iterable[str]) -> Tuple[List[str], List[tuple]]:
+        """
+        Resuelve el plan para una cabecera concreta
+
+        Args:
+            columns: Columnas del DataFrame
+
+        Returns:
+            Tuple: (columnas seleccionadas, pasos (columna, kernel, kwargs))
+        """
+        key = tuple(columns)
+        if key in self._compiled:
+            return self._compiled[key]
+
+        present = set(key)
+        selected = [col for col in self.select if col in present] if self.select else list(key)
+        available = set(selected)
+
+        steps = []
+        if 'price' in available:
+            steps.append(('price', clean_price, {'fill_value': self.price_fill}))
+        steps += [(col, clean_date, {}) for col in self.dates if col in available]
+        steps += [(col, clean_boolean, {}) for col in self.booleans if col in available]
+        steps += [(col, clean_percentage, {}) for col in self.percentages if col in available]
+
+        converted = {step[0] for step in steps}
+        steps += [(col, fill_missing, {'value': value}) for col, value in self.fills.items()
+                  if col in available and col not in converted]
+
+        self._compiled[key] = (selected, steps)
+        return selected, steps
+
+    def describe(self, columns: Iterable[str]) -> str:
+        """Resumen legible del plan para una cabecera"""
+        selected, steps = self.compile(columns)
+        counts: Dict[str, int] = {}
+        for _, kernel, _ in steps:
+            counts[kernel.__name__] = counts.get(kernel.__name__, 0) + 1
+        detail = ', '.join(f"{name}×{count}" for name, count in counts.items())
+        return f"{len(selected)} columnas, {len(steps)} pasos ({detail or 'sin conversiones'})"
+
+    def apply(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Ejecuta el plan sobre un DataFrame
+
+        Args:
+            df: DataFrame crudo
+
+        Returns:
+            pd.DataFrame: DataFrame limpio
+        """
+        selected, steps = self.compile(df.columns)
+        converted = {col: kernel(df[col], **kwargs) for col, kernel, kwargs in steps}
+
+        if selected != list(df.columns):
+            df = df[selected]
+        df = df.assign(**converted)
+
+        if self.location and 'latitude' in df.columns and 'longitude' in df.columns:
+            # Filtra en la misma pasada los registros sin coordenadas válidas
+            df = add_location_column(df)
+        return df
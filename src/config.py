@@ -13,6 +13,9 @@ load_dotenv(dotenv_path=env_path)
 MONGODB_URI = os.getenv('MONGODB_URI', 'mongodb://localhost:27018/')
 MONGODB_DB = os.getenv('MONGODB_DB', 'airbnb_madrid')
 COLLECTION_NAME = os.getenv('COLLECTION_NAME', 'listings')
+CALENDAR_COLLECTION_NAME = os.getenv('CALENDAR_COLLECTION_NAME', 'calendar')
+AVAILABILITY_COLLECTION_NAME = os.getenv('AVAILABILITY_COLLECTION_NAME', 'availability')
+REVIEWS_COLLECTION_NAME = os.getenv('REVIEWS_COLLECTION_NAME', 'reviews')
 
 # Application Settings
 APP_ENV = os.getenv('APP_ENV', 'development')
@@ -20,7 +23,43 @@ LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
 
 # Data Settings
 DATA_PATH = os.getenv('DATA_PATH', './data/raw')
+RAW_DATA_DIR = Path(os.getenv('RAW_DATA_DIR', Path(__file__).parent.parent / 'data' / 'raw'))
+AIRBNB_DATA_URL = os.getenv(
+    'AIRBNB_DATA_URL',
+    'https://data.insideairbnb.com/spain/comunidad-de-madrid/madrid/2024-09-12/data/listings.csv.gz'
+)
+# Raíz del snapshot (…/madrid/2024-09-12): de ella cuelgan el resto de artefactos
+AIRBNB_SNAPSHOT_URL = os.getenv('AIRBNB_SNAPSHOT_URL', AIRBNB_DATA_URL.rsplit('/data/', 1)[0])
+# Artefacto -> (ruta relativa al snapshot, archivo local en RAW_DATA_DIR)
+AIRBNB_ARTIFACTS = {
+    'listings': ('data/listings.csv.gz', 'madrid_listings.csv.gz'),
+    'calendar': ('data/calendar.csv.gz', 'madrid_calendar.csv.gz'),
+    'reviews': ('data/reviews.csv.gz', 'madrid_reviews.csv.gz'),
+    'neighbourhoods': ('visualisations/neighbourhoods.geojson', 'madrid_neighbourhoods.geojson'),
+}
+DOWNLOAD_WORKERS = int(os.getenv('DOWNLOAD_WORKERS', '4'))
 SAMPLE_SIZE = int(os.getenv('SAMPLE_SIZE', '0'))
+SAMPLE_SEED = int(os.getenv('SAMPLE_SEED', '42'))
+# Columna para muestreo estratificado (vacío = muestreo simple)
+SAMPLE_STRATIFY = os.getenv('SAMPLE_STRATIFY') or None
+
+# Import Settings
+IMPORT_BATCH_SIZE = int(os.getenv('IMPORT_BATCH_SIZE', '1000'))
+IMPORT_WORKERS = int(os.getenv('IMPORT_WORKERS', '0'))  # 0 = inserción secuencial
+# Carga masiva: elimina los índices secundarios durante la importación
+IMPORT_BULK_LOAD = os.getenv('IMPORT_BULK_LOAD', 'false').lower() in ('1', 'true', 'yes')
+# Pre-codificar a BSON en hilos y cortar los lotes al tamaño máximo de mensaje
+IMPORT_PRE_ENCODE = os.getenv('IMPORT_PRE_ENCODE', 'false').lower() in ('1', 'true', 'yes')
+# Lotes adaptativos por bytes y latencia, con reintentos y bisección de lotes fallidos
+IMPORT_ADAPTIVE = os.getenv('IMPORT_ADAPTIVE', 'false').lower() in ('1', 'true', 'yes')
+# Usar el id de Inside Airbnb como _id (búsquedas por id = lectura puntual)
+LISTING_ID_AS_KEY = os.getenv('LISTING_ID_AS_KEY', 'false').lower() in ('1', 'true', 'yes')
+# Crear la colección de listings como clustered por _id (MongoDB >= 5.3)
+CLUSTERED_LISTINGS = os.getenv('CLUSTERED_LISTINGS', 'false').lower() in ('1', 'true', 'yes')
+# Documentos dispersos: los campos nulos se omiten al escribir y se restauran como NaN al leer
+SPARSE_DOCUMENTS = os.getenv('SPARSE_DOCUMENTS', 'false').lower() in ('1', 'true', 'yes')
+# Claves compactas en los documentos de listings (src/field_codec.py)
+COMPACT_FIELDS = os.getenv('COMPACT_FIELDS', 'false').lower() in ('1', 'true', 'yes')
 
 # Visualization Settings
 COLOR_PALETTE = {
@@ -3,32 +3,76 @@ Operaciones CRUD para la colección de Airbnb Madrid
 """
 
 import logging
-from typing import List, Dict, Any, Optional
+from numbers import Integral
+from typing import List, Dict, Any, Optional, Union
 from datetime import datetime
 from pymongo.collection import Collection
 from pymongo.results import InsertOneResult, InsertManyResult, UpdateResult, DeleteResult
 from bson import ObjectId
 
 from .database import get_collection
-from .config import COLLECTION_NAME
+from .cleaning import LISTING_DOCUMENT_FIELDS, drop_null_fields, restore_missing_fields
+from .config import COLLECTION_NAME, COMPACT_FIELDS, LISTING_ID_AS_KEY, SPARSE_DOCUMENTS
+from .field_codec import FieldCodec, get_codec
 
 logger = logging.getLogger(__name__)
 
+# Campo con el id de Inside Airbnb
+LISTING_KEY = 'id'
+
+
+def assign_listing_ids(documents: List[Dict[str, Any]], key: str = LISTING_KEY) -> int:
+    """
+    Usa el id de Inside Airbnb como _id de cada documento
+    
+    Los documentos sin id (o que ya traen _id) se dejan como están y
+    recibirán un ObjectId al insertarse.
+    
+    Args:
+        documents: Documentos a insertar
+        key: Campo con el id del listing
+        
+    Returns:
+        int: Documentos con _id asignado
+    """
+    assigned = 0
+    for doc in documents:
+        listing_id = doc.get(key)
+        if listing_id is not None and '_id' not in doc:
+            doc['_id'] = listing_id
+            assigned += 1
+    return assigned
+
 
 class AirbnbCRUD:
     """
     Clase para realizar operaciones CRUD en la colección de Airbnb
     """
     
-    def __init__(self, collection_name: str = COLLECTION_NAME):
+    def __init__(
+        self,
+        collection_name: str = COLLECTION_NAME,
+        id_as_key: bool = LISTING_ID_AS_KEY,
+        sparse: bool = SPARSE_DOCUMENTS,
+        codec: Optional[FieldCodec] = get_codec(COMPACT_FIELDS)
+    ):
         """
         Inicializa la clase con la colección especificada
         
         Args:
             collection_name: Nombre de la colección
+            id_as_key: Si True, el id de Inside Airbnb se guarda como _id
+            sparse: Si True, los campos nulos se omiten al escribir y los
+                campos ausentes se restauran como NaN al leer
+            codec: Codec de claves compactas (None = nombres lógicos); los
+                filtros, proyecciones y pipelines se siguen escribiendo con
+                los nombres lógicos
         """
         self.collection: Collection = get_collection(collection_name)
         self.collection_name = collection_name
+        self.id_as_key = id_as_key
+        self.sparse = sparse
+        self.codec = codec
         logger.info(f"CRUD operations initialized for collection: {collection_name}")
     
     # ===== CREATE OPERATIONS =====
@@ -47,8 +91,17 @@ class AirbnbCRUD:
             # Agregar timestamp de creación
             listing_data['created_at'] = datetime.now()
             listing_data['updated_at'] = datetime.now()
-            
-            result = self.collection.insert_one(listing_data)
+            if self.id_as_key:
+                assign_listing_ids([listing_data])
+            if self.sparse:
+                drop_null_fields([listing_data])
+            
+            if self.codec is not None:
+                document = self.codec.encode_document(listing_data)
+                result = self.collection.insert_one(document)
+                listing_data['_id'] = document['_id']
+            else:
+                result = self.collection.insert_one(listing_data)
             logger.info(f"✅ Listing creado con ID: {result.inserted_id}")
             return result
             
@@ -72,8 +125,18 @@ class AirbnbCRUD:
             for listing in listings_data:
                 listing['created_at'] = now
                 listing['updated_at'] = now
-            
-            result = self.collection.insert_many(listings_data)
+            if self.id_as_key:
+                assign_listing_ids(listings_data)
+            if self.sparse:
+                drop_null_fields(listings_data)
+            
+            if self.codec is not None:
+                documents = self.codec.encode_documents(listings_data)
+                result = self.collection.insert_many(documents)
+                for listing, document in zip(listings_data, documents):
+                    listing['_id'] = document['_id']
+            else:
+                result = self.collection.insert_many(listings_data)
             logger.info(f"✅ {len(result.inserted_ids)} listings creados")
             return result
             
@@ -83,22 +146,48 @@ class AirbnbCRUD:
     
     # ===== READ OPERATIONS =====
     
-    def find_listing_by_id(self, listing_id: str) -> Optional[Dict[str, Any]]:
+    def _id_filter(self, listing_id: Union[str, int, ObjectId]) -> Dict[str, Any]:
+        """
+        Filtro para un listing dado por ObjectId o por id de Inside Airbnb
+        
+        Un ObjectId (o su forma hexadecimal de 24 caracteres) busca por _id;
+        un entero (o una cadena de dígitos) es el id de Inside Airbnb, que con
+        id_as_key es el propio _id (lectura puntual) y si no el campo 'id'.
+        
+        Args:
+            listing_id: ObjectId, string hexadecimal, entero o string de dígitos
+            
+        Returns:
+            Dict: Filtro MongoDB
+        """
+        if isinstance(listing_id, str):
+            if ObjectId.is_valid(listing_id):
+                return {"_id": ObjectId(listing_id)}
+            if listing_id.strip().isdigit():
+                listing_id = int(listing_id)
+            else:
+                raise ValueError(f"ID de listing no válido: {listing_id}")
+        
+        if isinstance(listing_id, Integral) and not isinstance(listing_id, bool):
+            return {"_id" if self.id_as_key else LISTING_KEY: int(listing_id)}
+        return {"_id": listing_id}
+    
+    def find_listing_by_id(self, listing_id: Union[str, int, ObjectId]) -> Optional[Dict[str, Any]]:
         """
         Busca un listing por su ID
         
         Args:
-            listing_id: ID del listing (puede ser ObjectId o string)
+            listing_id: ObjectId (o string) o id de Inside Airbnb (entero o string)
             
         Returns:
             Dict o None: Documento encontrado o None
         """
         try:
-            # Convertir a ObjectId si es string
-            if isinstance(listing_id, str):
-                listing_id = ObjectId(listing_id)
-            
-            result = self.collection.find_one({"_id": listing_id})
+            result = self.collection.find_one(self._id_filter(listing_id))
+            if result and self.codec is not None:
+                result = self.codec.decode_document(result)
+            if result and self.sparse:
+                restore_missing_fields([result], known_fields=LISTING_DOCUMENT_FIELDS)
             
             if result:
                 logger.info(f"✅ Listing encontrado: {listing_id}")
@@ -131,15 +220,22 @@ class AirbnbCRUD:
             List[Dict]: Lista de documentos encontrados
         """
         try:
-            cursor = self.collection.find(filter_query, projection)
+            codec = self.codec
+            if codec is not None:
+                cursor = self.collection.find(
+                    codec.encode_filter(filter_query), codec.encode_projection(projection))
+            else:
+                cursor = self.collection.find(filter_query, projection)
             
             if sort:
-                cursor = cursor.sort(sort)
+                cursor = cursor.sort(codec.encode_sort(sort) if codec is not None else sort)
             
             if limit > 0:
                 cursor = cursor.limit(limit)
             
-            results = list(cursor)
+            results = codec.decode_documents(cursor) if codec is not None else list(cursor)
+            if self.sparse:
+                restore_missing_fields(results, projection, LISTING_DOCUMENT_FIELDS)
             logger.info(f"✅ {len(results)} listings encontrados")
             return results
             
@@ -231,30 +327,29 @@ class AirbnbCRUD:
     
     def update_listing(
         self,
-        listing_id: str,
+        listing_id: Union[str, int, ObjectId],
         update_data: Dict[str, Any]
     ) -> UpdateResult:
         """
         Actualiza un listing por su ID
         
         Args:
-            listing_id: ID del listing
+            listing_id: ObjectId (o string) o id de Inside Airbnb
             update_data: Datos a actualizar
             
         Returns:
             UpdateResult: Resultado de la actualización
         """
         try:
-            # Convertir a ObjectId si es string
-            if isinstance(listing_id, str):
-                listing_id = ObjectId(listing_id)
-            
             # Agregar timestamp de actualización
             update_data['updated_at'] = datetime.now()
+            update = {"$set": update_data}
+            if self.codec is not None:
+                update = self.codec.encode_update(update)
             
             result = self.collection.update_one(
-                {"_id": listing_id},
-                {"$set": update_data}
+                self._id_filter(listing_id),
+                update
             )
             
             if result.modified_count > 0:
@@ -285,10 +380,14 @@ class AirbnbCRUD:
         """
         try:
             update_data['updated_at'] = datetime.now()
+            update = {"$set": update_data}
+            if self.codec is not None:
+                filter_query = self.codec.encode_filter(filter_query)
+                update = self.codec.encode_update(update)
             
             result = self.collection.update_many(
                 filter_query,
-                {"$set": update_data}
+                update
             )
             
             logger.info(f"✅ {result.modified_count} listings actualizados")
@@ -300,7 +399,7 @@ class AirbnbCRUD:
     
     def increment_field(
         self,
-        listing_id: str,
+        listing_id: Union[str, int, ObjectId],
         field: str,
         increment: int = 1
     ) -> UpdateResult:
@@ -308,7 +407,7 @@ class AirbnbCRUD:
         Incrementa un campo numérico de un listing
         
         Args:
-            listing_id: ID del listing
+            listing_id: ObjectId (o string) o id de Inside Airbnb
             field: Nombre del campo a incrementar
             increment: Valor a incrementar (puede ser negativo)
             
@@ -316,12 +415,10 @@ class AirbnbCRUD:
             UpdateResult: Resultado de la actualización
         """
         try:
-            if isinstance(listing_id, str):
-                listing_id = ObjectId(listing_id)
-            
+            stored_field = self.codec.encode_path(field) if self.codec is not None else field
             result = self.collection.update_one(
-                {"_id": listing_id},
-                {"$inc": {field: increment}}
+                self._id_filter(listing_id),
+                {"$inc": {stored_field: increment}}
             )
             
             logger.info(f"✅ Campo {field} incrementado en {increment}")
@@ -333,21 +430,18 @@ class AirbnbCRUD:
     
     # ===== DELETE OPERATIONS =====
     
-    def delete_listing(self, listing_id: str) -> DeleteResult:
+    def delete_listing(self, listing_id: Union[str, int, ObjectId]) -> DeleteResult:
         """
         Elimina un listing por su ID
         
         Args:
-            listing_id: ID del listing a eliminar
+            listing_id: ObjectId (o string) o id de Inside Airbnb a eliminar
             
         Returns:
             DeleteResult: Resultado de la eliminación
         """
         try:
-            if isinstance(listing_id, str):
-                listing_id = ObjectId(listing_id)
-            
-            result = self.collection.delete_one({"_id": listing_id})
+            result = self.collection.delete_one(self._id_filter(listing_id))
             
             if result.deleted_count > 0:
                 logger.info(f"✅ Listing eliminado: {listing_id}")
@@ -371,6 +465,8 @@ class AirbnbCRUD:
             DeleteResult: Resultado de la eliminación
         """
         try:
+            if self.codec is not None:
+                filter_query = self.codec.encode_filter(filter_query)
             result = self.collection.delete_many(filter_query)
             logger.info(f"✅ {result.deleted_count} listings eliminados")
             return result
@@ -402,7 +498,11 @@ class AirbnbCRUD:
             List[Dict]: Resultados de la agregación
         """
         try:
-            results = list(self.collection.aggregate(pipeline))
+            if self.codec is not None:
+                pipeline, keys = self.codec.encode_aggregate(pipeline)
+                results = self.codec.decode_documents(self.collection.aggregate(pipeline), keys)
+            else:
+                results = list(self.collection.aggregate(pipeline))
             logger.info(f"✅ Agregación completada: {len(results)} resultados")
             return results
             
@@ -461,6 +561,8 @@ class AirbnbCRUD:
         Returns:
             int: Número de documentos
         """
+        if self.codec is not None:
+            filter_query = self.codec.encode_filter(filter_query)
         return self.collection.count_documents(filter_query)
     
     def get_total_listings(self) -> int:
@@ -482,6 +584,8 @@ class AirbnbCRUD:
         Returns:
             List: Valores únicos
         """
+        if self.codec is not None:
+            field = self.codec.encode_path(field)
         return self.collection.distinct(field)
 
 
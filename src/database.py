@@ -2,8 +2,10 @@
 Módulo de conexión y gestión de MongoDB
 """
 
+import time
 import logging
-from typing import Optional
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
 from pymongo import MongoClient
 from pymongo.database import Database
 from pymongo.collection import Collection
@@ -113,49 +115,84 @@ class MongoDBConnection:
         db = self.get_database(db_name)
         return db.list_collection_names()
     
-    def create_indexes(self, collection_name: str = COLLECTION_NAME) -> None:
+    def create_indexes(self, collection_name: str = COLLECTION_NAME) -> Dict[str, float]:
         """
         Crea índices optimizados para las consultas más comunes
         
         Args:
             collection_name: Nombre de la colección
+            
+        Returns:
+            Dict[str, float]: Segundos de construcción por índice
         """
         collection = self.get_collection(collection_name)
+        timings = {}
         
         logger.info(f"Creando índices para {collection_name}...")
         
         # Índice simple para precio
-        collection.create_index("price")
-        logger.info("✅ Índice creado: price")
+        timings['price'] = _timed_create_index(collection, "price")
+        logger.info(f"✅ Índice creado: price ({timings['price']:.2f}s)")
         
         # Índice simple para barrio
-        collection.create_index("neighbourhood")
-        logger.info("✅ Índice creado: neighbourhood")
+        timings['neighbourhood'] = _timed_create_index(collection, "neighbourhood")
+        logger.info(f"✅ Índice creado: neighbourhood ({timings['neighbourhood']:.2f}s)")
         
         # Índice simple para tipo de habitación
-        collection.create_index("room_type")
-        logger.info("✅ Índice creado: room_type")
+        timings['room_type'] = _timed_create_index(collection, "room_type")
+        logger.info(f"✅ Índice creado: room_type ({timings['room_type']:.2f}s)")
         
         # Índice compuesto para consultas por barrio y precio
-        collection.create_index([("neighbourhood", 1), ("price", 1)])
-        logger.info("✅ Índice compuesto creado: neighbourhood + price")
+        timings['neighbourhood_price'] = _timed_create_index(
+            collection, [("neighbourhood", 1), ("price", 1)])
+        logger.info(
+            f"✅ Índice compuesto creado: neighbourhood + price "
+            f"({timings['neighbourhood_price']:.2f}s)")
         
         # Índice geoespacial (si existen coordenadas)
         try:
-            collection.create_index([("location", "2dsphere")])
-            logger.info("✅ Índice geoespacial creado: location")
+            timings['location'] = _timed_create_index(collection, [("location", "2dsphere")])
+            logger.info(f"✅ Índice geoespacial creado: location ({timings['location']:.2f}s)")
         except Exception as e:
             logger.warning(f"⚠️ No se pudo crear índice geoespacial: {e}")
         
         # Índice de texto para búsqueda en nombre y descripción
         try:
-            collection.create_index([
+            timings['text'] = _timed_create_index(collection, [
                 ("name", "text"),
                 ("description", "text")
             ])
-            logger.info("✅ Índice de texto creado: name + description")
+            logger.info(f"✅ Índice de texto creado: name + description ({timings['text']:.2f}s)")
         except Exception as e:
             logger.warning(f"⚠️ No se pudo crear índice de texto: {e}")
+        
+        return timings
+    
+    def ensure_clustered(self, collection_name: str = COLLECTION_NAME) -> bool:
+        """
+        Garantiza que la colección sea clustered por _id (ver ensure_clustered_collection)
+        
+        Args:
+            collection_name: Nombre de la colección
+            
+        Returns:
+            bool: True si la colección queda clustered
+        """
+        return ensure_clustered_collection(self.get_database(), collection_name)
+    
+    @contextmanager
+    def deferred_indexes(self, collection_name: str = COLLECTION_NAME) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Modo carga masiva: elimina los índices secundarios y los reconstruye al salir
+        
+        Args:
+            collection_name: Nombre de la colección
+            
+        Yields:
+            List[Dict]: Especificaciones de los índices eliminados
+        """
+        with deferred_indexes(self.get_collection(collection_name)) as specs:
+            yield specs
     
     def get_collection_stats(self, collection_name: str = COLLECTION_NAME) -> dict:
         """
@@ -179,6 +216,26 @@ class MongoDBConnection:
             "indexSize": stats.get("totalIndexSize", 0)
         }
     
+    def get_cache_stats(self, collection_name: str = COLLECTION_NAME) -> dict:
+        """
+        Obtiene los contadores de caché de WiredTiger de la colección
+        
+        Args:
+            collection_name: Nombre de la colección
+            
+        Returns:
+            dict: Bytes en caché y páginas/bytes leídos y solicitados
+        """
+        db = self.get_database()
+        cache = db.command("collStats", collection_name).get("wiredTiger", {}).get("cache", {})
+        
+        return {
+            "bytes_in_cache": cache.get("bytes currently in the cache", 0),
+            "bytes_read": cache.get("bytes read into cache", 0),
+            "pages_read": cache.get("pages read into cache", 0),
+            "pages_requested": cache.get("pages requested from the cache", 0)
+        }
+    
     def ping(self) -> bool:
         """
         Verifica si la conexión está activa
@@ -209,6 +266,151 @@ class MongoDBConnection:
         self.close()
 
 
+def _timed_create_index(collection: Collection, keys, **options) -> float:
+    """Crea un índice y retorna los segundos que tardó"""
+    start = time.perf_counter()
+    collection.create_index(keys, **options)
+    return time.perf_counter() - start
+
+
+def snapshot_indexes(collection: Collection) -> List[Dict[str, Any]]:
+    """
+    Retorna las especificaciones de los índices secundarios de una colección
+    
+    Args:
+        collection: Colección MongoDB
+        
+    Returns:
+        List[Dict]: Especificaciones (list_indexes) salvo el índice _id
+    """
+    return [dict(spec) for spec in collection.list_indexes() if spec['name'] != '_id_']
+
+
+def _index_keys(spec: Dict[str, Any]) -> List[tuple]:
+    """Reconstruye las claves de creación a partir de una especificación"""
+    keys = []
+    for field, direction in spec['key'].items():
+        if field == '_fts':
+            # Los índices de texto se describen internamente con _fts/_ftsx
+            keys.extend((name, 'text') for name in spec.get('weights', {}))
+        elif field != '_ftsx':
+            keys.append((field, direction))
+    return keys
+
+
+def rebuild_indexes(
+    collection: Collection,
+    specs: List[Dict[str, Any]]
+) -> Dict[str, float]:
+    """
+    Vuelve a crear índices a partir de sus especificaciones
+    
+    Args:
+        collection: Colección MongoDB
+        specs: Especificaciones obtenidas con snapshot_indexes
+        
+    Returns:
+        Dict[str, float]: Segundos de construcción por índice
+    """
+    timings = {}
+    for spec in specs:
+        options = {k: v for k, v in spec.items() if k not in ('v', 'key', 'ns')}
+        try:
+            timings[spec['name']] = _timed_create_index(
+                collection, _index_keys(spec), **options)
+            logger.info(f"✅ Índice reconstruido: {spec['name']} ({timings[spec['name']]:.2f}s)")
+        except Exception as e:
+            logger.warning(f"⚠️ No se pudo reconstruir el índice {spec['name']}: {e}")
+    
+    if timings:
+        logger.info(f"📑 Índices reconstruidos en {sum(timings.values()):.2f}s")
+    return timings
+
+
+@contextmanager
+def deferred_indexes(collection: Collection) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Elimina los índices secundarios durante una carga masiva y los reconstruye
+    
+    Los índices se reconstruyen aunque la carga falle, para no dejar la
+    colección sin índices.
+    
+    Args:
+        collection: Colección MongoDB
+        
+    Yields:
+        List[Dict]: Especificaciones de los índices eliminados
+    """
+    specs = snapshot_indexes(collection)
+    for spec in specs:
+        collection.drop_index(spec['name'])
+    logger.info(f"⏸️ Carga masiva: {len(specs)} índices secundarios eliminados")
+    
+    try:
+        yield specs
+    finally:
+        rebuild_indexes(collection, specs)
+
+
+def collection_options(database: Database, collection_name: str) -> Optional[Dict[str, Any]]:
+    """
+    Opciones de creación de una colección (validator, clusteredIndex...)
+    
+    Args:
+        database: Base de datos MongoDB
+        collection_name: Nombre de la colección
+        
+    Returns:
+        Dict o None: Opciones de la colección, None si no existe
+    """
+    for info in database.list_collections(filter={'name': collection_name}):
+        return dict(info.get('options', {}))
+    return None
+
+
+def ensure_clustered_collection(database: Database, collection_name: str) -> bool:
+    """
+    Crea la colección clustered por _id o convierte una existente vacía
+    
+    En una colección clustered los documentos se guardan ordenados por _id
+    y no existe un índice _id aparte: con el id del listing como _id, la
+    búsqueda por id es una lectura puntual sobre la propia tabla. Una
+    colección solo puede hacerse clustered al crearla, así que una existente
+    y vacía se vuelve a crear conservando su validador e índices; si tiene
+    datos se deja como está.
+    
+    Args:
+        database: Base de datos MongoDB
+        collection_name: Nombre de la colección
+        
+    Returns:
+        bool: True si la colección queda clustered
+    """
+    options = collection_options(database, collection_name)
+    if options is not None and 'clusteredIndex' in options:
+        return True
+    
+    clustered = {'clusteredIndex': {'key': {'_id': 1}, 'unique': True}}
+    specs: List[Dict[str, Any]] = []
+    if options is not None:
+        collection = database[collection_name]
+        if collection.estimated_document_count() > 0:
+            logger.warning(
+                f"⚠️ '{collection_name}' tiene datos y no es clustered; "
+                f"vacíala para recrearla clustered")
+            return False
+        specs = snapshot_indexes(collection)
+        database.drop_collection(collection_name)
+        # Se conservan validator, validationLevel, validationAction...
+        clustered = {**options, **clustered}
+    
+    database.create_collection(collection_name, **clustered)
+    logger.info(f"🗂️ Colección '{collection_name}' creada clustered por _id")
+    if specs:
+        rebuild_indexes(database[collection_name], specs)
+    return True
+
+
 # Función helper para obtener una conexión rápidamente
 def get_connection() -> MongoDBConnection:
     """
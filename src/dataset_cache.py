@@ -0,0 +1,347 @@
+"""
+Caché local de datasets con descargas condicionales y reanudables
+"""
+
+import os
+import json
+import hashlib
+import logging
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Union
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+CACHE_INDEX_NAME = '.dataset_cache.json'
+
+DEFAULT_CHUNK_BYTES = 64 * 1024
+
+PART_SUFFIX = '.part'
+
+
+@dataclass
+class FetchResult:
+    """Resultado de DatasetCache.fetch"""
+    path: Path
+    status: str  # 'not_modified', 'downloaded' o 'resumed'
+    sha256: str
+    size: int
+    bytes_transferred: int
+    changed: bool  # False si el contenido coincide con la versión en caché
+    elapsed: float = 0.0  # Segundos de la descarga (incluidos reintentos)
+
+
+@dataclass
+class Artifact:
+    """Archivo de un snapshot de Inside Airbnb a descargar"""
+    name: str
+    url: str
+    destination: Path
+    expected_sha256: Optional[str] = None
+
+
+def _sha256_file(path: Path, chunk_bytes: int = 1024 * 1024) -> 'hashlib._Hash':
+    """Retorna un objeto sha256 alimentado con el contenido de un archivo"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(chunk_bytes), b''):
+            digest.update(block)
+    return digest
+
+
+class DatasetCache:
+    """
+    Caché de descargas indexada por URL
+
+    Para cada URL guarda ETag, Last-Modified, tamaño y sha256 del archivo
+    descargado. Las descargas siguientes envían peticiones condicionales
+    (If-None-Match / If-Modified-Since) y un 304 evita transferir el archivo.
+    Las transferencias interrumpidas quedan en un `.part` que se reanuda con
+    Range/If-Range; el sha256 se calcula mientras llegan los bytes.
+    """
+
+    def __init__(
+        self,
+        directory: Union[str, Path],
+        session: Optional[requests.Session] = None,
+        timeout: float = 30,
+        chunk_bytes: int = DEFAULT_CHUNK_BYTES
+    ):
+        """
+        Inicializa la caché
+
+        Args:
+            directory: Directorio donde se guarda el índice de la caché
+            session: Sesión de requests opcional (por defecto, una por hilo)
+            timeout: Timeout de conexión/lectura en segundos
+            chunk_bytes: Tamaño de cada bloque de la respuesta
+        """
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.index_path = self.directory / CACHE_INDEX_NAME
+        self._session = session
+        self._local = threading.local()
+        self.timeout = timeout
+        self.chunk_bytes = chunk_bytes
+        self._lock = threading.Lock()
+        self._index = self._load_index()
+
+    @property
+    def session(self) -> requests.Session:
+        """Sesión HTTP (una por hilo si no se indicó ninguna)"""
+        if self._session is not None:
+            return self._session
+        if not hasattr(self._local, 'session'):
+            self._local.session = requests.Session()
+        return self._local.session
+
+    # ===== ÍNDICE =====
+
+    def _load_index(self) -> Dict[str, Dict[str, Any]]:
+        """Carga el índice de la caché (vacío si no existe o está dañado)"""
+        if not self.index_path.exists():
+            return {}
+        try:
+            return json.loads(self.index_path.read_text())
+        except (OSError, ValueError) as e:
+            logger.warning(f"⚠️ Índice de caché ilegible, se ignora: {e}")
+            return {}
+
+    def _update_entry(self, url: str, **fields) -> None:
+        """Actualiza la entrada de una URL y guarda el índice de forma atómica"""
+        with self._lock:
+            entry = self._index.setdefault(url, {})
+            entry.update(fields)
+            entry = {k: v for k, v in entry.items() if v is not None}
+            self._index[url] = entry
+            tmp = self.index_path.with_suffix('.tmp')
+            tmp.write_text(json.dumps(self._index, indent=2, sort_keys=True))
+            os.replace(tmp, self.index_path)
+
+    def entry(self, url: str) -> Dict[str, Any]:
+        """Retorna la entrada de la caché para una URL (vacía si no existe)"""
+        with self._lock:
+            return dict(self._index.get(url, {}))
+
+    # ===== DESCARGA =====
+
+    def fetch(
+        self,
+        url: str,
+        destination: Union[str, Path],
+        expected_sha256: Optional[str] = None,
+        force: bool = False,
+        verify: bool = False,
+        progress: Optional[Callable[[int], Any]] = None
+    ) -> FetchResult:
+        """
+        Descarga una URL solo si cambió desde la última vez
+
+        Args:
+            url: URL del archivo
+            destination: Ruta final del archivo
+            expected_sha256: Hash esperado (opcional); si no coincide se lanza
+                ValueError y el archivo no reemplaza al anterior
+            force: Si True, ignora los validadores y descarga siempre
+            verify: Si True, recalcula el sha256 del archivo en caché
+                antes de aceptarlo
+            progress: Callback opcional que recibe los bytes de cada bloque
+
+        Returns:
+            FetchResult: Ruta, estado y hash del archivo
+        """
+        destination = Path(destination)
+        entry = self.entry(url)
+        started = time.perf_counter()
+
+        cached = (not force and destination.exists()
+                  and entry.get('path') == str(destination)
+                  and entry.get('size') == destination.stat().st_size)
+        if cached and verify and _sha256_file(destination).hexdigest() != entry.get('sha256'):
+            logger.warning(f"⚠️ {destination.name} no coincide con el hash en caché")
+            cached = False
+
+        # Sin compresión de transporte: los offsets de Range son bytes del archivo
+        headers = {'Accept-Encoding': 'identity'}
+        if cached:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+
+        part = destination.with_name(destination.name + PART_SUFFIX)
+        offset = part.stat().st_size if part.exists() else 0
+        validator = entry.get('partial_validator')
+        if offset and validator:
+            headers['Range'] = f"bytes={offset}-"
+            headers['If-Range'] = validator
+        elif offset:
+            # Sin validador no se puede garantizar que el parcial sea del mismo archivo
+            part.unlink()
+            offset = 0
+
+        with self.session.get(url, headers=headers, stream=True, timeout=self.timeout) as response:
+            if response.status_code == 304:
+                logger.info(f"⏭️ {destination.name} sin cambios (304), no se descarga")
+                self._update_entry(url, checked_at=datetime.now().isoformat())
+                return FetchResult(destination, 'not_modified', entry['sha256'],
+                                   entry['size'], 0, False, time.perf_counter() - started)
+
+            if response.status_code == 416 and 'Range' in headers:
+                # El rango ya no es válido: se descarta el parcial y se reintenta
+                # una vez con un GET completo (sin parcial no se envía Range y
+                # un segundo 416 llega a raise_for_status)
+                part.unlink(missing_ok=True)
+                self._update_entry(url, partial_validator=None)
+                return self.fetch(url, destination, expected_sha256, force, verify, progress)
+
+            response.raise_for_status()
+            resumed = response.status_code == 206 and offset > 0
+            if not resumed:
+                offset = 0
+
+            etag = response.headers.get('ETag')
+            last_modified = response.headers.get('Last-Modified')
+            self._update_entry(url, partial_validator=etag or last_modified)
+
+            expected_size = self._expected_size(response, offset)
+            digest = _sha256_file(part) if resumed else hashlib.sha256()
+            if resumed:
+                logger.info(f"⏯️ Reanudando {destination.name} desde {offset / 1024 / 1024:,.1f} MB")
+
+            transferred = 0
+            with open(part, 'ab' if resumed else 'wb') as f:
+                for chunk in response.iter_content(chunk_size=self.chunk_bytes):
+                    if not chunk:
+                        continue
+                    f.write(chunk)
+                    digest.update(chunk)
+                    transferred += len(chunk)
+                    if progress is not None:
+                        progress(len(chunk))
+
+        size = offset + transferred
+        if expected_size is not None and size != expected_size:
+            raise IOError(
+                f"Descarga incompleta de {url}: {size:,} de {expected_size:,} bytes "
+                f"(se reanudará en el próximo intento)")
+
+        sha256 = digest.hexdigest()
+        if expected_sha256 and sha256 != expected_sha256.lower():
+            part.unlink(missing_ok=True)
+            self._update_entry(url, partial_validator=None)
+            raise ValueError(f"Checksum incorrecto para {url}: {sha256} != {expected_sha256}")
+
+        os.replace(part, destination)
+        changed = sha256 != entry.get('sha256')
+        self._update_entry(
+            url,
+            path=str(destination),
+            etag=etag,
+            last_modified=last_modified,
+            sha256=sha256,
+            size=size,
+            fetched_at=datetime.now().isoformat(),
+            checked_at=datetime.now().isoformat(),
+            partial_validator=None
+        )
+
+        status = 'resumed' if resumed else 'downloaded'
+        if not changed:
+            logger.info(f"♻️ {destination.name} descargado pero idéntico a la versión en caché")
+        return FetchResult(destination, status, sha256, size, transferred, changed,
+                           time.perf_counter() - started)
+
+    @staticmethod
+    def _expected_size(response: requests.Response, offset: int) -> Optional[int]:
+        """Tamaño total esperado a partir de Content-Range o Content-Length"""
+        content_range = response.headers.get('Content-Range')
+        if content_range and '/' in content_range:
+            total = content_range.rsplit('/', 1)[1]
+            if total.isdigit():
+                return int(total)
+        # Con Content-Encoding, Content-Length no corresponde a los bytes escritos
+        length = response.headers.get('Content-Length')
+        if length and length.isdigit() and not response.headers.get('Content-Encoding'):
+            return offset + int(length)
+        return None
+
+
+def fetch_artifacts(
+    cache: DatasetCache,
+    artifacts: List[Artifact],
+    max_workers: int = 4,
+    retries: int = 3,
+    backoff: float = 1.0,
+    force: bool = False,
+    verify: bool = False,
+    progress: Optional[Callable[[int], Any]] = None
+) -> Dict[str, Union[FetchResult, Exception]]:
+    """
+    Descarga varios artefactos en paralelo con un pool de hilos acotado
+
+    Cada artefacto se reintenta con backoff exponencial ante errores de red;
+    como los parciales quedan en `.part`, cada reintento reanuda la
+    transferencia. El archivo final se publica con un rename atómico, así
+    que el tiempo total se acerca al del archivo más grande.
+
+    Args:
+        cache: Caché de datasets
+        artifacts: Artefactos a descargar
+        max_workers: Descargas simultáneas
+        retries: Reintentos por artefacto tras el primer intento
+        backoff: Espera inicial entre reintentos en segundos (se duplica)
+        force: Si True, ignora los validadores y descarga siempre
+        verify: Si True, recalcula el sha256 de los archivos en caché
+        progress: Callback opcional (thread-safe) con los bytes de cada bloque
+
+    Returns:
+        Dict: Nombre -> FetchResult, o la excepción si agotó los reintentos
+    """
+    lock = threading.Lock()
+
+    def report(size):
+        if progress is not None:
+            with lock:
+                progress(size)
+
+    def fetch_one(artifact):
+        started = time.perf_counter()
+        for attempt in range(retries + 1):
+            try:
+                result = cache.fetch(
+                    artifact.url, artifact.destination, artifact.expected_sha256,
+                    force=force, verify=verify, progress=report)
+                result.elapsed = time.perf_counter() - started
+                return result
+            except (requests.exceptions.RequestException, OSError) as e:
+                response = getattr(e, 'response', None)
+                permanent = (response is not None and response.status_code < 500
+                             and response.status_code != 429)
+                if attempt == retries or permanent:
+                    raise
+                delay = backoff * 2 ** attempt
+                logger.warning(
+                    f"⚠️ {artifact.name}: {e} (reintento {attempt + 1}/{retries} "
+                    f"en {delay:.1f}s)")
+                time.sleep(delay)
+
+    results: Dict[str, Union[FetchResult, Exception]] = {}
+    with ThreadPoolExecutor(max_workers=max(max_workers, 1),
+                            thread_name_prefix='artifact-fetch') as pool:
+        futures = {pool.submit(fetch_one, artifact): artifact for artifact in artifacts}
+        for future in as_completed(futures):
+            artifact = futures[future]
+            try:
+                results[artifact.name] = future.result()
+            except Exception as e:
+                logger.error(f"❌ {artifact.name}: {e}")
+                results[artifact.name] = e
+
+    return results
@@ -0,0 +1,194 @@
+"""
+Importación incremental (delta) por id de Inside Airbnb con hash de contenido
+"""
+
+import hashlib
+import logging
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+import bson
+from pymongo import UpdateOne
+from pymongo.collection import Collection
+
+from .validation import OPTIONAL_FIELDS
+
+logger = logging.getLogger(__name__)
+
+HASH_FIELD = 'content_hash'
+REMOVED_FIELD = 'removed_at'
+
+# Campos que cambian en cada snapshot o importación sin que cambie el listing
+VOLATILE_FIELDS = {
+    '_id', 'imported_at', 'created_at', 'updated_at', 'source',
+    HASH_FIELD, REMOVED_FIELD,
+    'scrape_id', 'last_scraped', 'calendar_last_scraped',
+}
+
+
+def content_hash(doc: Dict[str, Any]) -> str:
+    """
+    Calcula el hash del contenido de un listing
+
+    Se codifica en BSON con las claves ordenadas, excluyendo los campos
+    volátiles, para que el hash sea estable entre snapshots.
+
+    Args:
+        doc: Documento del listing
+
+    Returns:
+        str: Hash hexadecimal de 128 bits
+    """
+    payload = {key: doc[key] for key in sorted(doc) if key not in VOLATILE_FIELDS}
+    return hashlib.blake2b(bson.encode(payload), digest_size=16).hexdigest()
+
+
+class DeltaImporter:
+    """
+    Aplica una snapshot como delta sobre la colección existente
+
+    Solo escribe (upsert vía bulk_write) los listings nuevos o cuyo hash ha
+    cambiado; al terminar, elimina o marca con `removed_at` los listings que
+    ya no aparecen. `apply` puede llamarse una vez por chunk.
+
+    listing_documents omite los campos opcionales nulos, así que un campo
+    que pasa a nulo no llega en el documento: los campos de
+    `tracked_fields` ausentes se eliminan con $unset en la actualización.
+    """
+
+    def __init__(
+        self,
+        collection: Collection,
+        key: str = 'id',
+        removed: str = 'flag',
+        batch_size: int = 1000,
+        tracked_fields: Iterable[str] = OPTIONAL_FIELDS
+    ):
+        """
+        Inicializa el importador incremental
+
+        Args:
+            collection: Colección MongoDB de destino
+            key: Campo con el id estable del listing ('_id' si el id de
+                Inside Airbnb se guarda como _id)
+            removed: 'flag' (marca removed_at) o 'delete' para los desaparecidos
+            batch_size: Operaciones por bulk_write
+            tracked_fields: Campos que se eliminan del listing existente si
+                no vienen en el documento nuevo
+        """
+        if removed not in ('flag', 'delete'):
+            raise ValueError(f"Modo de eliminación no válido: {removed}")
+
+        self.collection = collection
+        self.key = key
+        self.removed = removed
+        self.batch_size = batch_size
+        self.tracked_fields = list(tracked_fields)
+
+        self.counts = {'inserted': 0, 'updated': 0, 'unchanged': 0,
+                       'removed': 0, 'skipped': 0}
+        self._seen = set()
+
+        if key != '_id':
+            self.collection.create_index(key)
+        self._existing = self._load_existing()
+        logger.info(f"🔎 Delta: {len(self._existing):,} listings existentes")
+
+    def _load_existing(self) -> Dict[Any, tuple]:
+        """Carga {id: (hash, eliminado)} de los listings existentes"""
+        projection = {'_id': 0, self.key: 1, HASH_FIELD: 1, REMOVED_FIELD: 1}
+        existing = {}
+        for doc in self.collection.find({self.key: {'$exists': True}}, projection):
+            existing[doc[self.key]] = (doc.get(HASH_FIELD), REMOVED_FIELD in doc)
+        return existing
+
+    def apply(self, documents: Iterable[Dict[str, Any]]) -> Dict[str, int]:
+        """
+        Compara los documentos con la colección y escribe solo los cambios
+
+        Args:
+            documents: Documentos de la nueva snapshot
+
+        Returns:
+            Dict: Conteos acumulados (ver `counts`)
+        """
+        now = datetime.now()
+        operations: List[UpdateOne] = []
+
+        for doc in documents:
+            listing_id = doc.get(self.key)
+            if listing_id is None or listing_id in self._seen:
+                self.counts['skipped'] += 1
+                continue
+            self._seen.add(listing_id)
+
+            digest = content_hash(doc)
+            previous = self._existing.get(listing_id)
+            if previous is not None and previous == (digest, False):
+                self.counts['unchanged'] += 1
+                continue
+
+            self.counts['inserted' if previous is None else 'updated'] += 1
+            fields = {k: v for k, v in doc.items() if k != '_id'}
+            fields[HASH_FIELD] = digest
+            fields['updated_at'] = now
+
+            update = {'$set': fields, '$setOnInsert': {'created_at': now}}
+            if previous is not None:
+                unset = {field: '' for field in self.tracked_fields if field not in doc}
+                if previous[1]:
+                    unset[REMOVED_FIELD] = ''
+                if unset:
+                    update['$unset'] = unset
+            operations.append(UpdateOne({self.key: listing_id}, update, upsert=True))
+
+            if len(operations) >= self.batch_size:
+                self.collection.bulk_write(operations, ordered=False)
+                operations = []
+
+        if operations:
+            self.collection.bulk_write(operations, ordered=False)
+
+        return self.counts
+
+    def finish(self) -> Dict[str, int]:
+        """
+        Elimina o marca los listings que no aparecen en la snapshot
+
+        Returns:
+            Dict: Conteos finales inserted/updated/unchanged/removed/skipped
+        """
+        missing = [
+            listing_id for listing_id, (_, removed) in self._existing.items()
+            if listing_id not in self._seen and not removed
+        ]
+
+        now = datetime.now()
+        for i in range(0, len(missing), self.batch_size):
+            batch_filter = {self.key: {'$in': missing[i:i+self.batch_size]}}
+            if self.removed == 'delete':
+                self.collection.delete_many(batch_filter)
+            else:
+                self.collection.update_many(
+                    batch_filter, {'$set': {REMOVED_FIELD: now, 'updated_at': now}})
+
+        self.counts['removed'] = len(missing)
+        return self.counts
+
+    def log_summary(self, elapsed: Optional[float] = None) -> None:
+        """Registra el resumen del delta"""
+        counts = self.counts
+        total = counts['inserted'] + counts['updated'] + counts['unchanged']
+        changed = counts['inserted'] + counts['updated']
+        logger.info("🔁 RESUMEN DEL DELTA:")
+        logger.info(f"  - Nuevos: {counts['inserted']:,}")
+        logger.info(f"  - Actualizados: {counts['updated']:,}")
+        logger.info(f"  - Sin cambios: {counts['unchanged']:,}")
+        action = 'eliminados' if self.removed == 'delete' else 'marcados como removed_at'
+        logger.info(f"  - Desaparecidos ({action}): {counts['removed']:,}")
+        if counts['skipped']:
+            logger.warning(f"  - Omitidos (sin '{self.key}' o duplicados): {counts['skipped']:,}")
+        if total:
+            logger.info(f"  - Fracción escrita: {changed / total * 100:.1f}%")
+        if elapsed is not None:
+            logger.info(f"  - Tiempo: {elapsed:.1f}s")
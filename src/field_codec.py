@@ -0,0 +1,492 @@
+"""
+Nombres de campo compactos para los documentos de listings
+
+BSON repite el nombre de cada campo en cada documento: con --keep-all un
+listing guarda ~75 claves como 'calculated_host_listings_count_private_rooms'
+que ocupan más que sus valores. FieldCodec traduce los nombres lógicos a
+claves cortas al escribir y de vuelta al leer, y traduce también filtros,
+proyecciones, ordenaciones, actualizaciones y pipelines de agregación, así
+que el resto del código sigue usando los nombres lógicos.
+
+Los campos reservados no se traducen: los que valida el $jsonSchema de
+init-mongo.js, los de los índices de create_indexes y los que usan la
+importación incremental, los checkpoints y las reseñas.
+"""
+
+import logging
+from typing import AbstractSet, Any, Dict, FrozenSet, Iterable, List, Optional, Set, Tuple, Union
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Campos que se guardan siempre con su nombre lógico
+RESERVED_FIELDS = frozenset({
+    '_id', 'id',
+    # $jsonSchema de init-mongo.js e índices de create_indexes
+    'name', 'price', 'neighbourhood', 'room_type', 'latitude', 'longitude',
+    'availability_365', 'location', 'description',
+    # Metadata de importación, delta (content_hash/removed_at) y reseñas
+    'created_at', 'updated_at', 'imported_at', 'source',
+    'content_hash', 'removed_at', 'review_stats',
+})
+
+# Nombre lógico -> clave almacenada (no cambiar las claves de una colección con datos)
+LISTING_FIELD_CODES = {
+    'listing_url': 'lu',
+    'scrape_id': 'sid',
+    'last_scraped': 'ls',
+    'neighborhood_overview': 'no',
+    'picture_url': 'pu',
+    'host_id': 'hi',
+    'host_url': 'hu',
+    'host_name': 'hn',
+    'host_since': 'hs',
+    'host_location': 'hl',
+    'host_about': 'ha',
+    'host_response_time': 'hrt',
+    'host_response_rate': 'hrr',
+    'host_acceptance_rate': 'har',
+    'host_is_superhost': 'hsh',
+    'host_thumbnail_url': 'htu',
+    'host_picture_url': 'hpu',
+    'host_neighbourhood': 'hnb',
+    'host_listings_count': 'hlc',
+    'host_total_listings_count': 'htlc',
+    'host_verifications': 'hv',
+    'host_has_profile_pic': 'hpp',
+    'host_identity_verified': 'hiv',
+    'neighbourhood_cleansed': 'nc',
+    'neighbourhood_group_cleansed': 'ngc',
+    'property_type': 'pt',
+    'accommodates': 'acc',
+    'bathrooms': 'ba',
+    'bathrooms_text': 'bat',
+    'bedrooms': 'bd',
+    'beds': 'be',
+    'amenities': 'am',
+    'minimum_nights': 'mn',
+    'maximum_nights': 'xn',
+    'minimum_minimum_nights': 'mmn',
+    'maximum_minimum_nights': 'xmn',
+    'minimum_maximum_nights': 'mxn',
+    'maximum_maximum_nights': 'xxn',
+    'minimum_nights_avg_ntm': 'mna',
+    'maximum_nights_avg_ntm': 'xna',
+    'calendar_updated': 'cu',
+    'has_availability': 'hav',
+    'availability_30': 'a30',
+    'availability_60': 'a60',
+    'availability_90': 'a90',
+    'calendar_last_scraped': 'cls',
+    'number_of_reviews': 'nr',
+    'number_of_reviews_ltm': 'nrl',
+    'number_of_reviews_l30d': 'nr30',
+    'first_review': 'fr',
+    'last_review': 'lr',
+    'review_scores_rating': 'rsr',
+    'review_scores_accuracy': 'rsa',
+    'review_scores_cleanliness': 'rscl',
+    'review_scores_checkin': 'rsci',
+    'review_scores_communication': 'rsco',
+    'review_scores_location': 'rslo',
+    'review_scores_value': 'rsv',
+    'license': 'lic',
+    'instant_bookable': 'ib',
+    'calculated_host_listings_count': 'chl',
+    'calculated_host_listings_count_entire_homes': 'chle',
+    'calculated_host_listings_count_private_rooms': 'chlp',
+    'calculated_host_listings_count_shared_rooms': 'chls',
+    'reviews_per_month': 'rpm',
+}
+
+# Etapas cuyo contenido son campos -> expresiones
+_SHAPE_STAGES = ('$project', '$addFields', '$set')
+# Operadores lógicos de consulta con una lista de subconsultas
+_LOGICAL_OPERATORS = ('$and', '$or', '$nor')
+
+
+class FieldCodec:
+    """
+    Traduce nombres de campo lógicos a claves compactas y viceversa
+
+    Solo se traduce el primer segmento de cada ruta ('review_scores_rating',
+    no los campos de subdocumentos); los nombres sin código se guardan tal cual.
+    """
+
+    def __init__(self, mapping: Dict[str, str], reserved: Iterable[str] = RESERVED_FIELDS):
+        """
+        Inicializa el codec
+
+        Args:
+            mapping: Nombre lógico -> clave almacenada
+            reserved: Campos que no pueden traducirse
+
+        Raises:
+            ValueError: Si el mapeo no es biyectivo, traduce un campo
+                reservado o usa como clave un nombre lógico
+        """
+        reserved = frozenset(reserved)
+        codes = list(mapping.values())
+        if len(set(codes)) != len(codes):
+            raise ValueError("Claves compactas duplicadas en el mapeo")
+        clashes = (set(mapping) & reserved) | (set(codes) & (set(mapping) | reserved))
+        if clashes:
+            raise ValueError(f"Campos reservados o claves ambiguas en el mapeo: {sorted(clashes)}")
+        invalid = [code for code in codes if not code or code.startswith('$') or '.' in code]
+        if invalid:
+            raise ValueError(f"Claves compactas no válidas: {invalid}")
+
+        self.mapping = dict(mapping)
+        self.reverse = {code: field for field, code in mapping.items()}
+
+    # ===== CAMPOS Y DOCUMENTOS =====
+
+    def encode_field(self, field: str) -> str:
+        """Clave almacenada de un campo lógico"""
+        return self.mapping.get(field, field)
+
+    def decode_field(self, key: str) -> str:
+        """Campo lógico de una clave almacenada"""
+        return self.reverse.get(key, key)
+
+    def encode_path(self, path: str, fields: Optional[AbstractSet[str]] = None) -> str:
+        """
+        Traduce el primer segmento de una ruta con puntos
+
+        Args:
+            path: Ruta con nombres lógicos
+            fields: Claves almacenadas presentes en los documentos (por
+                defecto, todas); una ruta a un campo ausente no se traduce
+
+        Returns:
+            str: Ruta almacenada
+        """
+        head, dot, rest = path.partition('.')
+        code = self.mapping.get(head)
+        if code is None or (fields is not None and code not in fields):
+            return path
+        return code + dot + rest
+
+    def encode_frame(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Renombra las columnas de un DataFrame
+
+        Es la forma más barata de codificar antes de dataframe_to_documents:
+        no recorre los documentos.
+        """
+        return df.rename(columns=self.mapping)
+
+    def encode_document(self, doc: Dict[str, Any]) -> Dict[str, Any]:
+        """Documento con claves compactas"""
+        mapping = self.mapping
+        return {mapping.get(key, key): value for key, value in doc.items()}
+
+    def decode_document(
+        self,
+        doc: Dict[str, Any],
+        keys: Optional[AbstractSet[str]] = None
+    ) -> Dict[str, Any]:
+        """
+        Documento con nombres lógicos
+
+        Args:
+            doc: Documento con claves almacenadas
+            keys: Claves a traducir (por defecto, todas las del mapeo); los
+                resultados de aggregate() solo deben traducir las que
+                retorna encode_aggregate, no las claves calculadas
+
+        Returns:
+            Dict: Documento con nombres lógicos
+        """
+        reverse = self.reverse
+        if keys is None:
+            return {reverse.get(key, key): value for key, value in doc.items()}
+        return {(reverse[key] if key in keys else key): value for key, value in doc.items()}
+
+    def encode_documents(self, documents: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Lista de documentos con claves compactas"""
+        return [self.encode_document(doc) for doc in documents]
+
+    def decode_documents(
+        self,
+        documents: Iterable[Dict[str, Any]],
+        keys: Optional[AbstractSet[str]] = None
+    ) -> List[Dict[str, Any]]:
+        """Lista de documentos con nombres lógicos (ver decode_document)"""
+        return [self.decode_document(doc, keys) for doc in documents]
+
+    # ===== CONSULTAS =====
+
+    def encode_filter(
+        self,
+        query: Optional[Dict[str, Any]],
+        fields: Optional[AbstractSet[str]] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Traduce un filtro de find/count/update/delete
+
+        Los valores se dejan como están: los operadores de comparación no
+        contienen nombres de campo (los de $elemMatch son de subdocumentos).
+        `fields` limita la traducción a las claves presentes (ver encode_path).
+        """
+        if not query:
+            return query
+        encoded = {}
+        for key, value in query.items():
+            if key in _LOGICAL_OPERATORS:
+                encoded[key] = [self.encode_filter(clause, fields) for clause in value]
+            elif key == '$expr':
+                encoded[key] = self.encode_expression(value, fields)
+            elif key.startswith('$'):
+                encoded[key] = value
+            else:
+                encoded[self.encode_path(key, fields)] = value
+        return encoded
+
+    def encode_projection(self, projection: Any) -> Any:
+        """Traduce una proyección (dict o lista de campos)"""
+        if not projection:
+            return projection
+        if isinstance(projection, dict):
+            return {self.encode_path(field): self.encode_expression(value)
+                    for field, value in projection.items()}
+        return [self.encode_path(field) for field in projection]
+
+    def encode_sort(self, sort: Any, fields: Optional[AbstractSet[str]] = None) -> Any:
+        """Traduce una ordenación ([(campo, dirección), ...], dict o campo)"""
+        if not sort:
+            return sort
+        if isinstance(sort, str):
+            return self.encode_path(sort, fields)
+        if isinstance(sort, dict):
+            return {self.encode_path(field, fields): direction for field, direction in sort.items()}
+        return [(self.encode_path(field, fields), direction) for field, direction in sort]
+
+    def encode_update(self, update: Union[Dict[str, Any], List[Dict[str, Any]]]) -> Any:
+        """Traduce una actualización ($set/$inc/..., pipeline o documento de reemplazo)"""
+        if isinstance(update, list):
+            return self.encode_pipeline(update)
+        if not any(key.startswith('$') for key in update):
+            return self.encode_document(update)
+        return {
+            operator: ({self.encode_path(field): value for field, value in fields.items()}
+                       if isinstance(fields, dict) else fields)
+            for operator, fields in update.items()
+        }
+
+    # ===== AGREGACIÓN =====
+
+    def encode_expression(self, expression: Any, fields: Optional[AbstractSet[str]] = None) -> Any:
+        """
+        Traduce las referencias '$campo' de una expresión de agregación
+
+        Las variables ('$$ROOT', '$$this'...), los argumentos con nombre de
+        los operadores ({'$dateToString': {'format': ..., 'date': ...}}) y
+        las claves de un objeto literal (campos nuevos) se dejan como están.
+        """
+        if isinstance(expression, str):
+            if expression.startswith('$') and not expression.startswith('$$'):
+                return '$' + self.encode_path(expression[1:], fields)
+            return expression
+        if isinstance(expression, list):
+            return [self.encode_expression(item, fields) for item in expression]
+        if isinstance(expression, dict):
+            if any(key.startswith('$') for key in expression):
+                return {operator: self._encode_arguments(operator, arguments, fields)
+                        for operator, arguments in expression.items()}
+            return {key: self.encode_expression(value, fields) for key, value in expression.items()}
+        return expression
+
+    def _encode_arguments(self, operator: str, arguments: Any, fields: Optional[AbstractSet[str]]) -> Any:
+        """Traduce los argumentos de un operador de expresión"""
+        if operator == '$literal':
+            return arguments
+        if isinstance(arguments, dict) and not any(key.startswith('$') for key in arguments):
+            return {name: self.encode_expression(value, fields) for name, value in arguments.items()}
+        return self.encode_expression(arguments, fields)
+
+    def _encode_outputs(self, outputs: Dict[str, Any], fields: AbstractSet[str]) -> Dict[str, Any]:
+        """Traduce {campo nuevo: acumulador/expresión} (los nombres de salida no se tocan)"""
+        return {field: self.encode_expression(value, fields) for field, value in outputs.items()}
+
+    def _output_key(self, key: str, fields: Set[str]) -> str:
+        """
+        Clave de un campo que una etapa añade a los documentos
+
+        Si nombra un campo almacenado presente, lo sobrescribe con su clave
+        compacta; si no, se escribe tal cual y deja de traducirse al leer
+        aunque coincida con una clave compacta (p. ej. un alias 'rpm').
+        """
+        head, dot, rest = key.partition('.')
+        code = self.mapping.get(head)
+        if code is not None and code in fields:
+            return code + dot + rest
+        fields.discard(head)
+        return key
+
+    def _encode_project(self, spec: Dict[str, Any], fields: Set[str]) -> Tuple[Dict[str, Any], Set[str]]:
+        """Traduce un $project; retorna la etapa y las claves almacenadas que conserva"""
+        def is_flag(value):
+            return isinstance(value, (bool, int, float))
+
+        if all(is_flag(value) and not value for key, value in spec.items() if key != '_id'):
+            # Exclusión: el resto de campos pasa tal cual
+            remaining = set(fields)
+            for key in spec:
+                if key != '_id' and '.' not in key:
+                    remaining.discard(self.encode_path(key, fields))
+            return {self.encode_path(key, fields): value for key, value in spec.items()}, remaining
+
+        # Inclusión: solo quedan los campos incluidos y los calculados
+        encoded, kept = {}, set()
+        for key, value in spec.items():
+            if key != '_id' and is_flag(value):
+                stored = self.encode_path(key, fields)
+                if stored != key:
+                    kept.add(stored.partition('.')[0])
+                encoded[stored] = value
+            else:
+                encoded[key] = self.encode_expression(value, fields)
+        return encoded, kept
+
+    def _encode_stage(self, stage: Dict[str, Any], fields: Set[str]) -> Tuple[Dict[str, Any], Set[str]]:
+        """
+        Traduce una etapa de un pipeline de agregación
+
+        Args:
+            stage: Etapa con nombres lógicos
+            fields: Claves almacenadas presentes en los documentos de entrada
+
+        Returns:
+            Tuple: (etapa traducida, claves almacenadas presentes a la salida)
+        """
+        encoded = {}
+        for name, spec in stage.items():
+            if name == '$match':
+                encoded[name] = self.encode_filter(spec, fields)
+            elif name == '$project':
+                encoded[name], fields = self._encode_project(spec, fields)
+            elif name in _SHAPE_STAGES:
+                # Las expresiones se evalúan sobre el documento de entrada
+                added = set(fields)
+                encoded[name] = {self._output_key(field, added): self.encode_expression(value, fields)
+                                 for field, value in spec.items()}
+                fields = added
+            elif name == '$group':
+                encoded[name], fields = self._encode_outputs(spec, fields), set()
+            elif name == '$sort':
+                encoded[name] = self.encode_sort(spec, fields)
+            elif name == '$unset':
+                removed = [self.encode_path(field, fields)
+                           for field in (spec if isinstance(spec, list) else [spec])]
+                encoded[name] = removed if isinstance(spec, list) else removed[0]
+                fields = fields - set(removed)
+            elif name == '$count':
+                encoded[name], fields = spec, set()
+            elif name == '$sortByCount':
+                encoded[name], fields = self.encode_expression(spec, fields), set()
+            elif name in ('$replaceRoot', '$replaceWith'):
+                root = spec['newRoot'] if name == '$replaceRoot' else spec
+                new_root = self.encode_expression(root, fields)
+                encoded[name] = {**spec, 'newRoot': new_root} if name == '$replaceRoot' else new_root
+                if root not in ('$$ROOT', '$$CURRENT'):
+                    fields = set()
+            elif name == '$unwind':
+                if isinstance(spec, str):
+                    encoded[name] = self.encode_expression(spec, fields)
+                else:
+                    encoded[name] = {**spec, 'path': self.encode_expression(spec['path'], fields)}
+                    if 'includeArrayIndex' in spec:
+                        fields = set(fields)
+                        encoded[name]['includeArrayIndex'] = self._output_key(spec['includeArrayIndex'], fields)
+            elif name in ('$bucket', '$bucketAuto'):
+                encoded[name] = {**spec, 'groupBy': self.encode_expression(spec['groupBy'], fields)}
+                if 'output' in spec:
+                    encoded[name]['output'] = self._encode_outputs(spec['output'], fields)
+                fields = set()
+            elif name == '$lookup':
+                # foreignField y el pipeline interno son de la otra colección
+                encoded[name] = dict(spec)
+                if 'localField' in spec:
+                    encoded[name]['localField'] = self.encode_path(spec['localField'], fields)
+                if 'let' in spec:
+                    encoded[name]['let'] = {var: self.encode_expression(value, fields)
+                                            for var, value in spec['let'].items()}
+                if 'as' in spec:
+                    fields = set(fields)
+                    encoded[name]['as'] = self._output_key(spec['as'], fields)
+            elif name == '$geoNear':
+                encoded[name] = dict(spec)
+                if 'key' in spec:
+                    encoded[name]['key'] = self.encode_path(spec['key'], fields)
+                if 'query' in spec:
+                    encoded[name]['query'] = self.encode_filter(spec['query'], fields)
+                fields = set(fields)
+                for key in ('distanceField', 'includeLocs'):
+                    if key in spec:
+                        encoded[name][key] = self._output_key(spec[key], fields)
+            elif name == '$facet':
+                encoded[name] = {output: self._encode_pipeline(pipeline, fields)[0]
+                                 for output, pipeline in spec.items()}
+                fields = set()
+            else:
+                # $limit, $skip, $sample, $out, $merge...
+                encoded[name] = spec
+        return encoded, fields
+
+    def _encode_pipeline(
+        self,
+        pipeline: List[Dict[str, Any]],
+        fields: Set[str]
+    ) -> Tuple[List[Dict[str, Any]], Set[str]]:
+        """Traduce las etapas en orden siguiendo las claves almacenadas presentes"""
+        encoded = []
+        for stage in pipeline:
+            stage, fields = self._encode_stage(stage, fields)
+            encoded.append(stage)
+        return encoded, fields
+
+    def encode_stage(self, stage: Dict[str, Any]) -> Dict[str, Any]:
+        """Traduce una etapa aplicada a documentos almacenados"""
+        return self._encode_stage(stage, set(self.reverse))[0]
+
+    def encode_aggregate(self, pipeline: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], FrozenSet[str]]:
+        """
+        Traduce un pipeline de agregación
+
+        Solo se traducen los campos almacenados: las referencias a campos que
+        una etapa anterior ha descartado y los nombres nuevos ($group,
+        alias de $project, $count...) quedan como están, aunque coincidan
+        con una clave compacta.
+
+        Args:
+            pipeline: Pipeline con nombres lógicos
+
+        Returns:
+            Tuple: (pipeline traducido, claves almacenadas que conservan los
+                resultados, para decode_documents)
+        """
+        encoded, fields = self._encode_pipeline(pipeline, set(self.reverse))
+        return encoded, frozenset(fields)
+
+    def encode_pipeline(self, pipeline: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Traduce un pipeline de agregación (ver encode_aggregate)"""
+        return self.encode_aggregate(pipeline)[0]
+
+
+# Codec por defecto de la colección de listings
+LISTING_CODEC = FieldCodec(LISTING_FIELD_CODES)
+
+
+def get_codec(enabled: bool) -> Optional[FieldCodec]:
+    """
+    Codec de listings si está activado
+
+    Args:
+        enabled: Si True, retorna LISTING_CODEC
+
+    Returns:
+        FieldCodec o None
+    """
+    return LISTING_CODEC if enabled else None
@@ -0,0 +1,177 @@
+"""
+Lectura de datasets remotos en streaming: HTTP -> descompresión -> parser CSV
+"""
+
+import io
+import gzip
+import queue
+import logging
+import threading
+from typing import Any, BinaryIO, Callable, Optional
+
+import requests
+
+from .streaming import zstd_reader
+
+logger = logging.getLogger(__name__)
+
+# Tamaño de cada bloque leído de la respuesta HTTP
+DEFAULT_CHUNK_BYTES = 64 * 1024
+
+# Bloques máximos en memoria entre la descarga y el parser
+DEFAULT_QUEUE_CHUNKS = 64
+
+_GZIP_MAGIC = b'\x1f\x8b'
+_ZSTD_MAGIC = b'\x28\xb5\x2f\xfd'
+
+_EOF = object()
+
+
+class HTTPByteStream(io.RawIOBase):
+    """
+    Flujo binario de solo lectura alimentado por una descarga HTTP
+
+    Un hilo descarga la respuesta por bloques y los deja en una cola
+    acotada; el consumidor (p. ej. gzip + pd.read_csv) los lee como un
+    archivo. Si el consumidor se retrasa, la cola se llena y la descarga
+    espera (backpressure), por lo que la memoria no depende del tamaño
+    del archivo.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        chunk_bytes: int = DEFAULT_CHUNK_BYTES,
+        queue_chunks: int = DEFAULT_QUEUE_CHUNKS,
+        timeout: float = 30,
+        session: Optional[requests.Session] = None,
+        progress: Optional[Callable[[int], Any]] = None
+    ):
+        """
+        Inicia la descarga en segundo plano
+
+        Args:
+            url: URL del archivo
+            chunk_bytes: Tamaño de cada bloque de la respuesta
+            queue_chunks: Bloques máximos en cola entre descarga y lectura
+            timeout: Timeout de conexión/lectura en segundos
+            session: Sesión de requests opcional
+            progress: Callback opcional que recibe los bytes de cada bloque
+        """
+        super().__init__()
+        self.url = url
+        self.chunk_bytes = chunk_bytes
+        self.timeout = timeout
+        self.session = session or requests.Session()
+        self.progress = progress
+
+        self.bytes_downloaded = 0
+        self.total_bytes: Optional[int] = None
+        self.download_finished = threading.Event()
+
+        self._queue: queue.Queue = queue.Queue(maxsize=max(queue_chunks, 1))
+        self._stop = threading.Event()
+        self._error: Optional[BaseException] = None
+        self._pending = memoryview(b'')
+        self._eof = False
+        self._thread = threading.Thread(
+            target=self._download, name='http-download', daemon=True)
+        self._thread.start()
+
+    # ===== PRODUCTOR (hilo de descarga) =====
+
+    def _download(self) -> None:
+        """Descarga la respuesta y encola sus bloques"""
+        try:
+            with self.session.get(self.url, stream=True, timeout=self.timeout) as response:
+                response.raise_for_status()
+                length = response.headers.get('content-length')
+                self.total_bytes = int(length) if length else None
+                for chunk in response.iter_content(chunk_size=self.chunk_bytes):
+                    if self._stop.is_set():
+                        return
+                    if not chunk:
+                        continue
+                    self.bytes_downloaded += len(chunk)
+                    if self.progress is not None:
+                        self.progress(len(chunk))
+                    self._put(chunk)
+        except Exception as e:
+            self._error = e
+        finally:
+            self.download_finished.set()
+            self._put(_EOF)
+
+    def _put(self, item: Any) -> None:
+        """Encola un bloque sin quedarse bloqueado si el lector cerró"""
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    # ===== CONSUMIDOR =====
+
+    def readable(self) -> bool:
+        """El flujo es de solo lectura"""
+        return True
+
+    def readinto(self, buffer) -> int:
+        """Copia en `buffer` los siguientes bytes descargados"""
+        if not self._pending:
+            if self._eof:
+                return 0
+            item = self._queue.get()
+            if item is _EOF:
+                self._eof = True
+                if self._error is not None:
+                    raise IOError(f"Descarga interrumpida: {self._error}") from self._error
+                return 0
+            self._pending = memoryview(item)
+
+        size = min(len(buffer), len(self._pending))
+        buffer[:size] = self._pending[:size]
+        self._pending = self._pending[size:]
+        return size
+
+    def close(self) -> None:
+        """Detiene la descarga y libera el hilo productor"""
+        if not self.closed:
+            self._stop.set()
+            self._thread.join(timeout=self.timeout)
+        super().close()
+
+
+def decompressed(stream: BinaryIO) -> BinaryIO:
+    """
+    Detecta la compresión por sus bytes mágicos y descomprime en streaming
+
+    Args:
+        stream: Flujo binario (gzip, zstd o sin comprimir)
+
+    Returns:
+        BinaryIO: Flujo con el contenido descomprimido
+    """
+    buffered = stream if hasattr(stream, 'peek') else io.BufferedReader(stream)
+    head = buffered.peek(4)[:4]
+    if head.startswith(_GZIP_MAGIC):
+        return gzip.GzipFile(fileobj=buffered, mode='rb')
+    if head.startswith(_ZSTD_MAGIC):
+        return zstd_reader(buffered)
+    return buffered
+
+
+def open_url_source(url: str, **kwargs) -> HTTPByteStream:
+    """
+    Abre una URL como flujo binario en streaming
+
+    Args:
+        url: URL del archivo
+        **kwargs: Argumentos de HTTPByteStream
+
+    Returns:
+        HTTPByteStream: Flujo con los bytes descargados (sin descomprimir)
+    """
+    logger.info(f"🌐 Descargando en streaming: {url}")
+    return HTTPByteStream(url, **kwargs)
@@ -0,0 +1,292 @@
+"""
+Pipeline de importación multiproceso: workers de parseo/limpieza + escritor único
+"""
+
+import io
+import os
+import re
+import queue
+import logging
+import threading
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+import pandas as pd
+
+from .cleaning import dataframe_to_documents
+from .field_codec import FieldCodec
+from .streaming import is_compressed, iter_csv_chunks
+from .validation import listing_documents, split_valid_listings
+
+logger = logging.getLogger(__name__)
+
+# Tamaño objetivo de cada rango de bytes que parsea un worker
+DEFAULT_RANGE_BYTES = 8 * 1024 * 1024
+
+_BOUNDARY = re.compile(rb'["\n]')
+
+_SENTINEL = None
+
+
+def _next_record_boundary(f, offset: int, parity: int) -> int:
+    """
+    Busca el siguiente fin de registro CSV a partir de un offset
+
+    Un salto de línea termina un registro solo si el número de comillas
+    acumuladas es par (las comillas escapadas "" no alteran la paridad).
+
+    Args:
+        f: Archivo abierto en modo binario
+        offset: Posición desde la que buscar
+        parity: Paridad de comillas acumulada hasta `offset`
+
+    Returns:
+        int: Offset inmediatamente posterior al fin de registro (o EOF)
+    """
+    f.seek(offset)
+    while True:
+        piece = f.read(64 * 1024)
+        if not piece:
+            return offset
+        for match in _BOUNDARY.finditer(piece):
+            if match.group() == b'"':
+                parity ^= 1
+            elif parity == 0:
+                return offset + match.end()
+        offset += len(piece)
+
+
+def split_csv_ranges(
+    csv_path: Union[str, Path],
+    target_bytes: int = DEFAULT_RANGE_BYTES
+) -> Tuple[bytes, List[Tuple[int, int]]]:
+    """
+    Divide un CSV en rangos de bytes que terminan en fin de registro
+
+    Permite que cada worker lea y parsee su rango de forma independiente,
+    incluso con campos entre comillas que contienen saltos de línea.
+
+    Args:
+        csv_path: Ruta del archivo CSV (sin comprimir)
+        target_bytes: Tamaño aproximado de cada rango
+
+    Returns:
+        Tuple: (cabecera en bytes, lista de rangos (inicio, fin))
+    """
+    ranges = []
+    with open(csv_path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        header_end = _next_record_boundary(f, 0, 0)
+        f.seek(0)
+        header = f.read(header_end)
+
+        start = header_end
+        while start < size:
+            f.seek(start)
+            block = f.read(target_bytes)
+            end = start + len(block)
+            parity = block.count(b'"') & 1
+            if end < size and not (parity == 0 and block.endswith(b'\n')):
+                end = _next_record_boundary(f, end, parity)
+            ranges.append((start, end))
+            start = end
+
+    return header, ranges
+
+
+def _finish_chunk(
+    df: pd.DataFrame,
+    clean_func: Callable[[pd.DataFrame], pd.DataFrame],
+    metadata: Optional[Dict[str, Any]],
+    validate: bool = False,
+    sparse: bool = False,
+    codec: Optional[FieldCodec] = None
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """Limpia un chunk y lo convierte en documentos con metadata (y rechazos)"""
+    df = clean_func(df)
+    rejects: List[Dict[str, Any]] = []
+    if validate:
+        df, rejects = split_valid_listings(df)
+        documents = listing_documents(df, sparse=sparse, codec=codec)
+    else:
+        if codec is not None:
+            df = codec.encode_frame(df)
+        documents = dataframe_to_documents(df, sparse=sparse)
+    if metadata:
+        for doc in documents:
+            doc.update(metadata)
+    return documents, rejects
+
+
+def _process_range(
+    csv_path: str,
+    header: bytes,
+    start: int,
+    end: int,
+    clean_func: Callable[[pd.DataFrame], pd.DataFrame],
+    metadata: Optional[Dict[str, Any]],
+    read_csv_kwargs: Dict[str, Any],
+    validate: bool = False,
+    sparse: bool = False,
+    codec: Optional[FieldCodec] = None
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """Worker: lee, parsea y limpia un rango de bytes del CSV"""
+    with open(csv_path, 'rb') as f:
+        f.seek(start)
+        data = f.read(end - start)
+
+    df = pd.read_csv(io.BytesIO(header + data), **read_csv_kwargs)
+    return _finish_chunk(df, clean_func, metadata, validate, sparse, codec)
+
+
+def _process_frame(
+    df: pd.DataFrame,
+    clean_func: Callable[[pd.DataFrame], pd.DataFrame],
+    metadata: Optional[Dict[str, Any]],
+    validate: bool = False,
+    sparse: bool = False,
+    codec: Optional[FieldCodec] = None
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """Worker: limpia un chunk ya parseado (archivos comprimidos)"""
+    return _finish_chunk(df, clean_func, metadata, validate, sparse, codec)
+
+
+class ParallelImportPipeline:
+    """
+    Importa uno o varios CSV con un pool de procesos y un escritor único
+
+    Los workers parsean y limpian chunks en paralelo; los lotes listos
+    para insertar pasan por una cola acotada a un hilo escritor. Si el
+    escritor se retrasa, la cola se llena, el hilo principal deja de
+    recoger resultados y no se envían nuevas tareas (backpressure), de
+    modo que la memoria se mantiene plana.
+    """
+
+    def __init__(
+        self,
+        clean_func: Callable[[pd.DataFrame], pd.DataFrame],
+        write_func: Callable[[List[Dict[str, Any]]], Any],
+        processes: Optional[int] = None,
+        queue_size: int = 4,
+        range_bytes: int = DEFAULT_RANGE_BYTES,
+        metadata: Optional[Dict[str, Any]] = None,
+        read_csv_kwargs: Optional[Dict[str, Any]] = None,
+        reject_func: Optional[Callable[[List[Dict[str, Any]]], Any]] = None,
+        sparse: bool = False,
+        codec: Optional[FieldCodec] = None
+    ):
+        """
+        Inicializa el pipeline
+
+        Args:
+            clean_func: Función de limpieza a nivel de módulo (picklable)
+            write_func: Función que inserta una lista de documentos
+            processes: Procesos de parseo/limpieza (por defecto, CPUs)
+            queue_size: Lotes listos máximos entre workers y escritor
+            range_bytes: Tamaño aproximado de cada rango de bytes
+            metadata: Campos a agregar a cada documento
+            read_csv_kwargs: Argumentos adicionales para pd.read_csv
+            reject_func: Si se indica, los workers validan cada chunk contra
+                el esquema de listings y los rechazos se pasan a esta función
+            sparse: Si True, los documentos omiten los campos nulos
+            codec: Codec de claves compactas para los documentos (opcional)
+        """
+        self.clean_func = clean_func
+        self.write_func = write_func
+        self.processes = processes or os.cpu_count() or 1
+        self.queue_size = max(queue_size, 1)
+        self.range_bytes = range_bytes
+        self.metadata = metadata
+        self.read_csv_kwargs = {'low_memory': False, **(read_csv_kwargs or {})}
+        self.reject_func = reject_func
+        self.sparse = sparse
+        self.codec = codec
+
+        self.chunks = 0
+        self.documents = 0
+        self.rejected = 0
+
+    def _iter_tasks(self, csv_paths: Sequence[Union[str, Path]]) -> Iterator[tuple]:
+        """Genera las tareas (función, argumentos) para el pool"""
+        validate = self.reject_func is not None
+        for csv_path in csv_paths:
+            csv_path = Path(csv_path)
+            # Los comprimidos no admiten acceso aleatorio por rangos de bytes
+            if is_compressed(csv_path):
+                logger.info(f"📦 {csv_path.name}: comprimido, parseo en el proceso principal")
+                for chunk in iter_csv_chunks(csv_path, **self.read_csv_kwargs):
+                    yield _process_frame, (
+                        chunk, self.clean_func, self.metadata, validate, self.sparse, self.codec)
+            else:
+                header, ranges = split_csv_ranges(csv_path, self.range_bytes)
+                logger.info(f"📄 {csv_path.name}: {len(ranges)} rangos")
+                for start, end in ranges:
+                    yield _process_range, (
+                        str(csv_path), header, start, end,
+                        self.clean_func, self.metadata, self.read_csv_kwargs,
+                        validate, self.sparse, self.codec)
+
+    def _writer(self, ready: queue.Queue, errors: list) -> None:
+        """Hilo escritor: consume lotes de la cola y los inserta"""
+        while True:
+            documents = ready.get()
+            if documents is _SENTINEL:
+                return
+            if errors:
+                continue  # Vaciar la cola para no bloquear al productor
+            try:
+                self.write_func(documents)
+            except Exception as e:
+                errors.append(e)
+
+    def run(self, csv_paths: Sequence[Union[str, Path]]) -> Dict[str, int]:
+        """
+        Ejecuta el pipeline sobre uno o varios CSV
+
+        Args:
+            csv_paths: Rutas de los archivos CSV
+
+        Returns:
+            Dict: chunks procesados, documentos enviados al escritor y rechazos
+        """
+        ready: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        errors: list = []
+        writer = threading.Thread(
+            target=self._writer, args=(ready, errors), name='import-writer')
+        writer.start()
+
+        max_pending = self.processes * 2
+        pending = set()
+
+        def collect(done):
+            for future in done:
+                documents, rejects = future.result()
+                self.chunks += 1
+                self.documents += len(documents)
+                if rejects:
+                    self.rejected += len(rejects)
+                    self.reject_func(rejects)
+                ready.put(documents)  # Bloquea si el escritor va retrasado
+
+        try:
+            with ProcessPoolExecutor(max_workers=self.processes) as pool:
+                for func, args in self._iter_tasks(csv_paths):
+                    if errors:
+                        break
+                    if len(pending) >= max_pending:
+                        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        collect(done)
+                    pending.add(pool.submit(func, *args))
+
+                while pending and not errors:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    collect(done)
+        finally:
+            ready.put(_SENTINEL)
+            writer.join()
+
+        if errors:
+            raise errors[0]
+
+        return {"chunks": self.chunks, "documents": self.documents, "rejected": self.rejected}
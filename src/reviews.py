@@ -0,0 +1,239 @@
+"""
+Reseñas (reviews.csv) y agregados de reseñas por listing
+
+Las reseñas se guardan en su propia colección; mientras se importan se
+acumulan agregados por listing (total, primera/última fecha y reseñas por
+mes de cada año) que luego se escriben en los listings en una sola pasada
+bulk_write, para no tener que hacer $lookup en cada consulta.
+"""
+
+import logging
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from pymongo import UpdateOne
+from pymongo.collection import Collection
+
+from .cleaning import dataframe_to_documents
+
+logger = logging.getLogger(__name__)
+
+# Columnas de reviews.csv de Inside Airbnb
+REVIEW_COLUMNS = ['listing_id', 'id', 'date', 'reviewer_id', 'reviewer_name', 'comments']
+
+# Agregados parciales acumulados antes de compactarlos
+COMPACT_EVERY = 50
+
+
+def create_review_indexes(collection: Collection) -> None:
+    """
+    Crea los índices de la colección de reseñas
+
+    Args:
+        collection: Colección de reseñas
+    """
+    collection.create_index([('listing_id', 1), ('date', 1)])
+    logger.info("✅ Índice creado: listing_id + date")
+
+
+def clean_reviews_chunk(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Limpia un chunk de reviews.csv con operaciones vectorizadas
+
+    Args:
+        df: Chunk crudo de reviews.csv
+
+    Returns:
+        pd.DataFrame: Chunk con IDs enteros y fechas (sin filas inválidas)
+    """
+    df = df[[col for col in REVIEW_COLUMNS if col in df.columns]].copy()
+
+    for col in ('listing_id', 'id', 'reviewer_id'):
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors='coerce')
+    df['date'] = pd.to_datetime(df['date'], format='%Y-%m-%d', errors='coerce')
+    df = df.dropna(subset=['listing_id', 'date'])
+
+    df['listing_id'] = df['listing_id'].astype('int64')
+    for col in ('id', 'reviewer_id'):
+        if col in df.columns:
+            df[col] = df[col].astype('Int64')
+
+    return df
+
+
+def review_documents(df: pd.DataFrame) -> List[Dict[str, Any]]:
+    """
+    Convierte un chunk limpio en documentos de reseña (sin campos nulos)
+
+    Args:
+        df: Chunk limpio (clean_reviews_chunk)
+
+    Returns:
+        List[Dict]: Documentos para insertar
+    """
+    return [
+        {key: value for key, value in doc.items() if value is not None}
+        for doc in dataframe_to_documents(df)
+    ]
+
+
+class ReviewAggregator:
+    """
+    Acumula agregados de reseñas por listing mientras se leen los chunks
+
+    Cada chunk se reduce con un groupby (listing_id, año); los parciales se
+    compactan periódicamente, así que la memoria depende del número de
+    listings y años, no del número de reseñas.
+    """
+
+    def __init__(self):
+        """Inicializa el agregador vacío"""
+        self._partials: List[pd.DataFrame] = []
+        self._stats: Optional[pd.DataFrame] = None
+        self.reviews = 0
+
+    def add(self, chunk: pd.DataFrame) -> None:
+        """
+        Agrega un chunk limpio (clean_reviews_chunk)
+
+        Args:
+            chunk: DataFrame con listing_id y date
+        """
+        if chunk.empty:
+            return
+        self.reviews += len(chunk)
+        partial = (
+            chunk.assign(year=chunk['date'].dt.year)
+            .groupby(['listing_id', 'year'])['date']
+            .agg(count='size', first='min', last='max')
+        )
+        self._partials.append(partial)
+        if len(self._partials) >= COMPACT_EVERY:
+            self._compact()
+
+    def _compact(self) -> None:
+        """Combina los agregados parciales en uno solo"""
+        if not self._partials:
+            return
+        frames = self._partials if self._stats is None else [self._stats, *self._partials]
+        self._stats = (
+            pd.concat(frames)
+            .groupby(level=['listing_id', 'year'])
+            .agg({'count': 'sum', 'first': 'min', 'last': 'max'})
+        )
+        self._partials = []
+
+    def by_year(self) -> pd.DataFrame:
+        """
+        Agregados por listing y año
+
+        Las reseñas por mes dividen el total del año entre los meses
+        activos: desde el mes de la primera reseña del listing (o enero)
+        hasta el de su última reseña (o diciembre).
+
+        Returns:
+            pd.DataFrame: Índice (listing_id, year) con count, first, last y per_month
+        """
+        self._compact()
+        if self._stats is None:
+            return pd.DataFrame(columns=['count', 'first', 'last', 'per_month'])
+
+        stats = self._stats.copy()
+        listing_first = stats.groupby(level='listing_id')['first'].transform('min')
+        listing_last = stats.groupby(level='listing_id')['last'].transform('max')
+        years = stats.index.get_level_values('year').to_numpy()
+
+        start_month = np.where(listing_first.dt.year.to_numpy() == years,
+                               listing_first.dt.month.to_numpy(), 1)
+        end_month = np.where(listing_last.dt.year.to_numpy() == years,
+                             listing_last.dt.month.to_numpy(), 12)
+        months = end_month - start_month + 1
+        stats['per_month'] = (stats['count'].to_numpy() / months).round(2)
+        return stats
+
+    def summaries(self) -> Dict[int, Dict[str, Any]]:
+        """
+        Resumen de reseñas de cada listing
+
+        Returns:
+            Dict: listing_id -> {count, first_review, last_review,
+                reviews_per_month, by_year: [{year, count, per_month}, ...]}
+        """
+        stats = self.by_year()
+        if stats.empty:
+            return {}
+
+        totals = stats.groupby(level='listing_id').agg(
+            count=('count', 'sum'), first=('first', 'min'), last=('last', 'max'))
+        # Meses entre la primera y la última reseña (mínimo uno)
+        span = ((totals['last'].dt.year - totals['first'].dt.year) * 12
+                + totals['last'].dt.month - totals['first'].dt.month + 1)
+        totals['per_month'] = (totals['count'] / span).round(2)
+
+        summaries: Dict[int, Dict[str, Any]] = {}
+        for listing_id, count, first, last, per_month in zip(
+                totals.index.tolist(), totals['count'].tolist(),
+                totals['first'].dt.to_pydatetime(), totals['last'].dt.to_pydatetime(),
+                totals['per_month'].tolist()):
+            summaries[listing_id] = {
+                'count': count,
+                'first_review': first,
+                'last_review': last,
+                'reviews_per_month': per_month,
+                'by_year': []
+            }
+
+        for (listing_id, year), count, per_month in zip(
+                stats.index.tolist(), stats['count'].tolist(), stats['per_month'].tolist()):
+            summaries[listing_id]['by_year'].append(
+                {'year': int(year), 'count': count, 'per_month': per_month})
+
+        return summaries
+
+    def merge_into(
+        self,
+        collection: Collection,
+        field: str = 'review_stats',
+        key: str = 'id',
+        batch_size: int = 1000,
+        progress: Optional[Callable[[int], Any]] = None
+    ) -> Dict[str, int]:
+        """
+        Escribe los agregados en los listings con bulk_write(ordered=False)
+
+        Args:
+            collection: Colección de listings
+            field: Campo donde se guardan los agregados
+            key: Campo del listing que corresponde a listing_id ('_id' si
+                el id de Inside Airbnb se guarda como _id)
+            batch_size: Operaciones por bulk_write
+            progress: Callback opcional con las operaciones de cada lote
+
+        Returns:
+            Dict: Listings con reseñas, coincidentes y modificados
+        """
+        summaries = self.summaries()
+        if key != '_id':
+            collection.create_index(key)
+
+        now = datetime.now()
+        operations = [
+            UpdateOne({key: listing_id}, {'$set': {field: summary, 'updated_at': now}})
+            for listing_id, summary in summaries.items()
+        ]
+
+        matched = modified = 0
+        for i in range(0, len(operations), batch_size):
+            result = collection.bulk_write(operations[i:i+batch_size], ordered=False)
+            matched += result.matched_count
+            modified += result.modified_count
+            if progress is not None:
+                progress(len(operations[i:i+batch_size]))
+
+        logger.info(
+            f"✅ Agregados de reseñas: {len(summaries):,} listings, "
+            f"{matched:,} encontrados, {modified:,} actualizados")
+        return {'listings': len(summaries), 'matched': matched, 'modified': modified}
@@ -0,0 +1,194 @@
+"""
+Esquema tipado de listings.csv de Inside Airbnb para pd.read_csv
+
+Declarar columnas y tipos en el parseo evita que pandas infiera 75+
+columnas como object para luego descartar la mayoría: solo se parsean las
+columnas usadas, los enteros y flotantes salen ya tipados, los campos
+repetitivos (tipo de habitación, barrio...) como categóricos y las fechas
+con un formato fijo.
+"""
+
+import logging
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Union
+
+import pandas as pd
+
+from .cleaning import LISTING_COLUMNS, DATE_COLUMNS, DATE_FORMAT
+from .streaming import iter_csv_chunks, read_csv_source, reservoir_sample
+
+logger = logging.getLogger(__name__)
+
+# Columnas de fecha que se parsean al leer ('calendar_updated' es texto libre)
+PARSE_DATE_COLUMNS = [col for col in DATE_COLUMNS if col != 'calendar_updated']
+
+# Enteros: no se declaran en dtype. El parser de C ya los lee como int64 (o
+# float64 si hay vacíos) y forzar Int64 nullable hace el parseo ~40% más lento
+INTEGER_COLUMNS = [
+    'id', 'scrape_id', 'host_id', 'accommodates',
+    'minimum_nights', 'maximum_nights',
+    'minimum_minimum_nights', 'maximum_minimum_nights',
+    'minimum_maximum_nights', 'maximum_maximum_nights',
+    'availability_30', 'availability_60', 'availability_90', 'availability_365',
+    'number_of_reviews', 'number_of_reviews_ltm', 'number_of_reviews_l30d',
+    'calculated_host_listings_count', 'calculated_host_listings_count_entire_homes',
+    'calculated_host_listings_count_private_rooms',
+    'calculated_host_listings_count_shared_rooms'
+]
+
+# Numéricos que algunos snapshots escriben como '1.0' o con decimales
+FLOAT_COLUMNS = [
+    'latitude', 'longitude', 'bathrooms', 'bedrooms', 'beds',
+    'host_listings_count', 'host_total_listings_count',
+    'minimum_nights_avg_ntm', 'maximum_nights_avg_ntm',
+    'review_scores_rating', 'review_scores_accuracy',
+    'review_scores_cleanliness', 'review_scores_checkin',
+    'review_scores_communication', 'review_scores_location',
+    'review_scores_value', 'reviews_per_month'
+]
+
+# Pocos valores distintos repetidos en miles de filas
+CATEGORY_COLUMNS = [
+    'room_type', 'property_type', 'neighbourhood', 'neighbourhood_cleansed',
+    'neighbourhood_group_cleansed', 'host_response_time'
+]
+
+# Tipos por columna; el resto (texto, precio, 't'/'f', '95%') se lee como str
+LISTING_DTYPES: Dict[str, Any] = {
+    **{col: 'str' for col in LISTING_COLUMNS
+       if col not in INTEGER_COLUMNS and col not in PARSE_DATE_COLUMNS},
+    **{col: 'float64' for col in FLOAT_COLUMNS},
+    **{col: 'category' for col in CATEGORY_COLUMNS},
+}
+
+
+class ColumnSelector:
+    """
+    Filtro `usecols` que ignora las columnas ausentes del CSV
+
+    A diferencia de una lista, no falla si el archivo no trae alguna de las
+    columnas y, a diferencia de una lambda, se puede enviar a otros procesos.
+    """
+
+    def __init__(self, columns: Iterable[str]):
+        self.columns = frozenset(columns)
+
+    def __call__(self, column: str) -> bool:
+        return column in self.columns
+
+
+def read_csv_columns(csv_path: Union[str, Path]) -> list:
+    """
+    Lee solo la cabecera de un CSV (también comprimido)
+
+    Args:
+        csv_path: Ruta del archivo CSV
+
+    Returns:
+        list: Nombres de columna
+    """
+    return read_csv_source(csv_path, nrows=0).columns.tolist()
+
+
+def listing_read_csv_kwargs(
+    csv_path: Optional[Union[str, Path]] = None,
+    columns: Optional[Iterable[str]] = LISTING_COLUMNS
+) -> Dict[str, Any]:
+    """
+    Argumentos de pd.read_csv para leer listings.csv ya tipado
+
+    Args:
+        csv_path: Ruta del CSV; si se indica, se lee su cabecera para parsear
+            también las fechas (parse_dates falla con columnas ausentes)
+        columns: Columnas a leer (None = todas, con tipos para las conocidas)
+
+    Returns:
+        Dict: usecols, dtype y, con csv_path, parse_dates y date_format
+    """
+    wanted = set(columns) if columns is not None else None
+    kwargs: Dict[str, Any] = {
+        'dtype': {col: dtype for col, dtype in LISTING_DTYPES.items()
+                  if wanted is None or col in wanted}
+    }
+    if wanted is not None:
+        kwargs['usecols'] = ColumnSelector(wanted)
+
+    if csv_path is not None:
+        header = set(read_csv_columns(csv_path))
+        dates = [col for col in PARSE_DATE_COLUMNS
+                 if col in header and (wanted is None or col in wanted)]
+        if dates:
+            kwargs['parse_dates'] = dates
+            kwargs['date_format'] = DATE_FORMAT
+
+    return kwargs
+
+
+def read_listings_csv(
+    csv_path: Union[str, Path],
+    columns: Optional[Iterable[str]] = LISTING_COLUMNS,
+    **read_csv_kwargs
+) -> pd.DataFrame:
+    """
+    Lee listings.csv completo con el esquema tipado
+
+    Si el archivo no respeta el esquema (p. ej. un CSV propio con texto en
+    una columna numérica) se vuelve a leer sin tipos, solo con la selección
+    de columnas.
+
+    Args:
+        csv_path: Ruta del archivo CSV (.csv, .csv.gz, .csv.zst...)
+        columns: Columnas a leer (None = todas)
+        **read_csv_kwargs: Argumentos adicionales para pd.read_csv
+
+    Returns:
+        pd.DataFrame: Datos leídos
+    """
+    kwargs = {**listing_read_csv_kwargs(csv_path, columns), **read_csv_kwargs}
+    try:
+        return read_csv_source(csv_path, **kwargs)
+    except (ValueError, TypeError) as e:
+        logger.warning(f"⚠️ El CSV no coincide con el esquema tipado ({e}); se lee sin tipos")
+        for key in ('dtype', 'parse_dates', 'date_format'):
+            kwargs.pop(key, None)
+        return read_csv_source(csv_path, **kwargs)
+
+
+def sample_listings_csv(
+    csv_path: Union[str, Path],
+    size: int,
+    columns: Optional[Iterable[str]] = LISTING_COLUMNS,
+    seed: int = 42,
+    stratify: Optional[str] = None,
+    max_memory_mb: float = 512
+) -> pd.DataFrame:
+    """
+    Muestra reproducible de listings.csv leída en streaming con el esquema tipado
+
+    El archivo se recorre por chunks con un reservorio, así que la memoria
+    depende del tamaño de la muestra y no del archivo.
+
+    Args:
+        csv_path: Ruta del archivo CSV (.csv, .csv.gz, .csv.zst...)
+        size: Filas de la muestra
+        columns: Columnas a leer (None = todas)
+        seed: Semilla del muestreo
+        stratify: Columna para muestreo estratificado (p. ej. 'neighbourhood_cleansed')
+        max_memory_mb: Techo de memoria del proceso en MB
+
+    Returns:
+        pd.DataFrame: Muestra en el orden del archivo (índice = fila de origen)
+    """
+    if columns is not None and stratify is not None:
+        columns = [*columns, stratify]
+
+    kwargs = listing_read_csv_kwargs(csv_path, columns)
+    try:
+        return reservoir_sample(
+            iter_csv_chunks(csv_path, max_memory_mb, **kwargs), size, seed, stratify)
+    except (ValueError, TypeError) as e:
+        logger.warning(f"⚠️ El CSV no coincide con el esquema tipado ({e}); se lee sin tipos")
+        for key in ('dtype', 'parse_dates', 'date_format'):
+            kwargs.pop(key, None)
+        return reservoir_sample(
+            iter_csv_chunks(csv_path, max_memory_mb, **kwargs), size, seed, stratify)
@@ -0,0 +1,422 @@
+"""
+Utilidades de lectura en streaming para importaciones con memoria acotada
+"""
+
+import os
+import io
+import sys
+import bz2
+import gzip
+import lzma
+import zipfile
+import logging
+from contextlib import nullcontext
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterable, Iterator, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+# Filas leídas para estimar el consumo de memoria por registro
+PROBE_ROWS = 500
+
+# Copias simultáneas de cada chunk durante la importación:
+# CSV crudo + DataFrame limpio + lista de documentos + lote en vuelo
+MEMORY_OVERHEAD_FACTOR = 4
+
+MIN_CHUNK_ROWS = 100
+
+# Estrato de las filas con la columna de estratificación vacía
+NULL_STRATUM = '(sin valor)'
+
+# Extensiones de origen que se descomprimen al vuelo (sin pasar por disco)
+COMPRESSED_SUFFIXES = {'.gz', '.bz2', '.xz', '.zip', '.zst'}
+
+
+def is_compressed(path: Union[str, Path]) -> bool:
+    """Indica si un origen de datos está comprimido (por su extensión)"""
+    return Path(path).suffix.lower() in COMPRESSED_SUFFIXES
+
+
+def zstd_reader(fileobj: BinaryIO) -> BinaryIO:
+    """
+    Envuelve un flujo binario comprimido con zstd en un lector descomprimido
+
+    Usa compression.zstd (Python 3.14+) o, si no existe, el paquete zstandard.
+
+    Args:
+        fileobj: Flujo binario con datos zstd
+
+    Returns:
+        BinaryIO: Flujo con el contenido descomprimido
+    """
+    try:
+        from compression import zstd
+        return zstd.ZstdFile(fileobj, 'rb')
+    except ImportError:
+        pass
+    try:
+        import zstandard
+    except ImportError:
+        raise ImportError(
+            "Leer archivos .zst requiere Python 3.14+ o el paquete zstandard "
+            "(pip install zstandard)") from None
+    return io.BufferedReader(zstandard.ZstdDecompressor().stream_reader(fileobj, closefd=True))
+
+
+def open_source(path: Union[str, Path]) -> BinaryIO:
+    """
+    Abre un origen de datos en binario, descomprimiendo en streaming
+
+    Soporta .gz, .bz2, .xz, .zip (un único archivo) y .zst; el resto se
+    abre tal cual. El resultado se puede pasar directamente a pd.read_csv.
+
+    Args:
+        path: Ruta del archivo
+
+    Returns:
+        BinaryIO: Flujo binario con el contenido descomprimido
+    """
+    path = Path(path)
+    suffix = path.suffix.lower()
+    if suffix == '.gz':
+        return gzip.open(path, 'rb')
+    if suffix == '.bz2':
+        return bz2.open(path, 'rb')
+    if suffix == '.xz':
+        return lzma.open(path, 'rb')
+    if suffix == '.zst':
+        try:
+            from compression import zstd
+            return zstd.open(path, 'rb')
+        except ImportError:
+            return zstd_reader(open(path, 'rb'))
+    if suffix == '.zip':
+        archive = zipfile.ZipFile(path)
+        names = [name for name in archive.namelist() if not name.endswith('/')]
+        if len(names) != 1:
+            archive.close()
+            raise ValueError(f"El zip debe contener un único archivo: {path}")
+        return archive.open(names[0])
+    return open(path, 'rb')
+
+
+def find_csv_source(directory: Union[str, Path], stem: str) -> Optional[Path]:
+    """
+    Busca un CSV por nombre base, sin comprimir o comprimido
+
+    Args:
+        directory: Directorio donde buscar
+        stem: Nombre sin extensión (p. ej. 'madrid_listings')
+
+    Returns:
+        Path o None: Primer archivo existente (.csv, .csv.gz, .csv.zst...)
+    """
+    for suffix in ('', *sorted(COMPRESSED_SUFFIXES)):
+        candidate = Path(directory) / f"{stem}.csv{suffix}"
+        if candidate.exists():
+            return candidate
+    return None
+
+
+def read_csv_source(path: Union[str, Path], **read_csv_kwargs) -> pd.DataFrame:
+    """
+    Lee un CSV (comprimido o no) completo con pd.read_csv en streaming
+
+    Args:
+        path: Ruta del archivo
+        **read_csv_kwargs: Argumentos adicionales para pd.read_csv
+
+    Returns:
+        pd.DataFrame: Contenido del CSV
+    """
+    with open_source(path) as stream:
+        return pd.read_csv(stream, **read_csv_kwargs)
+
+
+def peak_memory_mb() -> Optional[float]:
+    """
+    Retorna el pico de memoria residente (RSS) del proceso
+
+    Returns:
+        float o None: Pico de memoria en MB (None si no está disponible)
+    """
+    if resource is None:
+        return None
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reporta KB, macOS reporta bytes
+    if sys.platform == 'darwin':
+        return peak / (1024 * 1024)
+    return peak / 1024
+
+
+def current_memory_mb() -> Optional[float]:
+    """
+    Retorna la memoria residente (RSS) actual del proceso
+
+    Returns:
+        float o None: Memoria actual en MB (usa el pico si no hay /proc)
+    """
+    try:
+        with open('/proc/self/statm') as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+    except (OSError, ValueError, AttributeError):
+        return peak_memory_mb()
+
+
+def estimate_chunk_rows(
+    sample: pd.DataFrame,
+    max_memory_mb: float,
+    baseline_mb: float = 0
+) -> int:
+    """
+    Estima cuántas filas caben en un chunk sin superar el techo de memoria
+
+    Args:
+        sample: Muestra de filas ya leídas del CSV
+        max_memory_mb: Techo de memoria del proceso en MB
+        baseline_mb: Memoria ya ocupada por el proceso en MB
+
+    Returns:
+        int: Número de filas por chunk
+    """
+    if len(sample) == 0:
+        return MIN_CHUNK_ROWS
+
+    bytes_per_row = sample.memory_usage(deep=True).sum() / len(sample)
+    budget = max(max_memory_mb - baseline_mb, 0) * 1024 * 1024
+    rows = int(budget / (bytes_per_row * MEMORY_OVERHEAD_FACTOR))
+
+    return max(rows, MIN_CHUNK_ROWS)
+
+
+def iter_csv_chunks(
+    csv_path: Union[str, Path, BinaryIO],
+    max_memory_mb: float = 512,
+    chunk_rows: Optional[int] = None,
+    first_chunk_rows: Optional[int] = None,
+    **read_csv_kwargs
+) -> Iterator[pd.DataFrame]:
+    """
+    Lee un CSV por chunks manteniendo la memoria bajo un techo configurable
+
+    El tamaño del chunk se estima a partir de las primeras filas y se reduce
+    a la mitad si la memoria residente supera el techo durante la lectura.
+
+    Args:
+        csv_path: Ruta del archivo CSV (.gz/.zst... se descomprimen al vuelo)
+            o flujo binario ya abierto (no se cierra al terminar)
+        max_memory_mb: Techo de memoria del proceso en MB
+        chunk_rows: Filas por chunk (opcional, por defecto se estima)
+        first_chunk_rows: Filas exactas del primer chunk (opcional, p. ej.
+            el chunk interrumpido que registró un checkpoint)
+        **read_csv_kwargs: Argumentos adicionales para pd.read_csv
+
+    Yields:
+        pd.DataFrame: Chunks consecutivos del CSV
+    """
+    read_csv_kwargs.setdefault('low_memory', False)
+
+    source = nullcontext(csv_path) if hasattr(csv_path, 'read') else open_source(csv_path)
+    with source as stream, \
+            pd.read_csv(stream, iterator=True, **read_csv_kwargs) as reader:
+        try:
+            chunk = reader.get_chunk(first_chunk_rows or chunk_rows or PROBE_ROWS)
+        except StopIteration:
+            return
+
+        if chunk_rows is None:
+            baseline = current_memory_mb() or 0
+            chunk_rows = estimate_chunk_rows(chunk, max_memory_mb, baseline)
+            logger.info(
+                f"📏 Tamaño de chunk estimado: {chunk_rows:,} filas "
+                f"(techo {max_memory_mb:,.0f} MB)")
+
+        while True:
+            yield chunk
+            del chunk
+
+            memory = current_memory_mb()
+            if memory is not None and memory > max_memory_mb and chunk_rows > MIN_CHUNK_ROWS:
+                chunk_rows = max(chunk_rows // 2, MIN_CHUNK_ROWS)
+                logger.warning(
+                    f"⚠️ Memoria {memory:.0f} MB sobre el techo, "
+                    f"reduciendo chunk a {chunk_rows:,} filas")
+
+            try:
+                chunk = reader.get_chunk(chunk_rows)
+            except StopIteration:
+                return
+
+
+class ReservoirSampler:
+    """
+    Muestreo aleatorio uniforme (sin reemplazo) mientras se leen los chunks
+
+    Cada fila recibe una clave aleatoria y se conservan las `size` filas con
+    menor clave: la memoria es proporcional a la muestra y no al archivo, y
+    cada chunk se procesa de forma vectorizada (solo entran al reservorio las
+    filas con clave inferior al umbral actual). Las claves salen de un
+    generador con semilla en el orden del archivo, así que la muestra es
+    reproducible e independiente del tamaño de chunk.
+
+    Con `stratify`, se guarda un reservorio por valor de la columna y al
+    final se reparte la muestra de forma proporcional a las filas de cada
+    estrato (al menos una por estrato si la muestra lo permite). La memoria
+    queda acotada por `size` filas por estrato.
+    """
+
+    def __init__(self, size: int, seed: int = 42, stratify: Optional[str] = None):
+        """
+        Inicializa el muestreador
+
+        Args:
+            size: Filas de la muestra
+            seed: Semilla del generador aleatorio
+            stratify: Columna para muestreo estratificado (opcional)
+        """
+        if size <= 0:
+            raise ValueError("El tamaño de la muestra debe ser positivo")
+        self.size = size
+        self.stratify = stratify
+        self.rows = 0
+        self._rng = np.random.default_rng(seed)
+        self._reservoir: Optional[pd.DataFrame] = None
+        self._keys = np.empty(0)
+        self._counts: Dict[object, int] = {}
+
+    def _strata(self, df: pd.DataFrame) -> pd.Series:
+        """Estrato de cada fila (los nulos forman su propio estrato)"""
+        return df[self.stratify].astype(object).where(df[self.stratify].notna(), NULL_STRATUM)
+
+    def add(self, chunk: pd.DataFrame) -> None:
+        """
+        Procesa un chunk del CSV
+
+        Args:
+            chunk: Filas consecutivas del archivo
+        """
+        if chunk.empty:
+            return
+        if self.stratify is not None and self.stratify not in chunk.columns:
+            raise KeyError(f"La columna de estratificación '{self.stratify}' no está en el CSV")
+        self.rows += len(chunk)
+        keys = self._rng.random(len(chunk))
+
+        if self.stratify is None:
+            if len(self._keys) >= self.size:
+                candidates = keys < self._keys.max()
+                chunk, keys = chunk[candidates], keys[candidates]
+        else:
+            strata = self._strata(chunk)
+            for stratum, count in strata.value_counts().items():
+                self._counts[stratum] = self._counts.get(stratum, 0) + int(count)
+            if self._reservoir is not None:
+                # Umbral de cada estrato: su clave máxima si ya está lleno
+                held = pd.Series(self._keys, index=self._strata(self._reservoir).to_numpy())
+                sizes = held.groupby(level=0).size()
+                limits = held.groupby(level=0).max().where(sizes >= self.size, 1.0)
+                thresholds = strata.map(limits).fillna(1.0).to_numpy(dtype='float64')
+                candidates = keys < thresholds
+                chunk, keys = chunk[candidates], keys[candidates]
+
+        if chunk.empty:
+            return
+        if self._reservoir is None:
+            reservoir, all_keys = chunk, keys
+        else:
+            reservoir = pd.concat([self._reservoir, chunk])
+            all_keys = np.concatenate([self._keys, keys])
+
+        keep = self._smallest(reservoir, all_keys, self.size)
+        self._reservoir = reservoir.iloc[keep]
+        self._keys = all_keys[keep]
+
+    def _smallest(self, df: pd.DataFrame, keys: np.ndarray, size: int) -> np.ndarray:
+        """Posiciones de las `size` claves menores (por estrato si procede)"""
+        if self.stratify is None:
+            if len(keys) <= size:
+                return np.arange(len(keys))
+            return np.argpartition(keys, size - 1)[:size]
+
+        codes, _ = pd.factorize(self._strata(df))
+        order = np.lexsort((keys, codes))
+        sorted_codes = codes[order]
+        # Posición de cada fila dentro de su estrato (ordenado por clave)
+        starts = np.r_[0, np.flatnonzero(np.diff(sorted_codes)) + 1]
+        rank = np.arange(len(order)) - np.repeat(starts, np.diff(np.r_[starts, len(order)]))
+        limit = size if np.isscalar(size) else size[sorted_codes]
+        return order[rank < limit]
+
+    def _allocation(self) -> Dict[object, int]:
+        """Filas de la muestra por estrato (proporcional, resto mayor)"""
+        total = sum(self._counts.values())
+        size = min(self.size, total)
+        strata = list(self._counts)
+        counts = np.array([self._counts[s] for s in strata], dtype='float64')
+
+        base = np.zeros(len(strata), dtype=int)
+        if size >= len(strata):
+            base[:] = 1
+        exact = (size - base.sum()) * (counts - base) / max(total - base.sum(), 1)
+        alloc = base + np.floor(exact).astype(int)
+        remainder = size - alloc.sum()
+        if remainder > 0:
+            alloc[np.argsort(-(exact - np.floor(exact)), kind='stable')[:remainder]] += 1
+        return dict(zip(strata, np.minimum(alloc, counts.astype(int)).tolist()))
+
+    def result(self) -> pd.DataFrame:
+        """
+        Muestra final, en el orden original del archivo
+
+        Returns:
+            pd.DataFrame: Filas muestreadas (conservan el índice de origen)
+        """
+        if self._reservoir is None:
+            return pd.DataFrame()
+
+        sample = self._reservoir
+        if self.stratify is not None:
+            codes, uniques = pd.factorize(self._strata(sample))
+            allocation = self._allocation()
+            limits = np.array([allocation.get(u, 0) for u in uniques])
+            sample = sample.iloc[self._smallest(sample, self._keys, limits)]
+
+        return sample.sort_index()
+
+
+def reservoir_sample(
+    chunks: Iterable[pd.DataFrame],
+    size: int,
+    seed: int = 42,
+    stratify: Optional[str] = None
+) -> pd.DataFrame:
+    """
+    Muestra reproducible de un CSV leído por chunks (ver ReservoirSampler)
+
+    Args:
+        chunks: Chunks del CSV (p. ej. iter_csv_chunks)
+        size: Filas de la muestra
+        seed: Semilla del generador aleatorio
+        stratify: Columna para muestreo estratificado (opcional)
+
+    Returns:
+        pd.DataFrame: Muestra en el orden original del archivo
+    """
+    sampler = ReservoirSampler(size, seed=seed, stratify=stratify)
+    for chunk in chunks:
+        sampler.add(chunk)
+    sample = sampler.result()
+    logger.info(
+        f"🎲 Muestra de {len(sample):,} de {sampler.rows:,} registros"
+        + (f" (estratificada por '{stratify}')" if stratify else ""))
+    return sample
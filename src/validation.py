@@ -0,0 +1,284 @@
+"""
+Validación previa de listings con las reglas del $jsonSchema de init-mongo.js
+
+El validador del servidor rechaza el documento completo si un campo no
+cumple el esquema y, con insert_many ordenado, aborta el resto del lote.
+Aquí se comprueban las mismas reglas sobre el DataFrame limpio, columna a
+columna: las filas válidas siguen por el camino rápido y las inválidas se
+guardan con sus motivos en una colección de cuarentena (listings_rejected).
+"""
+
+import logging
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from pymongo.collection import Collection
+
+from .cleaning import dataframe_to_documents
+from .field_codec import FieldCodec
+
+logger = logging.getLogger(__name__)
+
+# Reglas de scripts/init-mongo.js (mantener sincronizadas)
+REQUIRED_FIELDS = ['name', 'price']
+STRING_FIELDS = ['name', 'neighbourhood', 'room_type']
+ROOM_TYPES = ['Entire home/apt', 'Private room', 'Shared room', 'Hotel room']
+# Campo -> (mínimo, máximo, solo double)
+NUMERIC_RANGES = {
+    'price': (0, None, False),
+    'latitude': (-90, 90, True),
+    'longitude': (-180, 180, True),
+    'availability_365': (0, 365, False),
+}
+# Campos opcionales con tipo: un nulo no cumple el esquema, pero basta con
+# omitir el campo en el documento para que sea válido
+OPTIONAL_FIELDS = ['neighbourhood', 'room_type', 'latitude', 'longitude',
+                   'availability_365', 'location']
+
+# Sufijo de la colección de cuarentena (listings -> listings_rejected)
+REJECTED_SUFFIX = '_rejected'
+
+
+def rejected_collection_name(collection_name: str) -> str:
+    """Nombre de la colección de cuarentena de una colección de listings"""
+    return f"{collection_name}{REJECTED_SUFFIX}"
+
+
+def _is_string(series: pd.Series) -> np.ndarray:
+    """Máscara de valores de texto"""
+    if pd.api.types.is_numeric_dtype(series.dtype) or pd.api.types.is_datetime64_any_dtype(series.dtype):
+        return np.zeros(len(series), dtype=bool)
+    # .str devuelve NaN para los valores que no son cadenas
+    return series.astype(object).str.len().notna().to_numpy()
+
+
+def _is_number(series: pd.Series, double_only: bool) -> Tuple[np.ndarray, np.ndarray]:
+    """Máscara de valores numéricos finitos y sus valores como float"""
+    dtype = series.dtype
+    if pd.api.types.is_bool_dtype(dtype):
+        return np.zeros(len(series), dtype=bool), np.full(len(series), np.nan)
+    if pd.api.types.is_numeric_dtype(dtype):
+        if double_only and not pd.api.types.is_float_dtype(dtype):
+            return np.zeros(len(series), dtype=bool), np.full(len(series), np.nan)
+        values = series.to_numpy(dtype='float64', na_value=np.nan)
+        return np.isfinite(values), values
+
+    # Columna object (CSV sin tipos): solo cuentan los números de Python
+    types = (float,) if double_only else (int, float)
+    numeric = series.map(
+        lambda value: isinstance(value, types) and not isinstance(value, bool)).to_numpy(dtype=bool)
+    values = np.full(len(series), np.nan)
+    values[numeric] = series[numeric].to_numpy(dtype='float64')
+    return numeric & np.isfinite(values), values
+
+
+def _is_point(series: pd.Series) -> np.ndarray:
+    """Máscara de GeoJSON Point con dos coordenadas"""
+    return series.map(
+        lambda value: isinstance(value, dict) and value.get('type') == 'Point'
+        and isinstance(value.get('coordinates'), (list, tuple))
+        and len(value['coordinates']) == 2).to_numpy(dtype=bool)
+
+
+def validate_listings(df: pd.DataFrame, repair_nulls: bool = True) -> pd.Series:
+    """
+    Comprueba cada fila contra el esquema de la colección listings
+
+    Args:
+        df: DataFrame limpio
+        repair_nulls: Si True, los nulos en campos opcionales no se consideran
+            error (listing_documents omite esos campos)
+
+    Returns:
+        pd.Series: Motivos de rechazo por fila, separados por '; ' ('' = válida)
+    """
+    reasons = np.full(len(df), '', dtype=object)
+
+    def flag(mask: np.ndarray, reason: str) -> None:
+        if mask.any():
+            reasons[mask] = reasons[mask] + np.where(reasons[mask] == '', '', '; ') + reason
+
+    for field in REQUIRED_FIELDS:
+        if field not in df.columns:
+            flag(np.ones(len(df), dtype=bool), f"{field}: requerido")
+
+    for field in df.columns.intersection(STRING_FIELDS):
+        series = df[field]
+        missing = series.isna().to_numpy()
+        if field in REQUIRED_FIELDS:
+            flag(missing, f"{field}: requerido")
+        elif not repair_nulls:
+            flag(missing, f"{field}: nulo")
+        is_string = _is_string(series)
+        flag(~missing & ~is_string, f"{field}: no es texto")
+        if field == 'room_type':
+            flag(is_string & ~series.isin(ROOM_TYPES).to_numpy(), f"{field}: valor no permitido")
+
+    for field in df.columns.intersection(list(NUMERIC_RANGES)):
+        minimum, maximum, double_only = NUMERIC_RANGES[field]
+        series = df[field]
+        missing = series.isna().to_numpy()
+        is_number, values = _is_number(series, double_only)
+        if field in REQUIRED_FIELDS:
+            flag(~is_number & missing, f"{field}: requerido")
+        elif not repair_nulls:
+            flag(missing, f"{field}: nulo")
+        flag(~is_number & ~missing, f"{field}: no es {'double' if double_only else 'numérico'}")
+        with np.errstate(invalid='ignore'):
+            out_of_range = np.zeros(len(df), dtype=bool)
+            if minimum is not None:
+                out_of_range |= values < minimum
+            if maximum is not None:
+                out_of_range |= values > maximum
+        flag(is_number & out_of_range, f"{field}: fuera de rango")
+
+    if 'location' in df.columns:
+        missing = df['location'].isna().to_numpy()
+        if not repair_nulls:
+            flag(missing, "location: nulo")
+        flag(~missing & ~_is_point(df['location']), "location: no es un Point")
+
+    return pd.Series(reasons, index=df.index, name='reasons')
+
+
+def split_valid_listings(
+    df: pd.DataFrame,
+    repair_nulls: bool = True
+) -> Tuple[pd.DataFrame, List[Dict[str, Any]]]:
+    """
+    Separa las filas válidas de las rechazadas
+
+    Args:
+        df: DataFrame limpio
+        repair_nulls: Ver validate_listings
+
+    Returns:
+        Tuple: (DataFrame válido, rechazos {row, reasons, document})
+    """
+    reasons = validate_listings(df, repair_nulls)
+    invalid = (reasons != '').to_numpy()
+    if not invalid.any():
+        return df, []
+
+    rejected = df.loc[invalid]
+    rejects = [
+        {'row': int(row) if isinstance(row, (int, np.integer)) else str(row),
+         'reasons': reason.split('; '), 'document': document}
+        for row, reason, document in zip(
+            rejected.index.tolist(), reasons[invalid].tolist(), dataframe_to_documents(rejected))
+    ]
+    return df.loc[~invalid], rejects
+
+
+def listing_documents(
+    df: pd.DataFrame,
+    repair_nulls: bool = True,
+    sparse: bool = False,
+    codec: Optional[FieldCodec] = None
+) -> List[Dict[str, Any]]:
+    """
+    Convierte filas ya validadas en documentos que cumplen el esquema
+
+    Args:
+        df: DataFrame válido (split_valid_listings)
+        repair_nulls: Si True, omite los campos opcionales nulos
+        sparse: Si True, omite todos los campos nulos
+        codec: Codec de claves compactas (opcional; los campos del
+            esquema están reservados y no cambian de nombre)
+
+    Returns:
+        List[Dict]: Documentos para insertar
+    """
+    if codec is not None:
+        df = codec.encode_frame(df)
+    documents = dataframe_to_documents(df, sparse=sparse)
+    if repair_nulls and not sparse:
+        for field in df.columns.intersection(OPTIONAL_FIELDS):
+            for position in np.flatnonzero(df[field].isna().to_numpy()).tolist():
+                del documents[position][field]
+    return documents
+
+
+class RejectedListings:
+    """
+    Colección de cuarentena para los listings que no cumplen el esquema
+
+    Cada rechazo se guarda con el documento original, la fila de origen,
+    los motivos, el archivo y la fecha, y se acumula un recuento por motivo.
+    """
+
+    def __init__(
+        self,
+        collection: Optional[Collection],
+        source: Optional[str] = None,
+        clear: bool = False
+    ):
+        """
+        Inicializa la cuarentena
+
+        Args:
+            collection: Colección de cuarentena (None = solo contar)
+            source: Archivo de origen a registrar en cada rechazo
+            clear: Si True, vacía la cuarentena antes de empezar
+        """
+        self.collection = collection
+        self.source = source
+        self.rejected = 0
+        self.reasons: Counter = Counter()
+        if clear and collection is not None:
+            collection.delete_many({})
+
+    def write(self, rejects: List[Dict[str, Any]]) -> None:
+        """
+        Registra un lote de rechazos (split_valid_listings)
+
+        Args:
+            rejects: Rechazos a guardar
+        """
+        if not rejects:
+            return
+        self.rejected += len(rejects)
+        for reject in rejects:
+            self.reasons.update(reject['reasons'])
+
+        if self.collection is not None:
+            now = datetime.now()
+            self.collection.insert_many(
+                [{**reject, 'source': self.source, 'rejected_at': now} for reject in rejects],
+                ordered=False)
+
+    def filter(
+        self,
+        df: pd.DataFrame,
+        repair_nulls: bool = True,
+        sparse: bool = False,
+        codec: Optional[FieldCodec] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Valida un DataFrame limpio, guarda los rechazos y devuelve los documentos válidos
+
+        Args:
+            df: DataFrame limpio
+            repair_nulls: Ver validate_listings
+            sparse: Si True, los documentos omiten todos los campos nulos
+            codec: Codec de claves compactas para los documentos (opcional)
+
+        Returns:
+            List[Dict]: Documentos que cumplen el esquema
+        """
+        valid, rejects = split_valid_listings(df, repair_nulls or sparse)
+        self.write(rejects)
+        return listing_documents(valid, repair_nulls, sparse, codec)
+
+    def log_summary(self) -> None:
+        """Registra el resumen de rechazos"""
+        if self.rejected == 0:
+            logger.info("✅ Validación: todos los registros cumplen el esquema")
+            return
+        target = f" en '{self.collection.name}'" if self.collection is not None else ""
+        logger.warning(f"⚠️ Validación: {self.rejected:,} registros en cuarentena{target}")
+        for reason, count in self.reasons.most_common():
+            logger.warning(f"  - {reason}: {count:,}")
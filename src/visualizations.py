@@ -11,8 +11,10 @@ from plotly.subplots import make_subplots
 import matplotlib.pyplot as plt
 import seaborn as sns
 
+from .cleaning import documents_to_dataframe
 from .database import get_collection
-from .config import COLOR_PALETTE, PLOTLY_CONFIG, ROOM_TYPE_MAPPING, COLLECTION_NAME
+from .config import COLOR_PALETTE, PLOTLY_CONFIG, ROOM_TYPE_MAPPING, COLLECTION_NAME, COMPACT_FIELDS
+from .field_codec import FieldCodec, get_codec
 
 logger = logging.getLogger(__name__)
 
@@ -22,14 +24,20 @@ class AirbnbVisualizer:
     Clase para crear visualizaciones de datos de Airbnb
     """
     
-    def __init__(self, collection_name: str = COLLECTION_NAME):
+    def __init__(
+        self,
+        collection_name: str = COLLECTION_NAME,
+        codec: Optional[FieldCodec] = get_codec(COMPACT_FIELDS)
+    ):
         """
         Inicializa el visualizador
         
         Args:
             collection_name: Nombre de la colección MongoDB
+            codec: Codec de claves compactas de la colección (None = nombres lógicos)
         """
         self.collection = get_collection(collection_name)
+        self.codec = codec
         self.colors = COLOR_PALETTE
         logger.info(f"Visualizer initialized for collection: {collection_name}")
     
@@ -52,12 +60,19 @@ class AirbnbVisualizer:
         """
         try:
             projection = {field: 1 for field in fields} if fields else None
-            cursor = self.collection.find(query, projection)
+            if self.codec is not None:
+                cursor = self.collection.find(
+                    self.codec.encode_filter(query), self.codec.encode_projection(projection))
+            else:
+                cursor = self.collection.find(query, projection)
             
             if limit > 0:
                 cursor = cursor.limit(limit)
+            if self.codec is not None:
+                cursor = self.codec.decode_documents(cursor)
             
-            df = pd.DataFrame(list(cursor))
+            # Los campos omitidos (documentos dispersos) se restauran como NaN
+            df = documents_to_dataframe(cursor, projection)
             
             # Eliminar _id si no se solicitó explícitamente
             if fields and '_id' not in fields and '_id' in df.columns:
@@ -70,6 +85,21 @@ class AirbnbVisualizer:
             logger.error(f"❌ Error al crear DataFrame: {e}")
             raise
     
+    def _aggregate(self, pipeline: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Ejecuta un pipeline escrito con los nombres lógicos de los campos
+        
+        Args:
+            pipeline: Pipeline de agregación MongoDB
+            
+        Returns:
+            List[Dict]: Resultados con los nombres lógicos
+        """
+        if self.codec is None:
+            return list(self.collection.aggregate(pipeline))
+        pipeline, keys = self.codec.encode_aggregate(pipeline)
+        return self.codec.decode_documents(self.collection.aggregate(pipeline), keys)
+    
     # ===== DISTRIBUCIÓN DE PRECIOS =====
     
     def price_distribution(
@@ -162,7 +192,7 @@ class AirbnbVisualizer:
             {"$limit": top_n}
         ]
         
-        results = list(self.collection.aggregate(pipeline))
+        results = self._aggregate(pipeline)
         df = pd.DataFrame(results)
         df.rename(columns={"_id": "neighbourhood"}, inplace=True)
         
@@ -203,7 +233,7 @@ class AirbnbVisualizer:
             {"$limit": top_n}
         ]
         
-        results = list(self.collection.aggregate(pipeline))
+        results = self._aggregate(pipeline)
         df = pd.DataFrame(results)
         df.rename(columns={"_id": "neighbourhood"}, inplace=True)
         
@@ -241,7 +271,7 @@ class AirbnbVisualizer:
             {"$sort": {"count": -1}}
         ]
         
-        results = list(self.collection.aggregate(pipeline))
+        results = self._aggregate(pipeline)
         df = pd.DataFrame(results)
         df.rename(columns={"_id": "room_type"}, inplace=True)
         df['room_type_es'] = df['room_type'].map(ROOM_TYPE_MAPPING)
@@ -301,7 +331,7 @@ class AirbnbVisualizer:
             {"$project": {"price": 1, "number_of_reviews": 1, "room_type": 1}}
         ]
         
-        results = list(self.collection.aggregate(pipeline))
+        results = self._aggregate(pipeline)
         df = pd.DataFrame(results)
         
         fig = px.scatter(
@@ -361,7 +391,7 @@ class AirbnbVisualizer:
             }
         ]
         
-        results = list(self.collection.aggregate(pipeline))
+        results = self._aggregate(pipeline)
         df = pd.DataFrame(results)
         
         fig = px.scatter_mapbox(
@@ -0,0 +1,8 @@
+"""
+Configuración común de los tests: permite importar `src` desde la raíz
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
@@ -0,0 +1,91 @@
+"""
+Colecciones MongoDB falsas para probar la importación sin servidor
+"""
+
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Optional
+
+from bson import ObjectId, decode
+from bson.raw_bson import RawBSONDocument
+from pymongo.errors import BulkWriteError, OperationFailure
+
+
+class DropAfterWrite:
+    """Fallo que se lanza después de escribir el lote (conexión caída sin respuesta)"""
+
+    def __init__(self, error: Exception):
+        self.error = error
+
+
+class FakeCollection:
+    """
+    Imita insert_many(ordered=False) sobre un dict de documentos por _id
+
+    - `failures`: un elemento por llamada a insert_many; una excepción se
+      lanza antes de escribir, DropAfterWrite después y None no falla.
+    - `reject`: retorna un motivo si el servidor rechaza el documento
+      (validación); se reporta como writeError del lote.
+    - `poison`: si algún documento del lote lo cumple, el servidor
+      rechaza el lote completo (p. ej. documento demasiado grande).
+    """
+
+    def __init__(
+        self,
+        failures: Optional[List[Any]] = None,
+        reject: Optional[Callable[[Dict[str, Any]], Optional[str]]] = None,
+        poison: Optional[Callable[[Dict[str, Any]], bool]] = None,
+        hello: Optional[Dict[str, Any]] = None
+    ):
+        self.failures = list(failures or [])
+        self.reject = reject or (lambda doc: None)
+        self.poison = poison or (lambda doc: False)
+        self.documents: Dict[Any, Dict[str, Any]] = {}
+        self.calls = 0
+        admin = SimpleNamespace(command=lambda name: dict(hello or {}))
+        self.database = SimpleNamespace(client=SimpleNamespace(admin=admin))
+
+    def insert_many(self, documents, ordered=True):
+        self.calls += 1
+        failure = self.failures.pop(0) if self.failures else None
+        if isinstance(failure, Exception):
+            raise failure
+
+        docs = [decode(doc.raw) if isinstance(doc, RawBSONDocument) else doc for doc in documents]
+        if any(self.poison(doc) for doc in docs):
+            raise OperationFailure("BSONObj size is invalid", code=10334)
+
+        inserted, errors = 0, []
+        for index, doc in enumerate(docs):
+            doc.setdefault('_id', ObjectId())
+            reason = self.reject(doc)
+            if reason:
+                errors.append({'index': index, 'code': 121, 'errmsg': reason})
+            elif doc['_id'] in self.documents:
+                errors.append({'index': index, 'code': 11000, 'keyPattern': {'_id': 1},
+                               'errmsg': 'E11000 duplicate key error'})
+            else:
+                self.documents[doc['_id']] = doc
+                inserted += 1
+
+        if isinstance(failure, DropAfterWrite):
+            raise failure.error
+        if errors:
+            raise BulkWriteError({'nInserted': inserted, 'writeErrors': errors})
+
+
+class FakeStateCollection:
+    """Imita find_one/update_one($set, upsert) de la colección de estado"""
+
+    def __init__(self):
+        self.records: Dict[Any, Dict[str, Any]] = {}
+
+    def find_one(self, query):
+        record = self.records.get(query['_id'])
+        return dict(record) if record is not None else None
+
+    def update_one(self, query, update, upsert=False):
+        if query['_id'] not in self.records:
+            if not upsert:
+                return
+            self.records[query['_id']] = {'_id': query['_id']}
+        self.records[query['_id']].update(update['$set'])
@@ -0,0 +1,42 @@
+"""
+Tests del motor de ingesta Arrow
+"""
+
+import pytest
+from bson import decode
+
+pytest.importorskip('pyarrow')
+
+from src.arrow_ingest import iter_bson_batches
+
+HEADER = 'id,name,room_type,price,latitude,longitude,accommodates,reviews_per_month\n'
+
+
+def _decode(csv_path, **kwargs):
+    return [decode(doc.raw) for batch in iter_bson_batches(csv_path, **kwargs) for doc in batch]
+
+
+def test_integer_columns_fall_back_to_float_or_null(tmp_path):
+    csv_path = tmp_path / 'listings.csv'
+    csv_path.write_text(
+        HEADER
+        + '1,Piso,Entire home/apt,$50,40.4,-3.7,2.0,1\n'
+        + '2,Ático,Private room,$80,40.4,-3.7,n/a,\n'
+        + ' 3 ,Estudio,Private room,$60,40.4,-3.7,,0.5\n')
+
+    documents = _decode(csv_path)
+
+    assert [doc['id'] for doc in documents] == [1, 2, 3]
+    assert documents[0]['accommodates'] == 2.0
+    assert documents[1]['accommodates'] is None
+    assert documents[2]['accommodates'] is None
+
+
+def test_integer_columns_stay_int64_when_they_fit(tmp_path):
+    csv_path = tmp_path / 'listings.csv'
+    csv_path.write_text(HEADER + '1,Piso,Entire home/apt,$50,40.4,-3.7,4,1\n')
+
+    document, = _decode(csv_path)
+
+    assert document['accommodates'] == 4
+    assert isinstance(document['accommodates'], int)
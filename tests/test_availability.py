@@ -0,0 +1,39 @@
+"""
+Tests del índice de disponibilidad en bitmaps
+"""
+
+import numpy as np
+import pandas as pd
+
+from src.availability import AvailabilityIndexBuilder
+
+
+def _chunk(listing_id, first_day, available):
+    dates = pd.date_range(first_day, periods=len(available), freq='D')
+    return pd.DataFrame({'listing_id': listing_id, 'date': dates, 'available': available})
+
+
+def test_builder_moves_start_back_for_an_earlier_chunk():
+    builder = AvailabilityIndexBuilder(days=10)
+    builder.add(_chunk(1, '2024-06-12', [True] * 3))
+    builder.add(_chunk(2, '2024-06-11', [True, True, False]))
+    index = builder.build()
+
+    assert index.start == np.datetime64('2024-06-11')
+    assert builder.dropped == 0
+    assert index.available_mask('2024-06-11', '2024-06-13', [1, 2]).tolist() == [False, True]
+    assert index.available_mask('2024-06-12', '2024-06-15', [1, 2]).tolist() == [True, False]
+
+
+def test_builder_counts_rows_outside_the_range():
+    builder = AvailabilityIndexBuilder(days=4)
+    builder.add(_chunk(1, '2024-06-12', [True] * 4))
+    builder.add(_chunk(2, '2024-06-10', [True] * 2))
+
+    assert builder.start == np.datetime64('2024-06-10')
+    assert builder.dropped == 2  # 14 y 15 de junio del listing 1
+
+    fixed = AvailabilityIndexBuilder(start='2024-06-12', days=4)
+    fixed.add(_chunk(1, '2024-06-11', [True] * 3))
+    assert fixed.start == np.datetime64('2024-06-12')
+    assert fixed.dropped == 1
@@ -0,0 +1,147 @@
+"""
+Tests de los motores de inserción masiva contra una colección falsa
+"""
+
+from pymongo.errors import AutoReconnect
+
+from src.bulk_writer import AdaptiveBulkWriter, BulkInsertEngine, RawBSONInsertEngine
+from fakes import DropAfterWrite, FakeCollection
+
+
+def _documents(count):
+    return [{'n': n, 'name': f'listing {n}'} for n in range(count)]
+
+
+def test_bulk_engine_counts_successful_batches():
+    collection = FakeCollection()
+    progress = []
+    with BulkInsertEngine(collection, batch_size=10, workers=2, progress=progress.append) as engine:
+        engine.insert(_documents(35))
+
+    assert len(collection.documents) == 35
+    assert engine.inserted == 35
+    assert engine.batches == 4
+    assert engine.failed == 0
+    assert engine.aborted == 0
+    assert sorted(progress) == [5, 10, 10, 10]
+
+
+def test_raw_bson_engine_counts_successful_batches():
+    collection = FakeCollection()
+    progress = []
+    engine = RawBSONInsertEngine(collection, workers=2, progress=progress.append, max_batch_bytes=1024)
+    engine.insert(_documents(35))
+    stats = engine.close()
+
+    assert len(collection.documents) == 35
+    assert stats['inserted'] == 35
+    assert engine.batches > 1
+    assert engine.batches == len(progress)
+    assert sum(progress) == 35
+    assert engine.aborted == 0
+
+
+def test_bulk_engine_sends_server_rejects_to_on_reject():
+    collection = FakeCollection(reject=lambda doc: 'schema' if doc['n'] % 10 == 3 else None)
+    rejected = []
+    with BulkInsertEngine(collection, batch_size=10, workers=1, on_reject=rejected.extend) as engine:
+        engine.insert(_documents(35))
+
+    assert engine.inserted == 31
+    assert engine.failed == 4
+    assert engine.aborted == 0
+    assert sorted(item['document']['n'] for item in rejected) == [3, 13, 23, 33]
+
+
+def test_bulk_engine_counts_aborted_batches_without_rejecting():
+    collection = FakeCollection(failures=[AutoReconnect('connection reset')])
+    rejected, progress = [], []
+    with BulkInsertEngine(collection, batch_size=10, workers=1,
+                          progress=progress.append, on_reject=rejected.extend) as engine:
+        engine.insert(_documents(25))
+
+    assert engine.inserted == 15
+    assert engine.aborted == 10
+    assert engine.failed == 10
+    assert engine.batches == 3
+    assert isinstance(engine.last_error, AutoReconnect)
+    assert rejected == []
+    assert progress == [0, 10, 5]
+
+
+def _adaptive(collection, **kwargs):
+    kwargs.setdefault('workers', 1)
+    kwargs.setdefault('backoff', 0)
+    return AdaptiveBulkWriter(collection, **kwargs)
+
+
+def test_adaptive_writer_retries_transient_errors():
+    collection = FakeCollection(failures=[AutoReconnect('primary stepped down')] * 2)
+    progress = []
+    with _adaptive(collection, progress=progress.append) as writer:
+        writer.insert(_documents(20))
+
+    assert len(collection.documents) == 20
+    assert writer.inserted == 20
+    assert writer.retried == 2
+    assert writer.failed == 0
+    assert writer.aborted == 0
+    assert sum(progress) == 20
+
+
+def test_adaptive_writer_counts_duplicate_ids_after_a_dropped_write_as_inserted():
+    # El servidor escribe el lote pero la respuesta se pierde: el reintento
+    # recibe E11000 en todos los _id, que ya asignó el motor
+    collection = FakeCollection(failures=[DropAfterWrite(AutoReconnect('connection reset'))])
+    rejected = []
+    with _adaptive(collection, on_reject=rejected.extend) as writer:
+        writer.insert(_documents(20))
+
+    assert len(collection.documents) == 20
+    assert writer.inserted == 20
+    assert writer.retried == 1
+    assert writer.failed == 0
+    assert rejected == []
+
+
+def test_adaptive_writer_bisects_to_isolate_poison_documents():
+    collection = FakeCollection(poison=lambda doc: doc['n'] in (3, 17))
+    rejected = []
+    with _adaptive(collection, on_reject=rejected.extend) as writer:
+        writer.insert(_documents(20))
+
+    assert writer.inserted == 18
+    assert writer.failed == 2
+    assert writer.splits > 0
+    assert writer.aborted == 0
+    assert sorted(item['document']['n'] for item in rejected) == [3, 17]
+    assert sorted(doc['n'] for doc in collection.documents.values()) == \
+        [n for n in range(20) if n not in (3, 17)]
+
+
+def test_adaptive_writer_sends_validation_errors_to_on_reject():
+    collection = FakeCollection(reject=lambda doc: 'schema' if doc['n'] == 5 else None)
+    rejected = []
+    with _adaptive(collection, on_reject=rejected.extend) as writer:
+        writer.insert(_documents(20))
+
+    assert writer.inserted == 19
+    assert writer.failed == 1
+    assert [item['document']['n'] for item in rejected] == [5]
+
+
+def test_adaptive_writer_aborts_a_batch_after_exhausting_retries():
+    collection = FakeCollection(failures=[AutoReconnect('network down')] * 3)
+    rejected, progress = [], []
+    with _adaptive(collection, retries=2, progress=progress.append,
+                   on_reject=rejected.extend) as writer:
+        writer.insert(_documents(20))
+
+    assert collection.documents == {}
+    assert writer.inserted == 0
+    assert writer.aborted == 20
+    assert writer.failed == 20
+    assert writer.retried == 2
+    assert isinstance(writer.last_error, AutoReconnect)
+    assert rejected == []
+    assert progress == [0]
@@ -0,0 +1,60 @@
+"""
+Tests de los checkpoints de importación y de la reanudación por chunks
+"""
+
+from datetime import datetime
+from unittest.mock import MagicMock
+
+from src.checkpoints import ImportCheckpoint, discard_partial_batch
+from src.streaming import iter_csv_chunks
+from fakes import FakeStateCollection
+
+
+def _write_csv(path, rows):
+    path.write_text('id,name\n' + ''.join(f'{n},listing {n}\n' for n in range(rows)))
+    return path
+
+
+def test_resume_reports_the_interrupted_chunk_span(tmp_path):
+    csv_path = _write_csv(tmp_path / 'listings.csv', 100)
+    state = FakeStateCollection()
+
+    checkpoint = ImportCheckpoint(state, csv_path, 'listings')
+    checkpoint.start()
+    checkpoint.begin(30)
+    checkpoint.commit(30, 30)
+    checkpoint.begin(70)  # Se corta antes de confirmar
+
+    resumed = ImportCheckpoint(state, csv_path, 'listings')
+    assert resumed.load() == 30
+    assert resumed.interrupted_rows == 40
+    assert isinstance(resumed.interrupted_since, datetime)
+
+    chunks = list(iter_csv_chunks(csv_path, chunk_rows=7, first_chunk_rows=resumed.interrupted_rows,
+                                  **resumed.read_csv_kwargs()))
+    assert chunks[0]['id'].tolist() == list(range(30, 70))
+    assert [len(chunk) for chunk in chunks[1:]] == [7, 7, 7, 7, 2]
+
+
+def test_resume_after_commit_has_nothing_interrupted(tmp_path):
+    csv_path = _write_csv(tmp_path / 'listings.csv', 10)
+    state = FakeStateCollection()
+
+    checkpoint = ImportCheckpoint(state, csv_path, 'listings')
+    checkpoint.start()
+    checkpoint.begin(5)
+    checkpoint.commit(5, 5)
+
+    resumed = ImportCheckpoint(state, csv_path, 'listings')
+    assert resumed.load() == 5
+    assert resumed.interrupted_rows == 0
+
+
+def test_discard_only_removes_documents_from_the_interrupted_run():
+    collection = MagicMock()
+    collection.delete_many.return_value.deleted_count = 2
+    since = datetime(2024, 6, 1)
+
+    assert discard_partial_batch(collection, [1, None, 2], since=since) == 2
+    collection.delete_many.assert_called_once_with(
+        {'id': {'$in': [1, 2]}, 'imported_at': {'$gte': since}})
@@ -0,0 +1,47 @@
+"""
+Tests de AirbnbCRUD con documentos dispersos y claves compactas
+"""
+
+import math
+from unittest.mock import MagicMock
+
+import pytest
+
+import src.crud_operations as crud_operations
+from src.cleaning import LISTING_DOCUMENT_FIELDS
+from src.field_codec import LISTING_CODEC
+
+
+@pytest.fixture
+def crud(monkeypatch):
+    monkeypatch.setattr(crud_operations, 'get_collection', lambda name: MagicMock())
+    return crud_operations.AirbnbCRUD(id_as_key=False, sparse=True, codec=LISTING_CODEC)
+
+
+def test_find_listing_by_id_restores_omitted_fields(crud):
+    crud.collection.find_one.return_value = {'_id': 1, 'id': 5, 'name': 'Piso', 'rpm': 1.5}
+
+    listing = crud.find_listing_by_id(5)
+
+    assert set(listing) == set(LISTING_DOCUMENT_FIELDS) | {'_id'}
+    assert listing['reviews_per_month'] == 1.5
+    assert math.isnan(listing['review_scores_rating'])
+
+
+def test_find_listings_restores_known_fields_except_excluded(crud):
+    crud.collection.find.return_value = [{'_id': 1, 'name': 'Piso'}]
+
+    listing, = crud.find_listings({}, {'description': 0})
+
+    assert 'description' not in listing
+    assert math.isnan(listing['price'])
+    assert math.isnan(listing['reviews_per_month'])
+
+
+def test_find_listings_with_inclusion_projection_restores_only_projected(crud):
+    crud.collection.find.return_value = [{'_id': 1, 'name': 'Piso'}]
+
+    listing, = crud.find_listings({}, {'name': 1, 'price': 1})
+
+    assert set(listing) == {'_id', 'name', 'price'}
+    assert math.isnan(listing['price'])
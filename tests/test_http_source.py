@@ -0,0 +1,62 @@
+"""
+Tests de la lectura en streaming contra un servidor HTTP local
+"""
+
+import gzip
+import os
+import threading
+import time
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+import pandas as pd
+import pytest
+
+from src.http_source import decompressed, open_url_source
+from src.streaming import iter_csv_chunks
+
+
+class _QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def http_dir(tmp_path):
+    """Sirve tmp_path por HTTP en localhost; retorna (directorio, URL base)"""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), partial(_QuietHandler, directory=str(tmp_path)))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield tmp_path, f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_gzipped_csv_streams_into_chunks(http_dir):
+    directory, base_url = http_dir
+    rows = pd.DataFrame({'id': range(2500), 'name': [f'listing {n}' for n in range(2500)]})
+    with gzip.open(directory / 'listings.csv.gz', 'wt', newline='') as f:
+        rows.to_csv(f, index=False)
+
+    raw = open_url_source(f"{base_url}/listings.csv.gz", chunk_bytes=1024, queue_chunks=2)
+    with raw, decompressed(raw) as stream:
+        chunks = list(iter_csv_chunks(stream, chunk_rows=1000))
+
+    assert [len(chunk) for chunk in chunks] == [1000, 1000, 500]
+    assert pd.concat(chunks, ignore_index=True).equals(rows)
+    assert raw.bytes_downloaded == (directory / 'listings.csv.gz').stat().st_size
+
+
+def test_bounded_queue_applies_backpressure(http_dir):
+    directory, base_url = http_dir
+    payload = os.urandom(512 * 1024)
+    (directory / 'blob.bin').write_bytes(payload)
+
+    raw = open_url_source(f"{base_url}/blob.bin", chunk_bytes=1024, queue_chunks=4)
+    with raw:
+        time.sleep(0.5)  # Sin lector: la descarga debe quedarse esperando
+        assert not raw.download_finished.is_set()
+        assert raw.bytes_downloaded <= (4 + 1) * 1024
+
+        assert raw.read() == payload
+        assert raw.download_finished.wait(5)